@@ -1,6 +1,5 @@
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
-from importlib import reload
 import os
 import math
 
@@ -10,11 +9,6 @@ from utils import curve_tool
 from utils import matrix_manager
 from utils import ribbon
 
-reload(data_manager)
-reload(guides_manager)
-reload(curve_tool)
-reload(matrix_manager)
-reload(ribbon)
 
 class EyebrowModule(object):
 
@@ -1,6 +1,5 @@
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
-from importlib import reload
 import os
 import math
 
@@ -10,11 +9,6 @@ from utils import curve_tool
 from utils import matrix_manager
 from utils import ribbon
 
-reload(data_manager)
-reload(guides_manager)
-reload(curve_tool)
-reload(matrix_manager)
-reload(ribbon)
 
 class EyelidModule(object):
 
@@ -544,16 +538,18 @@ class EyelidModule(object):
         skinning_jnts = []
         skinning_aims = []
 
+        # Closest parameters on the rebuilt curves, one query per curve
+        parameters = curve_tool.get_closest_params(self.eyelid_up_curve_rebuild, [cmds.xform(cv, q=True, t=True, ws=True) for cv in upper_cvs])
+        parameters += curve_tool.get_closest_params(self.eyelid_down_curve_rebuild, [cmds.xform(cv, q=True, t=True, ws=True) for cv in lower_cvs])
+
         for i, cv in enumerate(upper_cvs + lower_cvs):
 
-            cv_pos = cmds.xform(cv, q=True, t=True, ws=True)
+            parameter = parameters[i]
 
             if cv in upper_cvs:
                 name = "upper"
-                parameter = self.getClosestParamToPosition(self.eyelid_up_curve_rebuild, cv_pos) # Get the closest parameter on the curve to the CV position
             else:
                 name = "down"
-                parameter = self.getClosestParamToPosition(self.eyelid_down_curve_rebuild, cv_pos) # Get the closest parameter on the curve to the CV position
 
             mtp = cmds.createNode("motionPath", name=f"{self.side}_{name}Eyelid0{i}_MTP", ss=True)
             four_by_four_matrix = cmds.createNode("fourByFourMatrix", name=f"{self.side}_{name}Eyelid0{i}_F4X4", ss=True)
@@ -761,24 +757,7 @@ class EyelidModule(object):
         Returns:
             float: The parameter (u) value on the curve closest to the given position.
         """
-        if isinstance(curve, str):
-            sel = om.MSelectionList()
-            sel.add(curve)
-            curve_dag_path = sel.getDagPath(0)
-        elif isinstance(curve, om.MObject):
-            curve_dag_path = om.MDagPath.getAPathTo(curve)
-        elif isinstance(curve, om.MDagPath):
-            curve_dag_path = curve
-        else:
-            raise TypeError("Curve must be a string name, MObject, or MDagPath.")
-
-        curve_fn = om.MFnNurbsCurve(curve_dag_path)
-
-        point = om.MPoint(*position)
-
-        closest_point, paramU = curve_fn.closestPoint(point, space=om.MSpace.kWorld)
-
-        return paramU
+        return curve_tool.get_closest_params(curve, [position])[0]
 
 
     def constraints_callback(self, guide, driven, drivers=[], local_jnt=None):
@@ -1,6 +1,5 @@
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
-from importlib import reload
 import os
 import math
 
@@ -10,11 +9,6 @@ from utils import curve_tool
 from utils import matrix_manager
 from utils import ribbon
 
-reload(data_manager)
-reload(guides_manager)
-reload(curve_tool)
-reload(matrix_manager)
-reload(ribbon)
 
 class JawModule(object):
 
@@ -492,6 +486,9 @@ class JawModule(object):
             12: [11]
         }
 
+        # One closest-point query per curve instead of one MFnNurbsCurve per CV
+        upper_params = curve_tool.get_closest_params(self.upper_rebuild_lip_curve, [cmds.xform(cv, q=True, ws=True, t=True) for cv in rebuilded_upper_lip_cvs])
+
         for i, cv in enumerate(rebuilded_upper_lip_cvs):
             # Set the name based on the index
             if i % 3 == 0:
@@ -514,8 +511,7 @@ class JawModule(object):
             
             mtp_cv = cmds.createNode("motionPath", name=f"{side}_{name}_MTP", ss=True)
             cmds.connectAttr(f"{self.upper_rebuild_lip_curve}.worldSpace[0]", f"{mtp_cv}.geometryPath")
-            paramU = self.getClosestParamToPosition(self.upper_rebuild_lip_curve, cmds.xform(cv, q=True, ws=True, t=True))
-            cmds.setAttr(f"{mtp_cv}.uValue", paramU)
+            cmds.setAttr(f"{mtp_cv}.uValue", upper_params[i])
             fbf_cv = cmds.createNode("fourByFourMatrix", name=f"{side}_{name}_FBF", ss=True)
             cmds.connectAttr(f"{mtp_cv}.allCoordinates.xCoordinate", f"{fbf_cv}.in30")
             cmds.connectAttr(f"{mtp_cv}.allCoordinates.yCoordinate", f"{fbf_cv}.in31")
@@ -581,6 +577,8 @@ class JawModule(object):
         mult_matrix_tangents_lower = []
         tangent_mult_matrices_lower = []
 
+        lower_params = curve_tool.get_closest_params(self.lower_rebuild_lip_curve, [cmds.xform(cv, q=True, ws=True, t=True) for cv in rebuilded_lower_lip_cvs])
+
         for i, cv in enumerate(rebuilded_lower_lip_cvs):
             # Set the name based on the index
             if i % 3 == 0:
@@ -603,8 +601,7 @@ class JawModule(object):
             
             mtp_cv = cmds.createNode("motionPath", name=f"{side}_{name}_MTP", ss=True)
             cmds.connectAttr(f"{self.lower_rebuild_lip_curve}.worldSpace[0]", f"{mtp_cv}.geometryPath")
-            paramU = self.getClosestParamToPosition(self.lower_rebuild_lip_curve, cmds.xform(cv, q=True, ws=True, t=True))
-            cmds.setAttr(f"{mtp_cv}.uValue", paramU)
+            cmds.setAttr(f"{mtp_cv}.uValue", lower_params[i])
             fbf_cv = cmds.createNode("fourByFourMatrix", name=f"{side}_{name}_FBF", ss=True)
             cmds.connectAttr(f"{mtp_cv}.allCoordinates.xCoordinate", f"{fbf_cv}.in30")
             cmds.connectAttr(f"{mtp_cv}.allCoordinates.yCoordinate", f"{fbf_cv}.in31")
@@ -681,7 +678,8 @@ class JawModule(object):
 
         out_controllers = cmds.createNode("transform", name="C_outputControllers_GRP", ss=True, p=lips_controllers_grp)
         # Output joints
-        for i, cv in enumerate(cmds.ls(f"{self.upper_linear_lip_curve}.cv[*]", flatten=True)):
+        upper_params = curve_tool.get_closest_params(upper_bezier_curve, [cmds.xform(cv, q=True, ws=True, t=True) for cv in linear_cvs])
+        for i, cv in enumerate(linear_cvs):
 
             name = "upperLip"
 
@@ -695,8 +693,7 @@ class JawModule(object):
                 side = "L"
                 zip_ctl = "L_lipCorner_CTL"
 
-            cv_pos = cmds.xform(cv, q=True, ws=True, t=True)
-            parameter = self.getClosestParamToPosition(upper_bezier_curve, cv_pos)
+            parameter = upper_params[i]
 
             mtp = cmds.createNode("motionPath", n=f"{side}_{name}0{i}_MPA", ss=True)
             fourByFourMatrix = cmds.createNode("fourByFourMatrix", n=f"{side}_{name}0{i}_FBF", ss=True)
@@ -769,7 +766,9 @@ class JawModule(object):
             cmds.parent(out_nodes[0], out_controllers)
 
         
-        for i, cv in enumerate(cmds.ls(f"{self.lower_linear_lip_curve}.cv[*]", flatten=True)):
+        lower_linear_cvs = cmds.ls(f"{self.lower_linear_lip_curve}.cv[*]", flatten=True)
+        lower_params = curve_tool.get_closest_params(lower_bezier_curve, [cmds.xform(cv, q=True, ws=True, t=True) for cv in lower_linear_cvs])
+        for i, cv in enumerate(lower_linear_cvs):
 
             name = "lowerLip"
 
@@ -781,8 +780,7 @@ class JawModule(object):
             else:
                 side = "L"
                 zip_ctl = "L_lipCorner_CTL"
-            cv_pos = cmds.xform(cv, q=True, ws=True, t=True)
-            parameter = self.getClosestParamToPosition(lower_bezier_curve, cv_pos)
+            parameter = lower_params[i]
 
             mtp = cmds.createNode("motionPath", n=f"{side}_{name}0{i}_MPA", ss=True)
             fourByFourMatrix = cmds.createNode("fourByFourMatrix", n=f"{side}_{name}0{i}_FBF", ss=True)
@@ -957,21 +955,4 @@ class JawModule(object):
         Returns:
             float: The parameter (u) value on the curve closest to the given position.
         """
-        if isinstance(curve, str):
-            sel = om.MSelectionList()
-            sel.add(curve)
-            curve_dag_path = sel.getDagPath(0)
-        elif isinstance(curve, om.MObject):
-            curve_dag_path = om.MDagPath.getAPathTo(curve)
-        elif isinstance(curve, om.MDagPath):
-            curve_dag_path = curve
-        else:
-            raise TypeError("Curve must be a string name, MObject, or MDagPath.")
-
-        curve_fn = om.MFnNurbsCurve(curve_dag_path)
-
-        point = om.MPoint(*position)
-
-        closest_point, paramU = curve_fn.closestPoint(point, space=om.MSpace.kWorld)
-
-        return paramU
\ No newline at end of file
+        return curve_tool.get_closest_params(curve, [position])[0]
\ No newline at end of file
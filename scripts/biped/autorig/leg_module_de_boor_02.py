@@ -1,6 +1,5 @@
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
-from importlib import reload
 import os
 import math
 
@@ -13,13 +12,6 @@ from utils import ribbon
 from utils import custom_ik_solver
 
 
-reload(data_manager)
-reload(guides_manager)
-reload(curve_tool)
-reload(matrix_manager)
-reload(ribbon)
-reload(custom_ik_solver)
-
 class LegModule(object):
 
     def __init__(self):
@@ -1,6 +1,5 @@
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
-from importlib import reload
 import os
 import math
 
@@ -9,10 +8,6 @@ from utils import guides_manager
 from utils import curve_tool
 from utils import matrix_manager
 
-reload(data_manager)
-reload(guides_manager)
-reload(curve_tool)
-reload(matrix_manager)
 
 class TeethModule(object):
     def __init__(self):
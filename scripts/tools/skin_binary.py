@@ -0,0 +1,268 @@
+import os
+import glob
+import json
+import mmap
+import struct
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# FORMATO BINARIO .skcb
+# -----------------------------------------------------------------------------
+# Layout (little-endian):
+#   magic       4 bytes   b"SKCB"
+#   version     uint32
+#   header_len  uint32
+#   header      header_len bytes, JSON utf-8 con la metadata (mallas, skins, influencias, offsets)
+#   padding     hasta múltiplo de 8
+#   indices     uint32[count]
+#   padding     hasta múltiplo de 8
+#   weights     float32[count] o uint16[count] (cuantizado a 0..65535)
+#
+# Cada bloque sparse (una influencia o los blend weights de un skin) se guarda como
+# [offset, length] dentro de los arrays de indices/weights, así que el lector puede crear
+# vistas sobre el mmap sin parsear los pesos.
+
+MAGIC = b"SKCB"
+FORMAT_VERSION = 1
+BINARY_EXT = ".skcb"
+WEIGHT_FORMATS = {"float32": np.dtype("<f4"), "uint16": np.dtype("<u2")}
+INDEX_DTYPE = np.dtype("<u4")
+UINT16_SCALE = 65535.0
+_PREAMBLE = struct.Struct("<4sII")
+
+
+def _aligned(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def _encode_weights(values, weight_format):
+    values = np.asarray(values, dtype=np.float64)
+    if weight_format == "uint16":
+        return np.rint(np.clip(values, 0.0, 1.0) * UINT16_SCALE).astype(WEIGHT_FORMATS["uint16"])
+    return values.astype(WEIGHT_FORMATS["float32"])
+
+
+def write_skcb(path, full_data, weight_format="float32"):
+    """
+    Writes skin data with the same structure as a .skc file into a binary .skcb container.
+
+    Args:
+        path (str): Destination file.
+        full_data (dict): {mesh_name: [skin_entry, ...]} as produced by SkinManager.export_skins.
+        weight_format (str): "float32" or "uint16" (quantized).
+
+    Returns:
+        str: The written path.
+    """
+    if weight_format not in WEIGHT_FORMATS:
+        raise ValueError(f"Unknown weight format: {weight_format}")
+
+    index_blocks = []
+    weight_blocks = []
+    count = 0
+
+    def add_block(block):
+        nonlocal count
+        ix = np.asarray(block["ix"], dtype=INDEX_DTYPE)
+        vw = _encode_weights(block["vw"], weight_format)
+        offset = count
+        index_blocks.append(ix)
+        weight_blocks.append(vw)
+        count += len(ix)
+        return [offset, len(ix)]
+
+    meshes = {}
+    for mesh_name, skins_list in full_data.items():
+        mesh_skins = []
+        for skin_data in skins_list:
+            sparse_weights = {inf_name: add_block(block) for inf_name, block in skin_data.get("sparse_weights", {}).items()}
+            sparse_blend = skin_data.get("sparse_blend", {})
+            mesh_skins.append({
+                "name": skin_data["name"],
+                "vertex_count": skin_data["vertex_count"],
+                "attributes": skin_data.get("attributes", {}),
+                "influences": skin_data["influences"],
+                "sparse_weights": sparse_weights,
+                "sparse_blend": add_block(sparse_blend) if sparse_blend else None
+            })
+        meshes[mesh_name] = mesh_skins
+
+    header = json.dumps({"weight_format": weight_format, "count": count, "meshes": meshes}, separators=(',', ':')).encode("utf-8")
+
+    indices = np.concatenate(index_blocks) if index_blocks else np.zeros(0, dtype=INDEX_DTYPE)
+    weights = np.concatenate(weight_blocks) if weight_blocks else np.zeros(0, dtype=WEIGHT_FORMATS[weight_format])
+
+    indices_offset = _aligned(_PREAMBLE.size + len(header))
+    weights_offset = _aligned(indices_offset + indices.nbytes)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(b"\0" * (indices_offset - f.tell()))
+        f.write(indices.tobytes())
+        f.write(b"\0" * (weights_offset - f.tell()))
+        f.write(weights.tobytes())
+    os.replace(temp_path, path)
+
+    return path
+
+
+class SkcbReader(object):
+    """
+    Memory-mapped reader of a .skcb file.
+    Only the small JSON header is parsed, index and weight arrays are NumPy views over the mmap.
+
+    The file stays mapped (and cannot be overwritten on Windows) until close(). Use it as a context manager
+    and copy=True for blocks that must outlive the reader, the mmap cannot close while views are alive.
+
+        with SkcbReader(path) as reader:
+            skins = reader.skins(mesh_name, copy=True)
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_header()
+        except (ValueError, KeyError, struct.error):
+            self.close()
+            raise
+
+    def _read_header(self):
+        magic, version, header_len = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a .skcb file: {self.path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported .skcb version {version}: {self.path}")
+
+        header = json.loads(self._mmap[_PREAMBLE.size:_PREAMBLE.size + header_len].decode("utf-8"))
+        self.weight_format = header["weight_format"]
+        self.meshes = header["meshes"]
+
+        count = header["count"]
+        weight_dtype = WEIGHT_FORMATS[self.weight_format]
+        indices_offset = _aligned(_PREAMBLE.size + header_len)
+        weights_offset = _aligned(indices_offset + count * INDEX_DTYPE.itemsize)
+
+        self.indices = np.frombuffer(self._mmap, dtype=INDEX_DTYPE, count=count, offset=indices_offset)
+        self.weights = np.frombuffer(self._mmap, dtype=weight_dtype, count=count, offset=weights_offset)
+
+    def close(self):
+        """
+        Unmaps the file. Raises BufferError if views returned without copy=True are still alive.
+        """
+        if self._mmap.closed:
+            return
+        # Our own views hold the buffer too
+        self.indices = self.weights = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def mesh_names(self):
+        return list(self.meshes.keys())
+
+    def block(self, offset_length, copy=False):
+        """
+        Returns the {"ix", "vw"} arrays of a stored block. uint16 weights are decoded to float32.
+        Views over the mmap unless copy is True (decoded uint16 weights are always a copy).
+        """
+        offset, length = offset_length
+        ix = self.indices[offset:offset + length]
+        vw = self.weights[offset:offset + length]
+        if self.weight_format == "uint16":
+            vw = vw.astype(np.float32) / np.float32(UINT16_SCALE)
+        elif copy:
+            vw = np.array(vw)
+        if copy:
+            ix = np.array(ix)
+        return {"ix": ix, "vw": vw}
+
+    def skins(self, mesh_name, copy=False):
+        """
+        Returns the skins list of a mesh with the same structure as a .skc entry, with array blocks.
+        """
+        skins_list = []
+        for skin_meta in self.meshes[mesh_name]:
+            skin_data = dict(skin_meta)
+            skin_data["sparse_weights"] = {inf_name: self.block(block, copy) for inf_name, block in skin_meta["sparse_weights"].items()}
+            skin_data["sparse_blend"] = self.block(skin_meta["sparse_blend"], copy) if skin_meta["sparse_blend"] else {}
+            skins_list.append(skin_data)
+        return skins_list
+
+    def to_dict(self, copy=False):
+        """
+        Returns the whole file with the .skc structure {mesh_name: [skin_entry, ...]}.
+        """
+        return {mesh_name: self.skins(mesh_name, copy) for mesh_name in self.meshes}
+
+
+def read_skcb(path):
+    """
+    Reads a .skcb file into the .skc dictionary structure (ix/vw blocks are NumPy arrays).
+    The blocks are copies and the file is unmapped before returning, so it can be overwritten right away.
+    """
+    with SkcbReader(path) as reader:
+        return reader.to_dict(copy=True)
+
+
+def convert_skc_to_skcb(skc_path, out_path=None, weight_format="float32"):
+    """
+    Converts a .skc JSON file into a .skcb binary file next to it.
+
+    Args:
+        skc_path (str): The .skc file.
+        out_path (str, optional): Destination file. Defaults to the same name with .skcb extension.
+        weight_format (str): "float32" or "uint16".
+
+    Returns:
+        str: The written path.
+    """
+    if out_path is None:
+        out_path = os.path.splitext(skc_path)[0] + BINARY_EXT
+
+    with open(skc_path, "r") as f:
+        full_data = json.load(f)
+
+    return write_skcb(out_path, full_data, weight_format=weight_format)
+
+
+def convert_assets(assets_path=None, weight_format="float32", overwrite=False):
+    """
+    Converts every assets/*/skin_clusters/*.skc file into .skcb.
+
+    Args:
+        assets_path (str, optional): The assets folder. Defaults to the repository assets folder.
+        weight_format (str): "float32" or "uint16".
+        overwrite (bool): Convert again files that already have a .skcb.
+
+    Returns:
+        list: The written paths.
+    """
+    if assets_path is None:
+        complete_path = os.path.realpath(__file__)
+        sep_token = os.sep + "scripts"
+        if sep_token in complete_path:
+            relative_path = complete_path.split(sep_token)[0]
+        else:
+            relative_path = os.path.dirname(os.path.dirname(os.path.dirname(complete_path)))
+        assets_path = os.path.join(relative_path, "assets")
+
+    written = []
+    for skc_path in sorted(glob.glob(os.path.join(assets_path, "*", "skin_clusters", "*.skc"))):
+        out_path = os.path.splitext(skc_path)[0] + BINARY_EXT
+        if os.path.exists(out_path) and not overwrite:
+            continue
+        written.append(convert_skc_to_skcb(skc_path, out_path, weight_format=weight_format))
+        print(f"Converted: {skc_path} -> {out_path}")
+
+    return written
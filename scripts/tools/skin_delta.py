@@ -0,0 +1,405 @@
+import os
+import re
+import glob
+import json
+import numpy as np
+
+from tools import skin_binary
+
+# -----------------------------------------------------------------------------
+# VERSIONES DELTA DE PESOS (.skcd)
+# -----------------------------------------------------------------------------
+# Un .skcd guarda solo lo que cambia respecto a una versión base (.skc, .skcb u otro .skcd):
+#   {"format": "skcd", "base": "freya_v006.skc", "meshes": {mesh_name: [skin, ...]}}
+# Cada skin es:
+#   {"full": skin_entry}                      -> skin nuevo o con influencias/topología distintas
+#   {"delta": {"name", "attributes", "rows": [v, ...], "sparse_weights": {...}, ["sparse_blend": {...}]}}
+#       rows son los vértices que cambian; sus pesos completos nuevos están en sparse_weights.
+#       sparse_blend solo aparece si los blend weights cambian.
+# Tras keyframe_interval deltas encadenados se escribe una versión completa (keyframe) para acotar la
+# cadena, y también cuando el delta ocuparía más que la versión completa.
+#
+# Sobrescribir una versión (.skc, .skcd o .skcb del mismo nombre) cambiaría lo que reconstruyen los
+# deltas basados en ella: antes de escribir, detach_version() los convierte en keyframes, y después
+# remove_stale_encodings() borra las otras codificaciones de esa versión.
+
+DELTA_EXT = ".skcd"
+SKC_EXT = ".skc"
+VERSION_EXTS = (SKC_EXT, DELTA_EXT, skin_binary.BINARY_EXT)
+KEYFRAME_INTERVAL = 5
+_VERSION_RE = re.compile(r"_v(\d+)$")
+
+
+# ----------------------------------------------------------------
+# --- LECTURA ---
+# ----------------------------------------------------------------
+def load_full(path, _cache=None):
+    """
+    Returns the full {mesh_name: [skin_entry, ...]} data of any skin version file (.skc, .skcb or .skcd).
+    Delta files are reconstructed by walking their base chain.
+    """
+    if _cache is not None and path in _cache:
+        return _cache[path]
+
+    if path.endswith(DELTA_EXT):
+        with open(path, "r") as f:
+            delta_data = json.load(f)
+        base_path = os.path.join(os.path.dirname(path), delta_data["base"])
+        full_data = apply_delta(load_full(base_path, _cache), delta_data)
+    elif path.endswith(skin_binary.BINARY_EXT):
+        full_data = skin_binary.read_skcb(path)
+    else:
+        with open(path, "r") as f:
+            full_data = json.load(f)
+
+    if _cache is not None:
+        _cache[path] = full_data
+    return full_data
+
+
+def chain_length(path):
+    """
+    Number of delta files between a version and its keyframe (0 for a full file).
+    """
+    length = 0
+    while path.endswith(DELTA_EXT):
+        with open(path, "r") as f:
+            base = json.load(f)["base"]
+        path = os.path.join(os.path.dirname(path), base)
+        length += 1
+    return length
+
+
+def keyframe_of(path):
+    """
+    Returns the full (keyframe) file a version is ultimately based on.
+    """
+    while path.endswith(DELTA_EXT):
+        with open(path, "r") as f:
+            base = json.load(f)["base"]
+        path = os.path.join(os.path.dirname(path), base)
+    return path
+
+
+# ----------------------------------------------------------------
+# --- DENSE HELPERS ---
+# ----------------------------------------------------------------
+def _dense(skin_entry):
+    num_verts = skin_entry["vertex_count"]
+    inf_map = {name: i for i, name in enumerate(skin_entry["influences"])}
+    dense = np.zeros((num_verts, len(inf_map)), dtype=np.float64)
+    for inf_name, block in skin_entry.get("sparse_weights", {}).items():
+        dense[np.asarray(block["ix"], dtype=np.intp), inf_map[inf_name]] = block["vw"]
+    return dense
+
+
+def _dense_blend(skin_entry):
+    blend = np.zeros(skin_entry["vertex_count"], dtype=np.float64)
+    block = skin_entry.get("sparse_blend") or {}
+    if block:
+        blend[np.asarray(block["ix"], dtype=np.intp)] = block["vw"]
+    return blend
+
+
+def _sparse(dense, influences, rows=None):
+    """
+    Sparse {influence: {"ix", "vw"}} of a dense matrix, optionally restricted to some rows.
+    """
+    if rows is not None:
+        dense = dense[rows]
+    inf_ids, row_ids = np.nonzero(dense.T)
+    values = dense.T[inf_ids, row_ids]
+    vtx_ids = rows[row_ids] if rows is not None else row_ids
+    bounds = np.searchsorted(inf_ids, np.arange(len(influences) + 1))
+
+    sparse = {}
+    for inf_idx, inf_name in enumerate(influences):
+        start, end = bounds[inf_idx], bounds[inf_idx + 1]
+        if start != end:
+            sparse[inf_name] = {"ix": vtx_ids[start:end].tolist(), "vw": values[start:end].tolist()}
+    return sparse
+
+
+def _sparse_blend(blend):
+    ix = np.flatnonzero(blend)
+    return {"ix": ix.tolist(), "vw": blend[ix].tolist()} if ix.size else {}
+
+
+def _plain(skin_entry):
+    """
+    Copy of a skin entry with plain lists (.skcb entries hold NumPy arrays).
+    """
+    entry = dict(skin_entry)
+    entry["sparse_weights"] = {inf: {"ix": np.asarray(b["ix"]).tolist(), "vw": np.asarray(b["vw"], dtype=np.float64).tolist()}
+                               for inf, b in skin_entry.get("sparse_weights", {}).items()}
+    blend = skin_entry.get("sparse_blend") or {}
+    entry["sparse_blend"] = {"ix": np.asarray(blend["ix"]).tolist(), "vw": np.asarray(blend["vw"], dtype=np.float64).tolist()} if blend else {}
+    return entry
+
+
+# ----------------------------------------------------------------
+# --- ENCODE / DECODE ---
+# ----------------------------------------------------------------
+def make_delta(base_data, new_data, base_name):
+    """
+    Builds the delta dictionary that turns base_data into new_data.
+
+    Args:
+        base_data (dict): Full data of the base version.
+        new_data (dict): Full data of the new version.
+        base_name (str): File name of the base version (same folder).
+
+    Returns:
+        dict: The .skcd document.
+    """
+    meshes = {}
+    for mesh_name, skins_list in new_data.items():
+        base_skins = {skin["name"]: skin for skin in base_data.get(mesh_name, [])}
+        mesh_entries = []
+
+        for skin_entry in skins_list:
+            base_entry = base_skins.get(skin_entry["name"])
+            if (base_entry is None or base_entry["vertex_count"] != skin_entry["vertex_count"]
+                    or list(base_entry["influences"]) != list(skin_entry["influences"])):
+                mesh_entries.append({"full": _plain(skin_entry)})
+                continue
+
+            new_dense = _dense(skin_entry)
+            rows = np.flatnonzero(np.any(new_dense != _dense(base_entry), axis=1))
+            delta = {
+                "name": skin_entry["name"],
+                "attributes": skin_entry.get("attributes", {}),
+                "rows": rows.tolist(),
+                "sparse_weights": _sparse(new_dense, skin_entry["influences"], rows)
+            }
+
+            new_blend = _dense_blend(skin_entry)
+            if not np.array_equal(new_blend, _dense_blend(base_entry)):
+                delta["sparse_blend"] = _sparse_blend(new_blend)
+
+            mesh_entries.append({"delta": delta})
+
+        meshes[mesh_name] = mesh_entries
+
+    return {"format": "skcd", "base": base_name, "meshes": meshes}
+
+
+def apply_delta(base_data, delta_data):
+    """
+    Reconstructs the full data of a version from its base data and its delta document.
+    """
+    full_data = {}
+    for mesh_name, mesh_entries in delta_data["meshes"].items():
+        base_skins = {skin["name"]: skin for skin in base_data.get(mesh_name, [])}
+        skins_list = []
+
+        for mesh_entry in mesh_entries:
+            if "full" in mesh_entry:
+                skins_list.append(mesh_entry["full"])
+                continue
+
+            delta = mesh_entry["delta"]
+            base_entry = base_skins[delta["name"]]
+            influences = list(base_entry["influences"])
+            inf_map = {name: i for i, name in enumerate(influences)}
+
+            dense = _dense(base_entry)
+            dense[np.asarray(delta["rows"], dtype=np.intp)] = 0.0
+            for inf_name, block in delta["sparse_weights"].items():
+                dense[np.asarray(block["ix"], dtype=np.intp), inf_map[inf_name]] = block["vw"]
+
+            if "sparse_blend" in delta:
+                sparse_blend = delta["sparse_blend"]
+            else:
+                sparse_blend = _sparse_blend(_dense_blend(base_entry))
+
+            skins_list.append({
+                "name": delta["name"],
+                "vertex_count": base_entry["vertex_count"],
+                "attributes": delta.get("attributes", {}),
+                "influences": influences,
+                "sparse_weights": _sparse(dense, influences),
+                "sparse_blend": sparse_blend
+            })
+
+        full_data[mesh_name] = skins_list
+
+    return full_data
+
+
+# ----------------------------------------------------------------
+# --- ESCRITURA ---
+# ----------------------------------------------------------------
+def write_version(stem_path, full_data, base_path=None, keyframe_interval=KEYFRAME_INTERVAL):
+    """
+    Writes a new skin version as a delta of base_path, or as a full keyframe (.skc) if there is no base,
+    the base chain already holds keyframe_interval deltas or the delta would be larger than the full file.
+
+    Args:
+        stem_path (str): Destination path without extension (e.g. .../freya_v009).
+        full_data (dict): Full data of the new version.
+        base_path (str, optional): Previous version file.
+        keyframe_interval (int): Maximum number of chained deltas before a keyframe is written.
+
+    Returns:
+        str: The written path.
+    """
+    stem_path = os.path.normpath(stem_path)
+    if base_path is not None:
+        base_path = os.path.normpath(base_path)
+        # Overwriting the base itself: it cannot be the base of its own delta (the reader would recurse)
+        if os.path.splitext(base_path)[0] == stem_path:
+            base_path = None
+
+    # The base may be one of the deltas turned into a keyframe
+    moved = detach_version(stem_path)
+    if base_path is not None:
+        base_path = moved.get(base_path, base_path)
+
+    full_text = json.dumps(full_data, separators=(',', ':'))
+    path, text = stem_path + SKC_EXT, full_text
+
+    if base_path is not None and os.path.exists(base_path) and chain_length(base_path) < keyframe_interval:
+        delta_data = make_delta(load_full(base_path), full_data, os.path.basename(base_path))
+        delta_text = json.dumps(delta_data, separators=(',', ':'))
+        # Many changed rows cost more as a delta than the full file, keep the smaller one
+        if len(delta_text) < len(full_text):
+            path, text = stem_path + DELTA_EXT, delta_text
+
+    with open(path, "w") as f:
+        f.write(text)
+
+    remove_stale_encodings(path)
+    return path
+
+
+def dependents(path):
+    """
+    Delta files of the same folder whose base is path.
+    """
+    folder, name = os.path.split(os.path.normpath(path))
+    found = []
+    for other in sorted(glob.glob(os.path.join(folder, f"*{DELTA_EXT}")), key=version_number):
+        with open(other, "r") as f:
+            if json.load(f)["base"] == name:
+                found.append(os.path.normpath(other))
+    return found
+
+
+def detach_version(stem_path):
+    """
+    Turns every delta based on any encoding of a version into a keyframe, so the version can be
+    overwritten or removed without changing what the other versions reconstruct.
+
+    Args:
+        stem_path (str): Version path without extension (e.g. .../freya_v006).
+
+    Returns:
+        dict: Old delta path -> keyframe path.
+    """
+    stem_path = os.path.normpath(stem_path)
+    moved = {}
+    for ext in VERSION_EXTS:
+        if not os.path.exists(stem_path + ext):
+            continue
+        for path in dependents(stem_path + ext):
+            # Other encodings of the same version are removed with it
+            if os.path.splitext(path)[0] != stem_path:
+                moved[path] = os.path.normpath(make_keyframe(path))
+    return moved
+
+
+def remove_stale_encodings(path):
+    """
+    Removes the other encodings (.skc, .skcd, .skcb) of the version just written to path, the version
+    catalog would otherwise pick the stale one on the version tie. Call detach_version first.
+
+    Returns:
+        list: The removed paths.
+    """
+    stem_path, written_ext = os.path.splitext(os.path.normpath(path))
+    removed = []
+    for ext in VERSION_EXTS:
+        if ext != written_ext and os.path.exists(stem_path + ext):
+            os.remove(stem_path + ext)
+            removed.append(stem_path + ext)
+    return removed
+
+
+def rebase(path, new_base=None, _cache=None):
+    """
+    Re-encodes a delta version against another base, by default the keyframe of its chain,
+    so it can be read with a single hop. The reconstructed content does not change.
+
+    Args:
+        path (str): The .skcd file.
+        new_base (str, optional): The new base file. Defaults to keyframe_of(path).
+
+    Returns:
+        str: The rewritten path.
+    """
+    if not path.endswith(DELTA_EXT):
+        return path
+
+    _cache = {} if _cache is None else _cache
+    new_base = keyframe_of(path) if new_base is None else new_base
+    full_data = load_full(path, _cache)
+
+    delta_data = make_delta(load_full(new_base, _cache), full_data, os.path.basename(new_base))
+    with open(path, "w") as f:
+        json.dump(delta_data, f, separators=(',', ':'))
+    return path
+
+
+def make_keyframe(path):
+    """
+    Turns a delta version into a full .skc keyframe. Deltas based on it keep working through the new file.
+
+    Returns:
+        str: The keyframe path.
+    """
+    if not path.endswith(DELTA_EXT):
+        return path
+
+    full_data = load_full(path)
+    keyframe_path = os.path.splitext(path)[0] + SKC_EXT
+    with open(keyframe_path, "w") as f:
+        json.dump(full_data, f, separators=(',', ':'))
+
+    # Redirigir los deltas que apuntaban al .skcd antes de borrarlo
+    old_name = os.path.basename(path)
+    for other in glob.glob(os.path.join(os.path.dirname(path), f"*{DELTA_EXT}")):
+        if other == path:
+            continue
+        with open(other, "r") as f:
+            delta_data = json.load(f)
+        if delta_data["base"] == old_name:
+            delta_data["base"] = os.path.basename(keyframe_path)
+            with open(other, "w") as f:
+                json.dump(delta_data, f, separators=(',', ':'))
+
+    os.remove(path)
+    return keyframe_path
+
+
+def compact_chain(folder):
+    """
+    Re-bases every delta of a skin_clusters folder directly onto its keyframe.
+
+    Returns:
+        list: The rewritten delta files.
+    """
+    deltas = sorted(glob.glob(os.path.join(folder, f"*{DELTA_EXT}")), key=version_number)
+    cache = {}
+    # Reconstruir todo antes de reescribir para no leer deltas ya re-basados a medias
+    for path in deltas:
+        load_full(path, cache)
+    return [rebase(path, _cache=cache) for path in deltas]
+
+
+def version_number(path):
+    """
+    Version number of a file named <asset>_vNNN.<ext>, -1 if it has none.
+    """
+    m = _VERSION_RE.search(os.path.splitext(os.path.basename(path))[0])
+    return int(m.group(1)) if m else -1
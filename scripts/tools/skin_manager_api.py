@@ -1,9 +1,16 @@
-import glob
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
 import maya.api.OpenMayaAnim as oma
 import os
 import json
+import time
+import numpy as np
+
+from tools import skin_binary
+from tools import skin_delta
+from tools import skin_stream
+from utils import version_catalog
+from utils import asset_store
 
 try:
     from utils import data_manager
@@ -23,35 +30,20 @@ class SkinManager(object):
 
     def get_latest_version_path(self):
         """
-        Escanea la carpeta skin_clusters y devuelve el path del archivo con la versión más alta.
+        Consulta el catálogo de versiones de la carpeta skin_clusters y devuelve el path del archivo con la versión más alta.
         Si no existe ninguno, devuelve la ruta para una v001 por defecto.
         """
         if not os.path.exists(self.folder_path):
             os.makedirs(self.folder_path)
             return os.path.join(self.folder_path, f"{self.asset_name}_v001{self.ext}")
 
-        pattern = f"{self.asset_name}_v*{self.ext}"
-        files = glob.glob(os.path.join(self.folder_path, pattern))
+        # A igual versión se prefiere el binario (.skcb), que se lee por mmap
+        exts = (self.ext, skin_delta.DELTA_EXT, skin_binary.BINARY_EXT)
+        latest_file = version_catalog.latest_version(self.folder_path, exts=exts, prefix=f"{self.asset_name}_v")
 
-        if not files:
+        if not latest_file:
             return os.path.join(self.folder_path, f"{self.asset_name}_v001{self.ext}")
 
-        highest_version = -1
-        latest_file = files[0]
-
-        for f in files:
-            try:
-                filename = os.path.basename(f)
-                ver_part = filename.split("_v")[-1].split(self.ext)[0]
-                
-                if ver_part.isdigit():
-                    version_num = int(ver_part)
-                    if version_num > highest_version:
-                        highest_version = version_num
-                        latest_file = f
-            except (ValueError, IndexError):
-                continue
-
         return os.path.normpath(latest_file)
 
 
@@ -128,29 +120,115 @@ class SkinManager(object):
             om.MGlobal.displayWarning(f"Error recuperando geometría del skin: {e}")
             return []
 
+    # ----------------------------------------------------------------
+    # --- NUMPY HELPERS ---
+    # ----------------------------------------------------------------
+    def _to_numpy(self, m_array):
+        """
+        Convierte un MDoubleArray en un array de NumPy float64 con una sola copia en C.
+        (La API 2.0 no expone el buffer del MDoubleArray, así que no es posible una vista sin copia).
+        """
+        return np.fromiter(m_array, dtype=np.float64, count=len(m_array))
+
+    def _to_marray(self, np_array):
+        """
+        Convierte un array de NumPy en un MDoubleArray leyendo el array aplanado elemento a elemento,
+        sin pasar por una lista de Python (.tolist() duplicaría el pico de memoria con un float por peso).
+        """
+        return om.MDoubleArray(np.ascontiguousarray(np_array, dtype=np.float64).ravel())
+
+    def _sparse_weights(self, weights_marray, vtx_count, inf_names):
+        """
+        Extrae los pesos sparse {influencia: {"ix": [...], "vw": [...]}} de la matriz densa
+        (vértices x influencias) devuelta por getWeights, usando máscaras de NumPy.
+        El resultado es idéntico al recorrido vértice a vértice (mismo orden y mismo redondeo).
+        """
+        stride = len(inf_names)
+        if not stride or not vtx_count:
+            return {}
+
+        # Transpuesta para que np.nonzero devuelva los índices ordenados por influencia y luego por vértice
+        weights = self._to_numpy(weights_marray).reshape(vtx_count, stride).T
+        inf_ids, vtx_ids = np.nonzero(weights > self.tolerance)
+        values = weights[inf_ids, vtx_ids]
+
+        bounds = np.searchsorted(inf_ids, np.arange(stride + 1))
+
+        sparse_weights = {}
+        for inf_idx, inf_name in enumerate(inf_names):
+            start, end = bounds[inf_idx], bounds[inf_idx + 1]
+            if start == end:
+                continue
+            sparse_weights[inf_name] = {
+                "ix": vtx_ids[start:end].tolist(),
+                "vw": [round(val, 5) for val in values[start:end].tolist()]
+            }
+
+        return sparse_weights
+
+    def _sparse_blend(self, blend_weights_marray):
+        """
+        Extrae los blend weights (Dual Quaternion) sparse {"ix": [...], "vw": [...]} usando máscaras de NumPy.
+        """
+        blend = self._to_numpy(blend_weights_marray)
+        b_indices = np.flatnonzero(blend > self.tolerance)
+        if not b_indices.size:
+            return {}
+
+        return {
+            "ix": b_indices.tolist(),
+            "vw": [round(val, 5) for val in blend[b_indices].tolist()]
+        }
+
+    def _dense_weights(self, sparse_data, scene_inf_map, num_verts, num_scene_infs):
+        """
+        Reconstruye la matriz densa (vértices x influencias de la escena) a partir de los pesos sparse
+        con un scatter de NumPy por influencia. Las influencias que no están en la escena se ignoran.
+        """
+        dense_weights = np.zeros((num_verts, num_scene_infs), dtype=np.float64)
+
+        for j_name, data_block in sparse_data.items():
+            scene_inf_idx = scene_inf_map.get(j_name)
+            if scene_inf_idx is None: continue
+            dense_weights[np.asarray(data_block["ix"], dtype=np.intp), scene_inf_idx] = data_block["vw"]
+
+        return dense_weights
+
     # ----------------------------------------------------------------
     # --- EXPORT SKINS (Lógica Referencia: Sparse & Stack) ---
     # ----------------------------------------------------------------
-    def export_skins(self, in_path=None):
+    def export_skins(self, in_path=None, binary=False, weight_format="float32", delta=False, keyframe_interval=skin_delta.KEYFRAME_INTERVAL):
         """
         Exporta los pesos. Si in_path es None, genera una NUEVA versión 
         basada en la más alta encontrada para no sobrescribir.
+        Si binary es True (o in_path termina en .skcb) se escribe el formato binario .skcb.
+        Si delta es True la nueva versión solo guarda los vértices que cambian respecto a la anterior (.skcd),
+        con una versión completa tras keyframe_interval deltas encadenados. Los deltas solo se escriben
+        en JSON, así que binary y delta no se pueden combinar.
+        Al sobrescribir una versión, los deltas basados en ella pasan a ser versiones completas.
         """
+        current_latest = self.get_latest_version_path()
+        base_path = current_latest if os.path.exists(current_latest) else None
+
         if in_path:
             save_path = os.path.normpath(in_path)
         else:
             # Lógica para generar la SIGUIENTE versión al exportar
-            current_latest = self.get_latest_version_path()
             filename = os.path.basename(current_latest)
             
             try:
                 # Si existe v005, la nueva será v006
-                ver_str = filename.split("_v")[-1].split(self.ext)[0]
+                ver_str = os.path.splitext(filename)[0].split("_v")[-1]
                 new_version = int(ver_str) + 1
             except:
                 new_version = 1
-                
-            save_path = os.path.join(self.folder_path, f"{self.asset_name}_v{new_version:03d}{self.ext}")
+
+            ext = skin_binary.BINARY_EXT if binary else self.ext
+            save_path = os.path.join(self.folder_path, f"{self.asset_name}_v{new_version:03d}{ext}")
+
+        if delta and (binary or save_path.endswith(skin_binary.BINARY_EXT)):
+            om.MGlobal.displayError("Las versiones delta (.skcd) no tienen formato binario: usa binary o delta, no ambos.")
+            return
 
         self.json_path = save_path
         om.MGlobal.displayInfo(f"--- Exportando Skins a: {self.json_path} ---")
@@ -235,38 +313,13 @@ class SkinManager(object):
                 single_comp.setCompleteData(vtx_count)
                 
                 weights_marray, _ = mf_skin.getWeights(mesh_path, vertex_comp)
-                flat_weights = list(weights_marray)
-                
-                sparse_weights = {}
-                stride = len(inf_names)
-                
-                for inf_idx, inf_name in enumerate(inf_names):
-                    j_indices = []
-                    j_weights = []
-                    
-                    # Recorrer vértices para esta influencia
-                    for v_idx in range(vtx_count):
-                        val = flat_weights[v_idx * stride + inf_idx]
-                        if val > self.tolerance:
-                            j_indices.append(v_idx)
-                            j_weights.append(round(val, 5))
-                    
-                    if j_indices:
-                        sparse_weights[inf_name] = {"ix": j_indices, "vw": j_weights}
+                sparse_weights = self._sparse_weights(weights_marray, vtx_count, inf_names)
 
                 # --- Blend Weights (Dual Quaternion) ---
                 sparse_blend = {}
                 try:
                     blend_weights_marray = mf_skin.getBlendWeights(mesh_path, vertex_comp)
-                    flat_blend = list(blend_weights_marray)
-                    b_indices = []
-                    b_values = []
-                    for v_idx, val in enumerate(flat_blend):
-                        if val > self.tolerance:
-                            b_indices.append(v_idx)
-                            b_values.append(round(val, 5))
-                    if b_indices:
-                        sparse_blend = {"ix": b_indices, "vw": b_values}
+                    sparse_blend = self._sparse_blend(blend_weights_marray)
                 except: pass # Si no soporta blend weights, ignorar
                 
                 skin_entry = {
@@ -281,18 +334,39 @@ class SkinManager(object):
 
             full_data[mesh_name] = mesh_skins_data
 
-        with open(self.json_path, 'w') as f:
-            json.dump(full_data, f, separators=(',', ':')) # Separators comprime el JSON
+        stem_path = os.path.splitext(self.json_path)[0]
+        if delta:
+            self.json_path = skin_delta.write_version(stem_path, full_data, base_path=base_path, keyframe_interval=keyframe_interval)
+        else:
+            # Los deltas basados en la versión que se sobrescribe pasan a ser completos
+            skin_delta.detach_version(stem_path)
+            if self.json_path.endswith(skin_binary.BINARY_EXT):
+                skin_binary.write_skcb(self.json_path, full_data, weight_format=weight_format)
+            else:
+                with open(self.json_path, 'w') as f:
+                    json.dump(full_data, f, separators=(',', ':')) # Separators comprime el JSON
+            skin_delta.remove_stale_encodings(self.json_path)
             
+        version_catalog.invalidate(self.folder_path)
+        asset_store.commit_version(self.json_path)
         om.MGlobal.displayInfo(f"Export completado: {self.json_path}")
 
     # ----------------------------------------------------------------
     # --- IMPORT SKINS (Lógica Referencia: Reorder & Sparse) ---
     # ----------------------------------------------------------------
-    def import_skins(self, in_path=None):
+    def import_skins(self, in_path=None, meshes=None):
         """
-        Importa los pesos desde un archivo JSON (.skc).
+        Importa los pesos desde un archivo JSON (.skc) o binario (.skcb).
         Si in_path es None, busca automáticamente la versión más reciente.
+        El archivo se lee malla a malla (ver skin_stream), las mallas que no están en la escena
+        o que no están en 'meshes' se saltan sin decodificar sus pesos.
+
+        Args:
+            in_path (str, optional): Archivo a importar.
+            meshes (list, optional): Importar solo estas mallas (nombres del archivo).
+
+        Returns:
+            bool: True si el archivo se leyó completo, False si no existe o hubo errores de lectura.
         """
         # 1. Determinar la ruta de importación
         if in_path:
@@ -304,22 +378,16 @@ class SkinManager(object):
         # 2. Verificación de existencia
         if not os.path.exists(self.json_path):
             om.MGlobal.displayError(f"No se encontró el archivo de skin: {self.json_path}")
-            return
+            return False
 
-        # 3. Lectura del archivo
-        try:
-            with open(self.json_path, 'r') as f:
-                full_data = json.load(f)
-        except Exception as e:
-            om.MGlobal.displayError(f"Error al leer el JSON: {e}")
-            return
+        # 3. Lectura incremental del archivo. Al ser generadores, los errores de lectura salen durante
+        #    el bucle: _guard_stream los recoge para que un archivo corrupto no aborte el build
+        read_errors = []
+        mesh_stream = self._guard_stream(skin_stream.iter_skin_file(self.json_path, meshes=meshes), read_errors)
 
         om.MGlobal.displayInfo(f"--- Importando Skins de: {self.json_path} ---")
 
-        with open(self.json_path, 'r') as f:
-            data = json.load(f)
-
-        for mesh_name, skins_list in data.items():
+        for mesh_name, skins_list in mesh_stream:
             # Buscar Mesh en escena
             mesh_path = self._get_dag_path(mesh_name)
             if not mesh_path:
@@ -384,23 +452,17 @@ class SkinManager(object):
 
                 num_verts = target_vtx_count
                 num_scene_infs = len(scene_inf_names)
-                full_weight_list = [0.0] * (num_verts * num_scene_infs)
+                start_time = time.perf_counter()
                 
                 # --- Reconstruir Pesos SPARSE ---
                 sparse_data = skin_data.get("sparse_weights", {})
-                
-                for j_name, data_block in sparse_data.items():
-                    if j_name not in scene_inf_map: continue
-                    scene_inf_idx = scene_inf_map[j_name]
-                    indices = data_block["ix"]
-                    values = data_block["vw"]
-                    for v_idx, weight_val in zip(indices, values):
-                        flat_index = (v_idx * num_scene_infs) + scene_inf_idx
-                        full_weight_list[flat_index] = weight_val
+                dense_weights = self._dense_weights(sparse_data, scene_inf_map, num_verts, num_scene_infs)
                 
                 # Aplicar Pesos
                 m_influence_indices = om.MIntArray(list(range(num_scene_infs)))
-                final_weights = om.MDoubleArray(full_weight_list)
+                final_weights = self._to_marray(dense_weights)
+                buffer_mb = (dense_weights.nbytes * 2) / (1024.0 * 1024.0) # Matriz NumPy + MDoubleArray
+                del dense_weights
                 
                 single_comp = om.MFnSingleIndexedComponent()
                 vertex_comp = single_comp.create(om.MFn.kMeshVertComponent)
@@ -417,10 +479,12 @@ class SkinManager(object):
                 # Aplicar Blend Weights
                 sparse_blend = skin_data.get("sparse_blend", {})
                 if sparse_blend:
-                    full_blend = [0.0] * num_verts
-                    for v_idx, val in zip(sparse_blend["ix"], sparse_blend["vw"]):
-                        full_blend[v_idx] = val
-                    mf_skin.setBlendWeights(mesh_path, vertex_comp, om.MDoubleArray(full_blend))
+                    full_blend = np.zeros(num_verts, dtype=np.float64)
+                    full_blend[np.asarray(sparse_blend["ix"], dtype=np.intp)] = sparse_blend["vw"]
+                    mf_skin.setBlendWeights(mesh_path, vertex_comp, self._to_marray(full_blend))
+
+                elapsed = time.perf_counter() - start_time
+                om.MGlobal.displayInfo(f"{skin_name}: {num_verts} vtx x {num_scene_infs} infs | {elapsed:.3f}s | pico buffers {buffer_mb:.1f} MB")
 
                 processed_skins.append(skin_name)
 
@@ -440,8 +504,41 @@ class SkinManager(object):
                 for skin in reversed(desired_order):
                     try: cmds.reorderDeformers(skin, mesh_path.fullPathName(), back=True)
                     except: pass
+
+        if read_errors:
+            om.MGlobal.displayError(f"Error al leer {self.json_path}, importación incompleta: {read_errors[0]}")
+            return False
         
         om.MGlobal.displayInfo("Importación completada con éxito.")
+        return True
+
+    def _guard_stream(self, mesh_stream, errors):
+        """
+        Wraps skin_stream.iter_skin_file so parse errors of a malformed or truncated file, raised while
+        iterating meshes or their skins, end the iteration and are appended to errors instead of escaping.
+        """
+        def guarded_skins(skins_list):
+            try:
+                for skin_data in skins_list:
+                    yield skin_data
+            except (ValueError, KeyError, OSError) as e:
+                errors.append(e)
+
+        try:
+            for mesh_name, skins_list in mesh_stream:
+                yield mesh_name, guarded_skins(skins_list)
+                if errors:
+                    return
+        except (ValueError, KeyError, OSError) as e:
+            errors.append(e)
+
+    def compact_skin_versions(self):
+        """
+        Re-basa todas las versiones delta (.skcd) de la carpeta directamente sobre su keyframe.
+        """
+        rewritten = skin_delta.compact_chain(self.folder_path)
+        om.MGlobal.displayInfo(f"Cadena compactada: {len(rewritten)} versiones delta re-basadas.")
+        return rewritten
 
     def find_mesh_in_scene(self, name):
         """Helper para fallback de búsqueda."""
@@ -0,0 +1,202 @@
+import re
+import json
+
+from tools import skin_binary
+from tools import skin_delta
+
+# -----------------------------------------------------------------------------
+# LECTOR INCREMENTAL DE .skc
+# -----------------------------------------------------------------------------
+# Un .skc es un JSON {mesh_name: [skin_entry, ...]}. En lugar de cargar el documento entero,
+# el lector recorre el fichero por bloques y decodifica un skin_entry cada vez. Las mallas que
+# no interesan se saltan escaneando los corchetes sin crear ningún objeto Python, así que el
+# pico de memoria queda acotado por el skinCluster más grande, no por el fichero.
+
+_TOKEN_RE = re.compile(r'["\[\]{}]')
+_STRING_END_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_WHITESPACE_RE = re.compile(r'\s*')
+
+CHUNK_SIZE = 1 << 20
+
+
+class SkcStreamReader(object):
+    """
+    Incremental reader of a .skc file.
+    Yields (mesh_name, skins) pairs where skins is a lazy iterator of skin entries.
+    The skins of a mesh must be consumed before moving to the next mesh, the ones left are skipped.
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._file = None
+        self.buf = ""
+        self.pos = 0
+
+    # ----------------------------------------------------------------
+    # --- BUFFER ---
+    # ----------------------------------------------------------------
+    def _fill(self):
+        """
+        Reads the next chunk, dropping everything before self.pos.
+        Returns the shift applied to the buffer indices.
+        """
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            raise ValueError(f"Unexpected end of file: {self.path}")
+        shift = self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return shift
+
+    def _peek(self):
+        while True:
+            m = _WHITESPACE_RE.match(self.buf, self.pos)
+            self.pos = m.end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            self._fill()
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} in {self.path}")
+        self.pos += 1
+
+    def _read_string(self):
+        self._expect('"')
+        while True:
+            m = _STRING_END_RE.match(self.buf, self.pos)
+            if m:
+                value = json.loads(self.buf[self.pos - 1:m.end()])
+                self.pos = m.end()
+                return value
+            self.pos -= 1 # Keep the opening quote in the buffer
+            self._fill()
+            self.pos += 1
+
+    def _scan(self, depth=0, keep=True):
+        """
+        Finds the end of the container starting at self.pos (or the end of the current one if depth is 1).
+
+        Args:
+            depth (int): Nesting depth at self.pos.
+            keep (bool): If False the scanned text is dropped and self.pos is moved to the end.
+
+        Returns:
+            int: Buffer index right after the container.
+        """
+        i = self.pos
+        while True:
+            m = _TOKEN_RE.search(self.buf, i)
+            if m is None:
+                if not keep:
+                    self.pos = len(self.buf)
+                i = len(self.buf) - self._fill()
+                continue
+
+            j = m.start()
+            char = m.group()
+
+            if char == '"':
+                end = _STRING_END_RE.match(self.buf, j + 1)
+                if end is None:
+                    if not keep:
+                        self.pos = j
+                    i = j - self._fill()
+                    continue
+                i = end.end()
+                continue
+
+            depth += 1 if char in "[{" else -1
+            i = j + 1
+
+            if depth == 0:
+                if not keep:
+                    self.pos = i
+                return i
+
+    # ----------------------------------------------------------------
+    # --- ITERACIÓN ---
+    # ----------------------------------------------------------------
+    def _iter_skins(self, state):
+        while True:
+            char = self._peek()
+            if char == "]":
+                self.pos += 1
+                state["done"] = True
+                return
+            if char == ",":
+                self.pos += 1
+                continue
+
+            end = self._scan()
+            skin_data = json.loads(self.buf[self.pos:end])
+            self.pos = end
+            yield skin_data
+
+            if state["stale"]:
+                raise RuntimeError("The skins of a mesh must be consumed before moving to the next mesh.")
+
+    def iter_meshes(self, meshes=None):
+        """
+        Yields (mesh_name, skins) for every mesh in the file.
+
+        Args:
+            meshes (list, optional): Only these meshes are yielded, the rest are skipped without decoding.
+        """
+        wanted = set(meshes) if meshes is not None else None
+
+        with open(self.path, "r", encoding="utf-8") as self._file:
+            self.buf = ""
+            self.pos = 0
+            self._expect("{")
+
+            while True:
+                char = self._peek()
+                if char == "}":
+                    return
+                if char == ",":
+                    self.pos += 1
+                    continue
+
+                mesh_name = self._read_string()
+                self._expect(":")
+                self._peek()
+
+                if wanted is not None and mesh_name not in wanted:
+                    self._scan(keep=False)
+                    continue
+
+                self._expect("[")
+                state = {"done": False, "stale": False}
+                yield mesh_name, self._iter_skins(state)
+
+                if not state["done"]:
+                    state["stale"] = True
+                    self._scan(depth=1, keep=False)
+
+
+def iter_skin_file(path, meshes=None):
+    """
+    Yields (mesh_name, skins) from a .skc or .skcb file without loading the whole document.
+    Delta versions (.skcd) are reconstructed in memory first.
+
+    Args:
+        path (str): The skin file.
+        meshes (list, optional): Only these meshes are yielded.
+    """
+    if path.endswith(skin_delta.DELTA_EXT):
+        for mesh_name, skins in skin_delta.load_full(path).items():
+            if meshes is not None and mesh_name not in meshes:
+                continue
+            yield mesh_name, iter(skins)
+    elif path.endswith(skin_binary.BINARY_EXT):
+        # Copied per mesh: the file is unmapped when the stream ends and no view may keep it open
+        with skin_binary.SkcbReader(path) as reader:
+            for mesh_name in reader.mesh_names():
+                if meshes is not None and mesh_name not in meshes:
+                    continue
+                yield mesh_name, iter(reader.skins(mesh_name, copy=True))
+    else:
+        for mesh_name, skins in SkcStreamReader(path).iter_meshes(meshes=meshes):
+            yield mesh_name, skins
@@ -1,19 +1,63 @@
+import importlib
+from functools import partial
+
 import maya.cmds as cmds
-from importlib import reload
 
-from tools import skin_manager_api
-from utils import curve_tool
-from utils import rig_manager
-from utils import guides_manager
-from utils import create_rig
+# -----------------------------------------------------------------------------
+# MENÚ AUTORIG
+# -----------------------------------------------------------------------------
+# El menú se dibuja desde una descripción estática: ningún módulo del rig se importa al arrancar
+# Maya. Cada comando importa su módulo la primera vez que se pulsa (_load) y solo lo recarga en
+# modo desarrollo (module_registry.enable_hot_reload()).
+#
+# Entrada: {"label", "command" (función de este módulo), "image", opciones de cmds.menuItem}
+# Submenú: {"label", "image", "items": (...)}
+# DIVIDER: separador
+
+DIVIDER = None
+
+MENU = (
+    # --- BOTÓN RELOAD ---
+    {"label": "Reload UI", "command": "rebuild_ui", "image": "refresh.png"},
+    DIVIDER,
+
+    # --- ASSET MANAGER ---
+    {"label": "Asset Manager", "image": "fileOpen.png", "items": (
+        {"label": "Create New Asset", "command": "create_new_asset", "image": "newLayerEmpty.png"},
+    )},
+
+    # --- GUIDES MANAGER ---
+    {"label": "Guides Manager", "image": "locator.png", "items": (
+        {"label": "Create New Guides", "command": "create_new_guides", "image": "confirm.png"},
+        {"label": "Import Guides", "command": "import_guides", "image": "move_M.png"},
+        {"label": "Export Guides", "command": "export_guides", "image": "copySelected.png"},
+    )},
+
+    # --- CONTROLLERS MANAGER ---
+    {"label": "Controllers Manager", "image": "circle.png", "items": (
+        {"label": "Export All Controllers", "command": "export_all_controllers", "image": "save.png"},
+        {"label": "Mirror Controllers", "command": "mirror_controllers", "image": "polyMirror.png"},
+        {"label": "Library", "command": "open_library", "image": "tab_library.png"},
+        {"label": "Replace Shapes", "command": "replace_shapes", "image": "swap.png"},
+    )},
+
+    # --- SKIN CLUSTER MANAGER ---
+    {"label": "Skin Cluster Manager", "image": "paintSkinWeights.png", "items": (
+        {"label": "Export Skin Cluster", "command": "export_skin_cluster", "image": "export.png"},
+        {"label": "Import Skin Cluster", "command": "import_skin_cluster", "image": "import.png"},
+    )},
+    DIVIDER,
+
+    # --- BOTÓN RESALTADO: CREAR RIG ---
+    {"label": "CREAR RIG", "command": "rig", "image": "kinJoint.png", "boldFont": True},
+    {"label": "ACTUALIZAR RIG", "command": "update_rig", "image": "refresh.png"},
+
+    # ---- BOTÓN DE CHARACTER MANAGER UI ---
+    {"label": "Character Manager", "command": "show_character_manager_ui", "image": "characterMap.png"},
+)
 
-reload(skin_manager_api)
-reload(curve_tool)
-reload(rig_manager)
-reload(guides_manager)
-reload(create_rig)
 
-def create_custom_menu():
+def create_custom_menu(menu=MENU):
     menu_id = "autorig_menu"
     menu_label = "AutoRig Tools Laia"
 
@@ -22,83 +66,73 @@ def create_custom_menu():
 
     # Creamos el menú principal
     cmds.menu(menu_id, label=menu_label, parent='MayaWindow', tearOff=True)
+    _add_items(menu)
 
-    # --- BOTÓN RELOAD ---
-    # Icono de refrescar/flechas circulares
-    cmds.menuItem(label="Reload UI", command=lambda x: rebuild_ui(), image="refresh.png")
-    cmds.menuItem(divider=True)
 
-    # --- ASSET MANAGER ---
-    # Icono de carpeta o proyecto
-    cmds.menuItem(label="Asset Manager", subMenu=True, tearOff=True, image="fileOpen.png")
-    cmds.menuItem(label="Create New Asset", command=lambda x: create_new_asset(), image="newLayerEmpty.png")
-    cmds.setParent('..', menu=True)
+def _add_items(items):
+    for item in items:
+        if item is DIVIDER:
+            cmds.menuItem(divider=True)
+            continue
 
-    # --- GUIDES MANAGER ---
-    # Icono de ejes o locators
-    cmds.menuItem(label="Guides Manager", subMenu=True, tearOff=True, image="locator.png")
-    cmds.menuItem(label="Create New Guides", command=lambda x: create_new_guides(), image="confirm.png")
-    cmds.menuItem(label="Import Guides", command=lambda x: import_guides(), image="move_M.png")
-    cmds.menuItem(label="Export Guides", command=lambda x: export_guides(), image="copySelected.png")
-    cmds.setParent('..', menu=True)
+        options = {key: value for key, value in item.items() if key not in ("command", "items")}
+        if "items" in item:
+            cmds.menuItem(subMenu=True, tearOff=True, **options)
+            _add_items(item["items"])
+            cmds.setParent('..', menu=True)
+        else:
+            cmds.menuItem(command=partial(_run, item["command"]), **options)
 
-    # --- CONTROLLERS MANAGER ---
-    # Icono de círculo/curva para el gestor de controles
-    cmds.menuItem(label="Controllers Manager", subMenu=True, tearOff=True, image="circle.png")
-    cmds.menuItem(label="Export All Controllers", command=lambda x: export_all_controllers(), image="save.png")
-    cmds.menuItem(label="Mirror Controllers", command=lambda x: mirror_controllers(), image="polyMirror.png")
-    cmds.menuItem(label="Library", command=lambda x: open_library(), image="tab_library.png")
-    cmds.menuItem(label="Replace Shapes", command=lambda x: replace_shapes(), image="swap.png")
-    cmds.setParent('..', menu=True)
 
-    # --- SKIN CLUSTER MANAGER ---
-    # Icono de pesos/skinning
-    cmds.menuItem(label="Skin Cluster Manager", subMenu=True, tearOff=True, image="paintSkinWeights.png")
-    cmds.menuItem(label="Export Skin Cluster", command=lambda x: export_skin_cluster(), image="export.png")
-    cmds.menuItem(label="Import Skin Cluster", command=lambda x: import_skin_cluster(), image="import.png")
-    cmds.setParent('..', menu=True)
+def _run(command, *args):
+    # Looked up on click so "Reload UI" picks up the new functions
+    globals()[command]()
 
-    cmds.menuItem(divider=True)
 
-    # --- BOTÓN RESALTADO: CREAR RIG ---
-    cmds.menuItem(label="CREAR RIG", command=lambda x: rig(), boldFont=True, image="kinJoint.png")
+def _load(module_path):
+    """
+    Imports a module on first use. Reloads it only in developer hot-reload mode.
+    """
+    module = importlib.import_module(module_path)
+
+    from utils import module_registry
+    if module_registry.hot_reload_enabled():
+        module = importlib.reload(module)
+    return module
 
-    # ---- BOTÓN DE CHARACTER MANAGER UI ---
-    cmds.menuItem(label="Character Manager", command=lambda x: show_character_manager_ui(), image="characterMap.png")
 
 def rebuild_ui():
     from ui import auto_rig_UI
-    reload(auto_rig_UI)
+    importlib.reload(auto_rig_UI)
     auto_rig_UI.create_custom_menu()
 
 
 def create_new_asset():
-    from utils import rig_manager
-    reload(rig_manager)
+    rig_manager = _load("utils.rig_manager")
     rig_manager.create_new_asset()
     cmds.inViewMessage(amg='New Asset Created.', pos='midCenter', fade=True)
 
 def create_new_guides():
-    reload(guides_manager)
+    guides_manager = _load("utils.guides_manager")
     guides_manager.create_new_guides()
     cmds.inViewMessage(amg='New Guides Created.', pos='midCenter', fade=True)
 
 def import_guides():
-    reload(guides_manager)
+    guides_manager = _load("utils.guides_manager")
     guides_manager.load_guides_info()
 
 def export_guides():
-    reload(guides_manager)
+    guides_manager = _load("utils.guides_manager")
     guides_manager.get_guides_info()
     cmds.inViewMessage(amg='Guides Exportados.', pos='midCenter', fade=True)
 
 def export_all_controllers():
-    reload(curve_tool)
+    curve_tool = _load("utils.curve_tool")
     curve_tool.get_all_ctl_curves_data()
     cmds.inViewMessage(amg='Controladores Exportados.', pos='midCenter', fade=True)
 
 def mirror_controllers():
-    reload(curve_tool)
+    curve_tool = _load("utils.curve_tool")
     curve_tool.mirror_curves()
     cmds.inViewMessage(amg='Controladores Espejados.', pos='midCenter', fade=True)
 
@@ -109,26 +143,31 @@ def replace_shapes():
     print("Funcionalidad para reemplazar formas de controladores.")
 
 def export_skin_cluster():
-    reload(skin_manager_api)
+    skin_manager_api = _load("tools.skin_manager_api")
     skinner = skin_manager_api.SkinManager()
     skinner.export_skins()
     cmds.inViewMessage(amg='Skins Exportadas.', pos='midCenter', fade=True)
 
 def import_skin_cluster():
+    skin_manager_api = _load("tools.skin_manager_api")
     skinner = skin_manager_api.SkinManager()
-    reload(skin_manager_api)
     skinner.import_skins()
     cmds.inViewMessage(amg='Skins Importadas y Reordenadas.', pos='midCenter', fade=True)
 
 def rig():
     """Función para crear el rig bipedal"""
     cmds.file(new=True, force=True)
-    reload(create_rig)
+    create_rig = _load("utils.create_rig")
     rig = create_rig.AutoRig()
     rig.build()
 
+def update_rig():
+    """Reconstruye solo los módulos que cambiaron en la escena del rig actual"""
+    create_rig = _load("utils.create_rig")
+    rig = create_rig.AutoRig()
+    rig.update()
+
 def show_character_manager_ui():
-    from utils import character_manager
-    reload(character_manager)
+    character_manager = _load("utils.character_manager")
     pro_asset_manager = character_manager.AssetManagerUI()
-    pro_asset_manager.show()
\ No newline at end of file
+    pro_asset_manager.show()
@@ -0,0 +1,202 @@
+import numpy as np
+
+from utils import de_boor_core as core
+
+# -----------------------------------------------------------------------------
+# REPARAMETRIZACIÓN POR LONGITUD DE ARCO
+# -----------------------------------------------------------------------------
+# Tabla de longitud de arco de una B-spline construida solo con las posiciones de los CVs
+# (sin Maya). La curva se integra con Gauss-Legendre por tramos: cada tramo entre nudos se
+# subdivide hasta que la integral de un intervalo y la de sus dos mitades coinciden. La
+# búsqueda inversa (longitud -> parámetro) usa searchsorted sobre la tabla acumulada y unas
+# iteraciones de Newton vectorizadas, así que cientos de muestras se resuelven en una llamada.
+
+OPEN = 'open'
+PERIODIC = 'periodic'
+GAUSS_ORDER = 8
+MAX_REFINE = 24
+NEWTON_ITERATIONS = 8
+
+
+class ArcLengthTable(object):
+    """
+    Arc-length table of a uniform B-spline defined by CV positions.
+
+    import arc_length
+
+    table = arc_length.ArcLengthTable([(0, 0, 0), (1, 2, 0), (3, 2, 0), (4, 0, 0)], d=3)
+    table.length
+    table.params_from_fractions([i / 9 for i in range(10)])
+    """
+
+    def __init__(self, cv_positions, d, kv_type=OPEN, domain=None, tol=1e-9, gauss_order=GAUSS_ORDER, segments=1):
+        """
+        Args:
+            cv_positions (list): CV positions, (x, y, z) each. Periodic curves must not repeat the first CVs.
+            d (int): degree of the basis functions
+            kv_type (str): 'open' or 'periodic'
+            domain (tuple, optional): (start, end) parameter range measured by the table. Defaults to [0, 1]
+                for open curves and to one full loop starting at the first knot of the domain for periodic ones.
+            tol (float): relative tolerance of the length integral
+            gauss_order (int): Gauss-Legendre points per interval
+            segments (int): initial subdivisions of every knot span
+        """
+
+        self.d = d
+        self.kv_type = kv_type
+        self.tol = tol
+
+        self.kv, padded = core.knot_vector(kv_type, [tuple(p) for p in cv_positions], d)
+        self.kv = np.asarray(self.kv, dtype=np.float64)
+        self.points = np.asarray(padded, dtype=np.float64)
+        self.num_basis = len(padded)
+
+        if domain is None:
+            if kv_type == PERIODIC:
+                start = self.kv[d]
+                domain = (start, start + len(cv_positions) * (self.kv[d + 1] - self.kv[d]))
+            else:
+                domain = (0.0, 1.0)
+        self.domain = (float(domain[0]), float(domain[1]))
+
+        self.gauss_x, self.gauss_w = np.polynomial.legendre.leggauss(gauss_order)
+
+        self._build(segments)
+
+    # ----------------------------------------------------------------
+    # --- CURVA ---
+    # ----------------------------------------------------------------
+    def points_at(self, params):
+        """
+        Returns:
+            np.ndarray: len(params) x 3 curve positions.
+        """
+        wts = core.de_boor_batch(self.num_basis, self.d, np.ravel(params), self.kv)
+        return wts @ self.points
+
+    def speed(self, params):
+        """
+        Returns:
+            np.ndarray: |dC/dt| at every parameter.
+        """
+        params = np.asarray(params, dtype=np.float64)
+        _, d_wts = core.de_boor_batch(self.num_basis, self.d, params.ravel(), self.kv, derivative=True)
+        return np.linalg.norm(d_wts @ self.points, axis=1).reshape(params.shape)
+
+    def _integrate(self, a, b):
+        """
+        Gauss-Legendre length of every [a, b] interval, evaluated in a single basis pass.
+        """
+        half = 0.5 * (b - a)
+        nodes = (a + b)[:, None] * 0.5 + half[:, None] * self.gauss_x[None, :]
+        return half * (self.speed(nodes) @ self.gauss_w)
+
+    # ----------------------------------------------------------------
+    # --- TABLA ---
+    # ----------------------------------------------------------------
+    def _build(self, segments):
+        start, end = self.domain
+
+        # The curve is a polynomial inside each knot span, so spans are the natural starting intervals
+        knots = np.unique(self.kv[(self.kv > start) & (self.kv < end)])
+        breaks = np.concatenate(([start], knots, [end]))
+        if segments > 1:
+            steps = np.linspace(0.0, 1.0, segments + 1)[:-1]
+            breaks = np.concatenate([a + (b - a) * steps for a, b in zip(breaks[:-1], breaks[1:])] + [[end]])
+
+        a = breaks[:-1]
+        b = breaks[1:]
+        whole = self._integrate(a, b)
+
+        done_a, done_b, done_len = [], [], []
+        done_total = 0.0
+
+        for _ in range(MAX_REFINE):
+            mid = 0.5 * (a + b)
+            left = self._integrate(a, mid)
+            right = self._integrate(mid, b)
+
+            total = done_total + np.sum(left + right)
+            converged = np.abs(left + right - whole) <= self.tol * max(total, 1e-12)
+            done_total += np.sum(left[converged] + right[converged])
+
+            done_a.extend([a[converged], mid[converged]])
+            done_b.extend([mid[converged], b[converged]])
+            done_len.extend([left[converged], right[converged]])
+
+            if converged.all():
+                break
+
+            keep = ~converged
+            a = np.concatenate((a[keep], mid[keep]))
+            b = np.concatenate((mid[keep], b[keep]))
+            whole = np.concatenate((left[keep], right[keep]))
+        else:
+            done_a.append(a)
+            done_b.append(b)
+            done_len.append(whole)
+
+        a = np.concatenate(done_a)
+        order = np.argsort(a)
+        self.starts = a[order]
+        self.ends = np.concatenate(done_b)[order]
+        self.cumulative = np.concatenate(([0.0], np.cumsum(np.concatenate(done_len)[order])))
+        self.length = float(self.cumulative[-1])
+
+    def length_at(self, params):
+        """
+        Returns:
+            np.ndarray: arc length from the start of the domain to every parameter.
+        """
+        params = np.clip(np.asarray(params, dtype=np.float64), *self.domain)
+        idx = np.clip(np.searchsorted(self.starts, params, side='right') - 1, 0, len(self.starts) - 1)
+        return self.cumulative[idx] + self._integrate(self.starts[idx], params)
+
+    def params_from_lengths(self, lengths):
+        """
+        Inverse lookup: parameters at the given arc lengths (clamped to [0, length]).
+
+        Returns:
+            np.ndarray: one parameter per length.
+        """
+        lengths = np.clip(np.asarray(lengths, dtype=np.float64), 0.0, self.length)
+        idx = np.clip(np.searchsorted(self.cumulative, lengths, side='right') - 1, 0, len(self.starts) - 1)
+
+        a = self.starts[idx]
+        b = self.ends[idx]
+        local = lengths - self.cumulative[idx]
+        span_len = self.cumulative[idx + 1] - self.cumulative[idx]
+
+        # Linear guess inside the interval, then Newton on L(u) - s with L'(u) = |C'(u)|
+        params = a + (b - a) * np.divide(local, span_len, out=np.zeros_like(local), where=span_len > 0)
+        for _ in range(NEWTON_ITERATIONS):
+            error = self._integrate(a, params) - local
+            speed = self.speed(params)
+            step = np.divide(error, speed, out=np.zeros_like(error), where=speed > 1e-12)
+            params = np.clip(params - step, a, b)
+            if np.all(np.abs(error) <= self.tol * max(self.length, 1e-12)):
+                break
+
+        return params
+
+    def params_from_fractions(self, fractions):
+        """
+        Parameters at the given fractions (0..1) of the total length.
+        """
+        return self.params_from_lengths(np.asarray(fractions, dtype=np.float64) * self.length)
+
+
+def params_from_length(cv_positions, d, num_samples, kv_type=OPEN, domain=None, tol=1e-9):
+    """
+    import arc_length
+
+    arc_length.params_from_length([(0, 0, 0), (1, 2, 0), (3, 2, 0), (4, 0, 0)], 3, 10)
+
+    Parameters of num_samples points evenly spaced by arc length, from the start to the end of the domain.
+
+    Returns:
+        list: the parameters
+    """
+    table = ArcLengthTable(cv_positions, d, kv_type=kv_type, domain=domain, tol=tol)
+    fractions = np.linspace(0.0, 1.0, num_samples) if num_samples > 1 else np.zeros(1)
+    return table.params_from_fractions(fractions).tolist()
@@ -0,0 +1,173 @@
+import os
+import json
+import hashlib
+
+from maya.api import OpenMaya as om
+
+from utils import version_catalog
+
+# -----------------------------------------------------------------------------
+# ÍNDICE DE CONTENIDO DE LOS ASSETS
+# -----------------------------------------------------------------------------
+# assets/<char>/.store/manifest.json
+#     {"types": {asset_type: {"versions": {file_name: hash}, "stats": {file_name: [mtime_ns, size]}}},
+#      "builds": {step: {asset_type: hash}}}
+#
+# Las versiones siguen siendo los ficheros de assets/<char>/<type>/: Maya, el catálogo de
+# versiones y los importadores los abren directamente, así que no se guarda una segunda copia
+# del contenido. El manifest guarda el hash de cada versión (reutilizado mientras no cambien su
+# mtime y tamaño): un guardado con el mismo contenido que la última versión en disco no crea
+# fichero nuevo, y "¿ha cambiado?" se responde comparando hashes.
+#
+# Los exportadores registran lo que escriben con asset_store.commit_version(path).
+
+STORE_FOLDER = ".store"
+HASH_CHUNK = 1 << 20
+
+
+def hash_file(path):
+    """
+    Returns the sha256 hex digest of a file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AssetStore(object):
+    """
+    Content hashes of the version files of one asset folder (assets/<char>).
+    """
+
+    def __init__(self, asset_path):
+        self.asset_path = asset_path
+        self.store_path = os.path.join(asset_path, STORE_FOLDER)
+        self.manifest_path = os.path.join(self.store_path, "manifest.json")
+        self.manifest = self._load_manifest()
+
+    # ----------------------------------------------------------------
+    # --- MANIFEST ---
+    # ----------------------------------------------------------------
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"types": {}, "builds": {}}
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return {"types": {}, "builds": {}}
+
+    def _save_manifest(self):
+        os.makedirs(self.store_path, exist_ok=True)
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.manifest, f, indent=4)
+        os.replace(temp_path, self.manifest_path)
+
+    def _type_entry(self, asset_type):
+        return self.manifest["types"].setdefault(asset_type, {"versions": {}, "stats": {}})
+
+    # ----------------------------------------------------------------
+    # --- VERSIONES ---
+    # ----------------------------------------------------------------
+    def file_hash(self, asset_type, path):
+        """
+        Hash of a version file. Reuses the manifest hash while the file mtime and size are unchanged.
+        """
+        entry = self._type_entry(asset_type)
+        file_name = os.path.basename(path)
+        stat = os.stat(path)
+        stamp = [stat.st_mtime_ns, stat.st_size]
+
+        if entry["stats"].get(file_name) == stamp and file_name in entry["versions"]:
+            return entry["versions"][file_name]
+        return hash_file(path)
+
+    def latest_version(self, asset_type, exclude=None):
+        """
+        Path of the latest version on disk (version_catalog), optionally ignoring one file.
+        """
+        folder = os.path.join(self.asset_path, asset_type)
+        exclude = os.path.normpath(exclude) if exclude else None
+        for path in reversed(version_catalog.list_versions(folder)):
+            if os.path.normpath(path) != exclude:
+                return path
+        return None
+
+    def latest_hash(self, asset_type):
+        """
+        Hash of the latest version on disk of an asset type, None if there is none.
+        """
+        latest = self.latest_version(asset_type)
+        return self.file_hash(asset_type, latest) if latest else None
+
+    def is_duplicate(self, asset_type, path):
+        """
+        True if the file has the same content as the latest other version on disk.
+        """
+        previous = self.latest_version(asset_type, exclude=path)
+        if previous is None:
+            return False
+        return self.file_hash(asset_type, path) == self.file_hash(asset_type, previous)
+
+    def commit(self, asset_type, path):
+        """
+        Records the hash of a version file.
+
+        Args:
+            asset_type (str): Sub folder of the asset ("guides", "curves", "skin_clusters", "build"...).
+            path (str): The version file.
+
+        Returns:
+            str: The hash.
+        """
+        digest = self.file_hash(asset_type, path)
+
+        entry = self._type_entry(asset_type)
+        file_name = os.path.basename(path)
+        stat = os.stat(path)
+        entry["versions"][file_name] = digest
+        entry["stats"][file_name] = [stat.st_mtime_ns, stat.st_size]
+        self._save_manifest()
+
+        return digest
+
+    # ----------------------------------------------------------------
+    # --- BUILD ---
+    # ----------------------------------------------------------------
+    def has_changed(self, step, asset_types):
+        """
+        Check used by the build to skip steps: compares the latest hashes of the given asset types with the
+        ones recorded the last time the step was marked as built.
+        """
+        recorded = self.manifest["builds"].get(step)
+        if recorded is None:
+            return True
+        return any(recorded.get(asset_type) != self.latest_hash(asset_type) for asset_type in asset_types)
+
+    def mark_built(self, step, asset_types):
+        """
+        Records the current latest hashes of the given asset types for a build step.
+        """
+        self.manifest["builds"][step] = {asset_type: self.latest_hash(asset_type) for asset_type in asset_types}
+        self._save_manifest()
+
+
+def commit_version(path):
+    """
+    Records a version file written by an exporter (assets/<char>/<type>/<file>) in the store of its asset.
+    The store is only an index, so a failure here never fails the export.
+
+    Returns:
+        str: The hash, or None if the file could not be recorded.
+    """
+    if not path or not os.path.isfile(path):
+        return None
+    folder = os.path.dirname(os.path.abspath(path))
+    try:
+        return AssetStore(os.path.dirname(folder)).commit(os.path.basename(folder), path)
+    except (OSError, ValueError) as e:
+        om.MGlobal.displayWarning(f"Asset store could not record {path}: {e}")
+        return None
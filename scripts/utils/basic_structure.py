@@ -4,13 +4,7 @@ from utils import data_manager
 from utils import curve_tool
 from utils import rig_manager
 from utils import guides_manager
-from importlib import reload
 
-# Recarga de módulos para desarrollo
-reload(data_manager)
-reload(curve_tool)
-reload(rig_manager)
-reload(guides_manager)
 
 def lock_attributes(ctl, attrs):
     """Bloquea y oculta atributos en un controlador."""
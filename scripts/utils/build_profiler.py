@@ -0,0 +1,390 @@
+import os
+import sys
+import json
+import time
+import html
+import functools
+from contextlib import contextmanager
+
+import maya.cmds as cmds
+from maya.api import OpenMaya as om
+
+from utils import version_catalog
+
+# -----------------------------------------------------------------------------
+# PERFILADOR DE BUILD
+# -----------------------------------------------------------------------------
+# Opt-in: build_profiler.enable() y el siguiente build_rig() mide cada módulo y cada método
+# (load_guides, controllers_creation, de_boor_ribbon...) con tiempo real, tiempo de CPU, nodos
+# DG creados, conexiones hechas y llamadas a maya.cmds. Las secciones se anidan, así que cada
+# entrada es inclusiva y se identifica por su ruta ("jaw_module/JawModule.make/..."). El informe
+# se guarda en assets/<char>/profiles/<char>_profile_vNNN.json/.html junto a la carpeta build
+# y se compara con la ejecución anterior.
+#
+# from utils import build_profiler
+# build_profiler.enable()
+# ... CREAR RIG ...
+# build_profiler.disable()
+
+PROFILE_FOLDER = "profiles"
+METRICS = ("wall", "cpu", "nodes", "connections", "cmds_calls")
+
+# Functions of the utils modules profiled as methods when they are called from a rig module
+UTILITY_FUNCTIONS = {
+    "utils.ribbon": ("de_boor_ribbon",),
+    "utils.custom_ik_solver": ("triangle_solver",),
+    "utils.matrix_manager": ("space_switches", "fk_constraint", "ik_constraint"),
+    "utils.curve_tool": ("create_controller", "create_controllers", "get_closest_params"),
+    "utils.guides_manager": ("get_guides",),
+}
+
+# Estado del perfilador. Se recupera de globals() para sobrevivir a los reload().
+_STATE = globals().get("_STATE", {"enabled": False, "active": None})
+
+
+def enable():
+    """
+    Profiles every build_rig() call until disable() is called.
+    """
+    _STATE["enabled"] = True
+
+
+def disable():
+    _STATE["enabled"] = False
+
+
+def is_enabled():
+    return _STATE["enabled"]
+
+
+def active():
+    """
+    Returns the BuildProfiler of the running build, None if the build is not profiled.
+    """
+    return _STATE["active"]
+
+
+class BuildProfiler(object):
+    """
+    Collects nested section metrics while it is started. DG nodes and connections are counted with
+    MDGMessage callbacks (cmds and API creations alike), cmds calls by wrapping the maya.cmds functions.
+    """
+
+    def __init__(self, character_name):
+        self.character_name = character_name
+        self.entries = {}
+        self.order = []
+
+        self._counters = {"nodes": 0, "connections": 0, "cmds_calls": 0}
+        self._stack = []
+        self._callbacks = []
+        self._cmds_originals = {}
+        self._patched = []
+        self._start = None
+
+    # ----------------------------------------------------------------
+    # --- CONTADORES ---
+    # ----------------------------------------------------------------
+    def _on_node_added(self, *args):
+        self._counters["nodes"] += 1
+
+    def _on_connection(self, src_plug, dst_plug, made, *args):
+        if made:
+            self._counters["connections"] += 1
+
+    def _wrap_cmds(self):
+        counters = self._counters
+
+        def wrap(command):
+            @functools.wraps(command)
+            def counted(*args, **kwargs):
+                counters["cmds_calls"] += 1
+                return command(*args, **kwargs)
+            return counted
+
+        for command_name in dir(cmds):
+            command = getattr(cmds, command_name)
+            if command_name.startswith("_") or not callable(command):
+                continue
+            self._cmds_originals[command_name] = command
+            setattr(cmds, command_name, wrap(command))
+
+    def _snapshot(self):
+        return dict(self._counters, wall=time.perf_counter(), cpu=time.process_time())
+
+    def start(self):
+        self._callbacks = [
+            om.MDGMessage.addNodeAddedCallback(self._on_node_added, "dependNode"),
+            om.MDGMessage.addConnectionCallback(self._on_connection),
+        ]
+        self._wrap_cmds()
+        self._start = self._snapshot()
+
+    def stop(self):
+        """
+        Removes the callbacks, the cmds wrappers and every profiled method.
+        """
+        if self._callbacks:
+            om.MMessage.removeCallbacks(self._callbacks)
+            self._callbacks = []
+        for command_name, command in self._cmds_originals.items():
+            setattr(cmds, command_name, command)
+        self._cmds_originals = {}
+        for owner, attr, original, wrapper in reversed(self._patched):
+            # A reload() may have already replaced the wrapper with a fresh function
+            if getattr(owner, attr, None) is wrapper:
+                setattr(owner, attr, original)
+        self._patched = []
+
+    # ----------------------------------------------------------------
+    # --- SECCIONES ---
+    # ----------------------------------------------------------------
+    @contextmanager
+    def section(self, name):
+        """
+        Measures the block as a child of the current section. Repeated calls of the same path are accumulated.
+        """
+        path = "/".join(self._stack + [name])
+        self._stack.append(name)
+        begin = self._snapshot()
+        try:
+            yield
+        finally:
+            end = self._snapshot()
+            self._stack.pop()
+            entry = self.entries.get(path)
+            if entry is None:
+                entry = {"path": path, "name": name, "depth": path.count("/"), "calls": 0}
+                entry.update({metric: 0 for metric in METRICS})
+                self.entries[path] = entry
+                self.order.append(path)
+            entry["calls"] += 1
+            for metric in METRICS:
+                entry[metric] += end[metric] - begin[metric]
+
+    def _profiled(self, label, func):
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiler.section(label):
+                return func(*args, **kwargs)
+
+        wrapper._profiled_original = func
+        return wrapper
+
+    def _patch(self, owner, attr, label):
+        original = owner.__dict__.get(attr) if isinstance(owner, type) else getattr(owner, attr, None)
+        if original is None or getattr(original, "_profiled_original", None) is not None:
+            return
+        if isinstance(original, (staticmethod, classmethod)) or not callable(original):
+            return
+        wrapper = self._profiled(label, original)
+        setattr(owner, attr, wrapper)
+        self._patched.append((owner, attr, original, wrapper))
+
+    def instrument(self, *modules):
+        """
+        Profiles the methods of the classes defined in the given rig modules and the UTILITY_FUNCTIONS.
+        Called again after every reload() because reloading a module drops its wrappers.
+        """
+        for module in modules:
+            for cls in list(vars(module).values()):
+                if not isinstance(cls, type) or cls.__module__ != module.__name__:
+                    continue
+                for attr, value in list(vars(cls).items()):
+                    if attr.startswith("__") or not callable(value):
+                        continue
+                    self._patch(cls, attr, f"{cls.__name__}.{attr}")
+
+        for module_name, functions in UTILITY_FUNCTIONS.items():
+            module = sys.modules.get(module_name)
+            if module is None:
+                continue
+            for function in functions:
+                self._patch(module, function, f"{module_name.split('.')[-1]}.{function}")
+
+    # ----------------------------------------------------------------
+    # --- INFORME ---
+    # ----------------------------------------------------------------
+    def report(self):
+        """
+        Returns:
+            dict: {"character", "date", "total": {metric: value}, "sections": [entry, ...]} in execution order.
+        """
+        end = self._snapshot()
+        return {
+            "character": self.character_name,
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "total": {metric: end[metric] - self._start[metric] for metric in METRICS},
+            "sections": [self.entries[path] for path in self.order],
+        }
+
+
+# ----------------------------------------------------------------
+# --- API DEL BUILD ---
+# ----------------------------------------------------------------
+def start(character_name):
+    """
+    Starts a BuildProfiler for the build if profiling is enabled.
+
+    Returns:
+        BuildProfiler: The profiler, or None.
+    """
+    if not _STATE["enabled"]:
+        return None
+    profiler = BuildProfiler(character_name)
+    profiler.start()
+    _STATE["active"] = profiler
+    return profiler
+
+
+@contextmanager
+def section(name, *modules):
+    """
+    Profiles a block of the build (no-op when the build is not profiled). The given modules are
+    instrumented first, so their methods show up as children of the section.
+    """
+    profiler = _STATE["active"]
+    if profiler is None:
+        yield
+        return
+    profiler.instrument(*modules)
+    with profiler.section(name):
+        yield
+
+
+def finish(folder):
+    """
+    Stops the active profiler and writes its report to the given folder.
+
+    Returns:
+        dict: The report, or None if the build was not profiled.
+    """
+    profiler = _STATE["active"]
+    if profiler is None:
+        return None
+    _STATE["active"] = None
+    profiler.stop()
+
+    report = profiler.report()
+    try:
+        json_path, html_path = write_report(report, folder)
+        om.MGlobal.displayInfo(f"Build profile: {html_path}")
+    except OSError as e:
+        om.MGlobal.displayWarning(f"Build profile not written: {e}")
+
+    print_report(report)
+    return report
+
+
+def compare(report, previous):
+    """
+    Adds "previous" values to the sections and totals of a report, matched by section path.
+    """
+    if not previous:
+        return report
+    previous_sections = {entry["path"]: entry for entry in previous.get("sections", [])}
+    report["previous"] = {"date": previous.get("date"), "total": previous.get("total", {})}
+    for entry in report["sections"]:
+        old = previous_sections.get(entry["path"])
+        entry["previous"] = {metric: old.get(metric, 0) for metric in METRICS} if old else None
+    return report
+
+
+def write_report(report, folder):
+    """
+    Writes <char>_profile_vNNN.json and .html in the folder, compared against the latest previous profile.
+
+    Returns:
+        tuple: (json path, html path)
+    """
+    os.makedirs(folder, exist_ok=True)
+    base_name = f"{report['character']}_profile"
+
+    previous_path = version_catalog.latest_version(folder, exts=(".json",), prefix=f"{base_name}_v")
+    if previous_path:
+        try:
+            with open(previous_path, "r") as f:
+                compare(report, json.load(f))
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    json_path = version_catalog.next_version_path(folder, base_name, ".json")
+    html_path = os.path.splitext(json_path)[0] + ".html"
+
+    with open(json_path, "w") as f:
+        json.dump(report, f, indent=4)
+    with open(html_path, "w") as f:
+        f.write(report_to_html(report))
+
+    return json_path, html_path
+
+
+def _delta(value, previous, metric):
+    if previous is None:
+        return ""
+    diff = value - previous
+    if metric in ("wall", "cpu"):
+        return f"{diff:+.3f}"
+    return f"{diff:+d}"
+
+
+def _format(value, metric):
+    return f"{value:.3f}" if metric in ("wall", "cpu") else str(value)
+
+
+def report_to_html(report):
+    """
+    Returns a standalone HTML page with the sections indented by depth and the change against the previous run.
+    """
+    total_wall = report["total"]["wall"] or 1.0
+    previous_total = report.get("previous", {}).get("total", {})
+
+    header = "".join(f"<th>{metric}</th><th>&Delta;</th>" for metric in METRICS)
+    rows = []
+    total_cells = "".join(
+        f"<td>{_format(report['total'][metric], metric)}</td>"
+        f"<td>{_delta(report['total'][metric], previous_total.get(metric), metric)}</td>" for metric in METRICS)
+    rows.append(f"<tr class='total'><td>TOTAL</td><td></td><td>100%</td>{total_cells}</tr>")
+
+    for entry in report["sections"]:
+        previous = entry.get("previous")
+        cells = "".join(
+            f"<td>{_format(entry[metric], metric)}</td>"
+            f"<td>{_delta(entry[metric], previous[metric] if previous else None, metric)}</td>" for metric in METRICS)
+        share = 100.0 * entry["wall"] / total_wall
+        rows.append(
+            f"<tr><td style='padding-left:{entry['depth'] * 18 + 4}px'>{html.escape(entry['name'])}</td>"
+            f"<td>{entry['calls']}</td><td><div class='bar' style='width:{share:.1f}%'></div>{share:.1f}%</td>{cells}</tr>")
+
+    previous_date = report.get("previous", {}).get("date")
+    subtitle = f"Compared with {previous_date}" if previous_date else "No previous run"
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(report['character'])} build profile</title><style>"
+        "body{font-family:sans-serif;background:#2b2b2b;color:#ddd}table{border-collapse:collapse;font-size:12px}"
+        "td,th{padding:2px 8px;border-bottom:1px solid #444;text-align:right}td:first-child{text-align:left}"
+        "tr.total{font-weight:bold}.bar{display:inline-block;height:8px;background:#5a8;margin-right:4px}"
+        "</style></head><body>"
+        f"<h2>{html.escape(report['character'])} build profile</h2><p>{report['date']} | {subtitle}</p>"
+        f"<table><tr><th>section</th><th>calls</th><th>% wall</th>{header}</tr>{''.join(rows)}</table>"
+        "</body></html>"
+    )
+
+
+def print_report(report, max_depth=1):
+    """
+    Prints the sections up to max_depth in build order.
+    """
+    total = report["total"]
+    print(f"--- Build profile {report['character']}: {total['wall']:.2f} s wall, {total['cpu']:.2f} s cpu, "
+          f"{total['nodes']} nodes, {total['connections']} connections, {total['cmds_calls']} cmds calls ---")
+    for entry in report["sections"]:
+        if entry["depth"] > max_depth:
+            continue
+        previous = entry.get("previous")
+        delta = f" ({entry['wall'] - previous['wall']:+.2f} s)" if previous else ""
+        print(f"{'    ' * entry['depth']}{entry['name']}: {entry['wall']:.2f} s{delta}, {entry['nodes']} nodes, "
+              f"{entry['cmds_calls']} cmds calls")
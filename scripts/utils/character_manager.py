@@ -6,6 +6,8 @@ import webbrowser
 from tools import skin_manager_api
 from utils import curve_tool, guides_manager
 from utils import create_rig
+from utils import asset_store
+from utils import version_catalog
 import maya.cmds as cmds
 import maya.OpenMayaUI as omui
 from functools import partial
@@ -169,16 +171,7 @@ class VersionTab(QtWidgets.QWidget):
         ext = extension_map.get(self.sub_folder, ".ma")
 
         # 2. Lógica de incremento de versión (v001, v002...)
-        files = [f for f in os.listdir(self.full_path) if f.endswith(ext)]
-        version = 1
-        if files:
-            files.sort()
-            try:
-                last = files[-1]
-                if "_v" in last:
-                    ver_str = last.split("_v")[-1].split(".")[0]
-                    version = int(ver_str) + 1
-            except: pass
+        version = version_catalog.latest_version_number(self.full_path, exts=(ext,)) + 1
         
         # 3. Construir path final
         asset_name = os.path.basename(self.asset_path)
@@ -204,6 +197,20 @@ class VersionTab(QtWidgets.QWidget):
                 skinner = skin_manager_api.SkinManager()
                 skinner.export_skins(path=full_path)
 
+            version_catalog.invalidate(self.full_path)
+
+            # 5. Deduplicación: si el contenido es igual a la última versión en disco no se crea una nueva
+            if self.sub_folder != "models" and os.path.exists(full_path):
+                store = asset_store.AssetStore(self.asset_path)
+                if store.is_duplicate(self.sub_folder, full_path):
+                    os.remove(full_path)
+                    version_catalog.invalidate(self.full_path)
+                    cmds.inViewMessage(amg=f'<hl>{self.sub_folder.capitalize()}</hl> sin cambios, no se crea versión nueva.',
+                                       pos='midCenter', fade=True)
+                    self.refresh_list()
+                    return
+                store.commit(self.sub_folder, full_path)
+
             # Feedback de éxito
             cmds.inViewMessage(amg=f'<hl>{self.sub_folder.capitalize()}</hl> v{version:03d} Exported.', 
                                pos='midCenter', fade=True)
@@ -235,6 +242,11 @@ class VersionTab(QtWidgets.QWidget):
                 skinner = skin_manager_api.SkinManager()
                 skinner.export_skins(path=path)
 
+            # Sobrescrito en el sitio: el mtime de la carpeta no cambia y el hash de la versión sí
+            version_catalog.invalidate(self.full_path)
+            if self.sub_folder != "models":
+                asset_store.commit_version(path)
+
             # Feedback de éxito
             cmds.inViewMessage(amg=f'<hl>{self.sub_folder.capitalize()}</hl> {path} Exported.', 
                                pos='midCenter', fade=True)
@@ -1,59 +1,20 @@
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
-from importlib import reload
 
 # Utils
-from utils import guides_manager
 from utils import basic_structure
 from utils import data_manager
 from utils import rig_manager
-from utils import matrix_manager
+from utils import module_registry
+from utils import de_boor_core
+from utils import incremental_build
+from utils import asset_store
 from tools import skin_manager_api
 
-# Body mechanics
-from biped.autorig import arm_module_de_boor as arm_module
-from biped.autorig import spine_module as spine_module
-from biped.autorig import clavicle_module
-from biped.autorig import leg_module_de_boor as leg_module
-from biped.autorig import neck_module_de_boor as neck_module
-from biped.autorig import fingers_module
-
-# Facial
-from biped.autorig import eyebrow_module
-from biped.autorig import eyelid_module
-from biped.autorig import ear_module
-from biped.autorig import nose_module
-from biped.autorig import jaw_module
-from biped.autorig import cheekbone_module
-from biped.autorig import tongue_module
-from biped.autorig import teeth_module
-
-# Reload utils
-reload(guides_manager) 
-reload(basic_structure)
-reload(data_manager)
-reload(matrix_manager)
-reload(rig_manager)
-reload(skin_manager_api)
-
-# Reload body mechanics
-reload(arm_module)
-reload(spine_module)
-reload(leg_module)
-reload(neck_module)
-reload(fingers_module)
-reload(clavicle_module)
-
-# Reload facial
-reload(eyebrow_module)
-reload(eyelid_module)
-reload(ear_module)
-reload(nose_module)
-reload(jaw_module)
-reload(cheekbone_module)
-reload(tongue_module)
-reload(teeth_module)
+# Rig modules are imported on first use by module_registry, module_registry.enable_hot_reload() reloads them
 
+# Asset types read by import_weights, checked with asset_store to skip it when nothing changed
+SKIN_ASSET_TYPES = ("skin_clusters",)
 
 
 class AutoRig(object):
@@ -68,14 +29,53 @@ class AutoRig(object):
         Initialize the AutoRig class, setting up the basic structure and connecting UI elements.
         """
 
+        module_registry.hot_reload() # No-op unless module_registry.enable_hot_reload() was called
         data_manager.DataExportBiped().new_build()
-        
-        self.basic_structure()
-        self.make_rig()
-        self.label_joints()
-        self.hide_connections()
-        self.inherit_transforms()
-        self.import_weights()
+
+        try:
+            self.basic_structure()
+            self.make_rig()
+            self.label_joints()
+            self.hide_connections()
+            self.inherit_transforms()
+            self.import_weights()
+        finally:
+            data_manager.DataExportBiped().flush() # Single write of the build cache
+            de_boor_core.save_basis_cache() # No-op unless enable_basis_cache_persistence() was called
+
+    def update(self, force=(), dry_run=False):
+
+        """
+        Rebuild in the current rig scene only the modules whose guides, build settings or controller shapes
+        changed since the last build, then restore labels, connections and skin weights. With no module to
+        rebuild, the skin weights are imported again only if a newer skin version was saved.
+        """
+
+        module_registry.hot_reload()
+        char_name = rig_manager.get_character_name_from_build()
+
+        try:
+            rebuilt = incremental_build.rebuild_changed(char_name, force=force, dry_run=dry_run)
+            if rebuilt and not dry_run:
+                self.label_joints()
+                self.hide_connections()
+                self.inherit_transforms()
+                self.import_weights()
+            elif rebuilt is not None and not dry_run and self._store().has_changed("import_weights", SKIN_ASSET_TYPES):
+                # No module changed but a new skin version was saved since the weights were imported
+                self.import_weights()
+        finally:
+            data_manager.DataExportBiped().flush()
+            de_boor_core.save_basis_cache()
+
+        if rebuilt is not None and not dry_run:
+            cmds.inViewMessage(
+            amg=f'Updated <hl>{char_name.upper()} RIG</hl>: {len(rebuilt)} modules rebuilt.',
+            pos='midCenter',
+            fade=True,
+            alpha=0.8)
+
+        return rebuilt
 
     def basic_structure(self):
 
@@ -178,11 +178,17 @@ class AutoRig(object):
     def import_weights(self):
 
         """
-        Import skin weights for the rig after creation.
+        Import skin weights for the rig after creation. The step is only marked as built when the import
+        succeeded, so update() retries a missing or unreadable file.
         """
 
         skinner = skin_manager_api.SkinManager()
-        skinner.import_skins() # Import skin clusters after rig creation
+        if skinner.import_skins(): # Import skin clusters after rig creation
+            self._store().mark_built("import_weights", SKIN_ASSET_TYPES)
+
+    def _store(self):
+        char_name = rig_manager.get_character_name_from_build()
+        return asset_store.AssetStore(rig_manager.asset_path(char_name, ""))
 
     
     
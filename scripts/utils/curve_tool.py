@@ -3,6 +3,9 @@ import maya.api.OpenMaya as om
 import json
 import os
 
+from utils import de_boor_core
+from utils import asset_store
+
 # Intentamos importar tus utilidades. Si fallan, el script no se romperá inmediatamente,
 # pero necesitarás que existan para que funcione la lógica de rutas automática.
 try:
@@ -217,6 +220,7 @@ def get_all_ctl_curves_data(path=None, root_filter=None):
             
         with open(save_file_path, "w") as f:
             json.dump(ctl_data, f, indent=4)
+        asset_store.commit_version(save_file_path)
         
         om.MGlobal.displayInfo(f"Success: Curves saved to: {save_file_path}")
         
@@ -232,123 +236,178 @@ def get_all_ctl_curves_data(path=None, root_filter=None):
 # Opción B: Exportar SOLO faciales
 # get_all_ctl_curves_data(root_filter="face_setup_grp")
 
-def build_curves_from_template(target_transform_name=None):
+# Cache de plantillas de curvas: template_file -> {"stamp": (mtime_ns, size), "index": {name: [(path, data)]}}
+# Se recupera de globals() para sobrevivir a los reload() de los módulos.
+_TEMPLATE_CACHE = globals().get("_TEMPLATE_CACHE", {})
+
+def get_template_file(character_name=None):
     """
-    Builds controller curves from a predefined template JSON file.
-    If a specific target transform name is provided, it filters the curves to only create those associated with that transform.
-    If no target transform name is provided, it creates all curves defined in the template.
+    Returns the .curves template file used to build the controllers of a character.
+    Falls back to the generic assets/-/new/curves/new.curves file if the character has none.
     Args:
-        target_transform_name (str, optional): The name of the target transform to filter curves by. Defaults to None.
+        character_name (str, optional): The character name. Defaults to the current build character.
     Returns:
-        list: A list of created transform names.
+        str: The template file path.
     """
-    CHARACTER_NAME = rig_manager.get_character_name_from_build()
+    if character_name is None:
+        character_name = rig_manager.get_character_name_from_build()
 
-    # Set up the template file path
     complete_path = os.path.realpath(__file__)
     relative_path = complete_path.split("\scripts")[0]
     path = os.path.join(relative_path, "assets")
-    character_path = os.path.join(path, CHARACTER_NAME)
-    TEMPLATE_PATH = os.path.join(character_path, "curves")
-    last_version = rig_manager.get_latest_version(TEMPLATE_PATH)
-
-    TEMPLATE_FILE = os.path.join(TEMPLATE_PATH, f"{CHARACTER_NAME}_v001.curves")
-
+    TEMPLATE_PATH = os.path.join(path, character_name, "curves")
+    TEMPLATE_FILE = os.path.join(TEMPLATE_PATH, f"{character_name}_v001.curves")
 
     if not os.path.exists(TEMPLATE_FILE):
         TEMPLATE_FILE = os.path.join(path, "-", "new", "curves", "new.curves")
 
-    with open(TEMPLATE_FILE, "r") as f:
-        ctl_data = json.load(f)
+    return TEMPLATE_FILE
 
-    if target_transform_name:
-        ctl_data = {k: v for k, v in ctl_data.items() if v["transform"]["name"] == target_transform_name}
-        if not ctl_data:
-            return
+def get_template_index(template_file=None):
+    """
+    Parses a .curves template once into a name -> shape data index.
+    The file is parsed again only if its mtime or size changes.
+    Args:
+        template_file (str, optional): The template file. Defaults to get_template_file().
+    Returns:
+        dict: Transform short name -> list of (transform_path, data) tuples.
+    """
+    if template_file is None:
+        template_file = get_template_file()
 
-    created_transforms = []
+    stat = os.stat(template_file)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _TEMPLATE_CACHE.get(template_file)
+    if cached and cached["stamp"] == stamp:
+        return cached["index"]
 
+    with open(template_file, "r") as f:
+        ctl_data = json.load(f)
+
+    index = {}
     for transform_path, data in ctl_data.items():
-        transform_info = data["transform"]
-        shape_data_list = data["shapes"]
+        index.setdefault(data["transform"]["name"], []).append((transform_path, data))
 
-        dag_modifier = om.MDagModifier()
-        transform_obj = dag_modifier.createNode("transform")
-        dag_modifier.doIt()
+    _TEMPLATE_CACHE[template_file] = {"stamp": stamp, "index": index}
+    return index
 
-        transform_fn = om.MFnDagNode(transform_obj)
-        final_name = transform_fn.setName(transform_info["name"])
-        created_transforms.append(final_name)
+def clear_template_cache():
+    """
+    Clears the cached curve templates.
+    """
+    _TEMPLATE_CACHE.clear()
 
-        if transform_info["overrideEnabled"]:
-            fn_dep = om.MFnDependencyNode(transform_obj)
+def _build_controller_shapes(transform_info, shape_data_list):
+    """
+    Creates a transform with its NURBS curve shapes from the template data.
+    Args:
+        transform_info (dict): The "transform" block of the template.
+        shape_data_list (list): The "shapes" block of the template.
+    Returns:
+        str: The name of the created transform.
+    """
+    dag_modifier = om.MDagModifier()
+    transform_obj = dag_modifier.createNode("transform")
+    dag_modifier.doIt()
+
+    transform_fn = om.MFnDagNode(transform_obj)
+    final_name = transform_fn.setName(transform_info["name"])
+
+    if transform_info["overrideEnabled"]:
+        fn_dep = om.MFnDependencyNode(transform_obj)
+        fn_dep.findPlug('overrideEnabled', False).setBool(True)
+        fn_dep.findPlug('overrideColor', False).setInt(transform_info["overrideColor"])
+
+    form_flags = {
+        "open": om.MFnNurbsCurve.kOpen,
+        "closed": om.MFnNurbsCurve.kClosed,
+        "periodic": om.MFnNurbsCurve.kPeriodic
+    }
+
+    for shape_data in shape_data_list:
+        curve_info = shape_data["curve"]
+        cvs = curve_info["cvs"]
+        degree = curve_info["degree"]
+        knots = curve_info["knots"]
+        form = curve_info["form"]
+
+        form_flag = form_flags.get(form, om.MFnNurbsCurve.kOpen)
+
+        points = om.MPointArray()
+        for pt in cvs:
+            points.append(om.MPoint(pt[0], pt[1], pt[2]))
+
+        curve_fn = om.MFnNurbsCurve()
+        shape_obj = curve_fn.create(
+            points,
+            knots,
+            degree,
+            form_flag,
+            False,    
+            True,     
+            transform_obj
+        )
+
+        shape_fn = om.MFnDagNode(shape_obj)
+        shape_fn.setName(shape_data["name"])
+
+        if shape_data["overrideEnabled"]:
+            fn_dep = om.MFnDependencyNode(shape_obj)
             fn_dep.findPlug('overrideEnabled', False).setBool(True)
-            fn_dep.findPlug('overrideColor', False).setInt(transform_info["overrideColor"])
+            fn_dep.findPlug('overrideColor', False).setInt(shape_data["overrideColor"])
 
-        created_shapes = []
+        if shape_data.get("alwaysDrawOnTop", False):
+            fn_dep = om.MFnDependencyNode(shape_obj)
+            fn_dep.findPlug('alwaysDrawOnTop', False).setBool(True)
 
-        for shape_data in shape_data_list:
-            curve_info = shape_data["curve"]
-            cvs = curve_info["cvs"]
-            degree = curve_info["degree"]
-            knots = curve_info["knots"]
-            form = curve_info["form"]
+        line_width = shape_data.get("lineWidth", None)
+        if line_width is not None:
+            if cmds.attributeQuery("lineWidth", node=shape_fn.name(), exists=True):
+                try:
+                    cmds.setAttr(shape_fn.name() + ".lineWidth", line_width)
+                except:
+                    om.MGlobal.displayWarning(f"Could not set lineWidth for {shape_fn.name()}")
 
-            form_flags = {
-                "open": om.MFnNurbsCurve.kOpen,
-                "closed": om.MFnNurbsCurve.kClosed,
-                "periodic": om.MFnNurbsCurve.kPeriodic
-            }
-            form_flag = form_flags.get(form, om.MFnNurbsCurve.kOpen)
-
-            points = om.MPointArray()
-            for pt in cvs:
-                points.append(om.MPoint(pt[0], pt[1], pt[2]))
-
-            curve_fn = om.MFnNurbsCurve()
-            shape_obj = curve_fn.create(
-                points,
-                knots,
-                degree,
-                form_flag,
-                False,    
-                True,     
-                transform_obj
-            )
-
-            shape_fn = om.MFnDagNode(shape_obj)
-            shape_fn.setName(shape_data["name"])
-
-            if shape_data["overrideEnabled"]:
-                fn_dep = om.MFnDependencyNode(shape_obj)
-                fn_dep.findPlug('overrideEnabled', False).setBool(True)
-                fn_dep.findPlug('overrideColor', False).setInt(shape_data["overrideColor"])
-
-            if shape_data.get("alwaysDrawOnTop", False):
-                fn_dep = om.MFnDependencyNode(shape_obj)
-                fn_dep.findPlug('alwaysDrawOnTop', False).setBool(True)
-
-            line_width = shape_data.get("lineWidth", None)
-            if line_width is not None:
-                if cmds.attributeQuery("lineWidth", node=shape_fn.name(), exists=True):
-                    try:
-                        cmds.setAttr(shape_fn.name() + ".lineWidth", line_width)
-                    except:
-                        om.MGlobal.displayWarning(f"Could not set lineWidth for {shape_fn.name()}")
-
-            created_shapes.append(shape_obj)
+    return final_name
 
+def build_curves_from_template(target_transform_name=None, template_index=None):
+    """
+    Builds controller curves from a predefined template JSON file.
+    If a specific target transform name is provided, it filters the curves to only create those associated with that transform.
+    If no target transform name is provided, it creates all curves defined in the template.
+    Args:
+        target_transform_name (str, optional): The name of the target transform to filter curves by. Defaults to None.
+        template_index (dict, optional): An index returned by get_template_index. Defaults to the current character template.
+    Returns:
+        list: A list of created transform names.
+    """
+    if template_index is None:
+        template_index = get_template_index()
+
+    if target_transform_name:
+        entries = template_index.get(target_transform_name)
+        if not entries:
+            return
+    else:
+        entries = [entry for name_entries in template_index.values() for entry in name_entries]
+
+    created_transforms = []
+
+    for transform_path, data in entries:
+        created_transforms.append(_build_controller_shapes(data["transform"], data["shapes"]))
 
     return created_transforms
 
 
-def create_controller(name, offset=["GRP"], parent=None, locked_attrs=[], match=None):
+def create_controller(name, offset=["GRP"], parent=None, locked_attrs=[], match=None, template_index=None):
     """
     Creates a controller with a specific name and offset transforms and returns the controller and the groups.
 
     Args:
         name (str): Name of the controller.
         suffixes (list): List of suffixes for the groups to be created. Default is ["GRP"].
+        template_index (dict, optional): An index returned by get_template_index, used by create_controllers.
     """
 
     created_grps = []
@@ -375,7 +434,7 @@ def create_controller(name, offset=["GRP"], parent=None, locked_attrs=[], match=
         return
     else:
         
-        ctl = build_curves_from_template(f"{name}_CTL")
+        ctl = build_curves_from_template(f"{name}_CTL", template_index=template_index)
 
         if not ctl:
             ctl = cmds.circle(name=f"{name}_CTL", ch=False)
@@ -390,6 +449,27 @@ def create_controller(name, offset=["GRP"], parent=None, locked_attrs=[], match=
             cmds.parent(ctl[0], created_grps[-1])
         
         return created_grps, ctl[0]
+
+
+def create_controllers(names, offset=["GRP"], parent=None, locked_attrs=[], match=None):
+    """
+    Creates several controllers in one pass, resolving and indexing the template only once.
+
+    Args:
+        names (list): Names of the controllers.
+        offset (list): Suffixes of the offset groups, shared by every controller.
+        parent (str, optional): Parent of the top offset group of every controller.
+        locked_attrs (list): Attributes to lock on every controller.
+        match (str, optional): Node to match the top offset group of every controller to.
+
+    Returns:
+        list: The create_controller result (groups, controller) for each name, None for the ones that failed.
+    """
+
+    template_index = get_template_index()
+
+    return [create_controller(name, offset=offset, parent=parent, locked_attrs=locked_attrs, match=match,
+                              template_index=template_index) for name in names]
     
 
 def text_curve(ctl_name):
@@ -548,4 +628,62 @@ def replace_shapes():
     
 
 
+# -----------------------------------------------------------------------------
+# PARÁMETROS MÁS CERCANOS EN CURVAS
+# -----------------------------------------------------------------------------
+# Un solo MFnNurbsCurve por curva para todas las consultas, en lugar de una selección + MFn por punto.
+# Con sampled=True la curva se lee una vez y los parámetros se resuelven con NumPy (de_boor_core.NurbsCurve).
+
+def get_curve_fn(curve):
+    """
+    Returns an MFnNurbsCurve attached to the given curve.
+    Args:
+        curve (str or MObject or MDagPath): The curve (transform or shape).
+    Returns:
+        om.MFnNurbsCurve: The function set.
+    """
+    if isinstance(curve, str):
+        curve_dag_path = get_dag_path_safe(curve)
+        if curve_dag_path is None:
+            raise ValueError(f"Curve not found: {curve}")
+    elif isinstance(curve, om.MObject):
+        curve_dag_path = om.MDagPath.getAPathTo(curve)
+    elif isinstance(curve, om.MDagPath):
+        curve_dag_path = curve
+    else:
+        raise TypeError("Curve must be a string name, MObject, or MDagPath.")
+
+    return om.MFnNurbsCurve(curve_dag_path)
+
+def get_curve_data(curve):
+    """
+    Reads the world space CVs, knots and degree of a curve in the format used by de_boor_core.NurbsCurve.
+    Args:
+        curve (str or MObject or MDagPath or MFnNurbsCurve): The curve.
+    Returns:
+        dict: {"cvs": [(x, y, z, w)], "knots": [float], "degree": int}
+    """
+    curve_fn = curve if isinstance(curve, om.MFnNurbsCurve) else get_curve_fn(curve)
+    return {
+        "cvs": [(p.x, p.y, p.z, p.w) for p in curve_fn.cvPositions(om.MSpace.kWorld)],
+        "knots": list(curve_fn.knots()),
+        "degree": curve_fn.degree
+    }
+
+def get_closest_params(curve, positions, sampled=False):
+    """
+    Returns the closest parameter (u) on a NURBS curve for every world space position.
+    Args:
+        curve (str or MObject or MDagPath): The curve to evaluate.
+        positions (list): World space positions [x, y, z].
+        sampled (bool): Solve the queries with NumPy on the curve data instead of MFnNurbsCurve.closestPoint.
+    Returns:
+        list: One parameter per position.
+    """
+    curve_fn = get_curve_fn(curve)
+
+    if sampled:
+        nurbs_curve = de_boor_core.NurbsCurve.from_curve_data(get_curve_data(curve_fn))
+        return nurbs_curve.closest_params(positions)[0].tolist()
 
+    return [curve_fn.closestPoint(om.MPoint(*position), space=om.MSpace.kWorld)[1] for position in positions]
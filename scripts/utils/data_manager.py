@@ -1,10 +1,19 @@
 import os
 import json
+import copy
+
+# Process-wide registry: build_path -> {"data": dict, "dirty": bool}.
+# Fetched from globals() so it survives the importlib.reload() calls made by every module.
+_REGISTRY = globals().get("_REGISTRY", {})
 
 class DataExportBiped:
     """
     Handles export, import, and management of rigging build cache data.
     Each module can append its own data for rig construction purposes.
+
+    Data lives in a process-wide in-memory registry shared by every instance that
+    points to the same cache file. The file is only read once (on first access) and
+    only written when flush() is called, normally once at the end of AutoRig.build.
     """
 
     def __init__(self):
@@ -14,22 +23,45 @@ class DataExportBiped:
         """
         complete_path = os.path.realpath(__file__)
         relative_path = complete_path.split("\scripts")[0]
-        final_path = os.path.join(relative_path, "cache")   
+        final_path = os.path.join(relative_path, "cache")
         self.build_path = os.path.join(final_path, "biped.cache")
 
+    def _entry(self):
+
+        """
+        Returns the registry entry for this cache file, loading it from disk the first time.
+        """
+
+        entry = _REGISTRY.get(self.build_path)
+        if entry is not None:
+            return entry
+
+        current_data = {}
+        if os.path.exists(self.build_path):
+            with open(self.build_path, "r") as f:
+                try:
+                    current_data = json.load(f)
+                except json.JSONDecodeError:
+                    current_data = {}
+
+        entry = {"data": current_data, "dirty": False}
+        _REGISTRY[self.build_path] = entry
+        return entry
 
     def new_build(self):
         """
-        Initializes an empty build cache file, clearing previous data.
+        Initializes an empty build cache, clearing previous data.
+        The empty cache is written to disk straight away so a crashed build never leaves stale data behind.
         """
-        with open(self.build_path, "w") as f:
-            json.dump({}, f, indent=4)
-        
+        _REGISTRY[self.build_path] = {"data": {}, "dirty": True}
+        self.flush()
+
 
     def clear_build(self):
         """
         Deletes the build cache file if it exists.
         """
+        _REGISTRY.pop(self.build_path, None)
         if os.path.exists(self.build_path):
             os.remove(self.build_path)
 
@@ -37,28 +69,21 @@ class DataExportBiped:
 
         """
         Appends or updates data for a given module in the build cache.
+        Only the in-memory registry is updated, call flush() to write it to disk.
 
         Args:
             module_name (str): Name of the rigging module.
             data_dict (dict): Data to store for the module.
-            
+
         """
 
-        if os.path.exists(self.build_path):
-            with open(self.build_path, "r") as f:
-                try:
-                    current_data = json.load(f)
-                except json.JSONDecodeError:
-                    current_data = {}
-        else:
-            current_data = {}
+        entry = self._entry()
+        current_data = entry["data"]
 
         if module_name not in current_data:
             current_data[module_name] = {}
-        current_data[module_name].update(data)
-
-        with open(self.build_path, "w") as f:
-            json.dump(current_data, f, indent=4)
+        current_data[module_name].update(copy.deepcopy(data))
+        entry["dirty"] = True
 
 
     def get_data(self, module_name, attribute_name):
@@ -73,19 +98,57 @@ class DataExportBiped:
         Returns:
             The value if found, otherwise None.
         """
-        if not os.path.exists(self.build_path):
-            return None
+        value = self._entry()["data"].get(module_name, {}).get(attribute_name)
+
+        if isinstance(value, (list, dict)):
+            return copy.deepcopy(value)
+        return value
+
+    def keys(self):
+
+        """
+        Returns the stored keys as "module.attribute" strings, used by module_registry to know which inputs exist.
+        """
 
-        with open(self.build_path, "r") as f:
-            try:
-                current_data = json.load(f)
-            except json.JSONDecodeError:
-                return None
+        data = self._entry()["data"]
+        return {f"{module}.{key}" for module, values in data.items() if isinstance(values, dict) for key in values}
 
-        return current_data.get(module_name, {}).get(attribute_name)
+    def flush(self):
+
+        """
+        Writes the in-memory build cache to disk if it has changed.
+        The file is written to a temporary path and swapped in with os.replace so readers never see a partial file.
+
+        Returns:
+            bool: True if the file was written, False if there was nothing to write.
+        """
+
+        entry = _REGISTRY.get(self.build_path)
+        if entry is None or not entry["dirty"]:
+            return False
+
+        folder = os.path.dirname(self.build_path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        temp_path = f"{self.build_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(entry["data"], f, indent=4)
+        os.replace(temp_path, self.build_path)
+
+        entry["dirty"] = False
+        return True
+
+    def checkpoint(self):
+
+        """
+        Explicit checkpoint, flushes the current build cache to disk.
+        """
+
+        return self.flush()
 
 class DataExportQuadruped(DataExportBiped):
-    
+
     """
     Inherits from DataExportBiped to handle quadruped-specific data management.
     """
@@ -94,5 +157,5 @@ class DataExportQuadruped(DataExportBiped):
         super().__init__()
         complete_path = os.path.realpath(__file__)
         relative_path = complete_path.split("\scripts")[0]
-        final_path = os.path.join(relative_path, "cache")   
+        final_path = os.path.join(relative_path, "cache")
         self.build_path = os.path.join(final_path, "quadruped.cache")
@@ -1,3 +1,17 @@
+import os
+import json
+import time
+import numpy as np
+from collections import OrderedDict
+
+# LRU cache of basis matrices: (n, d, kv_type, params, tol) -> (basis, derivative basis), read-only np.ndarrays.
+# Fetched from globals() so it survives the importlib.reload() calls made by ribbon and the modules.
+BASIS_CACHE_SIZE = 256
+_BASIS_CACHE = globals().get("_BASIS_CACHE", OrderedDict())
+_BASIS_STATS = globals().get("_BASIS_STATS", {"hits": 0, "misses": 0})
+_BASIS_DISK = globals().get("_BASIS_DISK", {"path": None, "dirty": False})
+
+
 def get_open_uniform_knot_vector(n, d):
 
     """
@@ -78,6 +92,669 @@ def de_boor(n, d, t, kv, tol=0.000001):
     return weights[:n]
 
 
+def de_boor_batch(n, d, params, kv, tol=0.000001, derivative=False):
+
+    """
+    import de_boor_core as core
+
+    kv, _ = core.knot_vector('open', list(range(6)), 3)
+    core.de_boor_batch(6, 3, [0.0, 0.25, 0.5, 1.0], kv)
+    wts, d_wts = core.de_boor_batch(6, 3, [0.0, 0.25, 0.5, 1.0], kv, derivative=True)
+
+    Vectorized version of de_boor, evaluates every parameter in one NumPy pass.
+    Same tolerance and end-point semantics: rows with t + tol > 1 are the last CV only.
+
+    With derivative=True the analytic first-derivative basis is built in the same pass from the
+    degree d - 1 basis: N'i,d = d * Ni,d-1 / (ki+d - ki) - d * Ni+1,d-1 / (ki+d+1 - ki+1).
+    At the end of the knot domain the last span is used, so the derivative is the one-sided
+    limit and never vanishes or flips.
+
+    Returns:
+        np.ndarray: len(params) x n basis matrix, or (basis, derivative basis) if derivative is True.
+    """
+
+    t = np.asarray(params, dtype=np.float64).reshape(-1, 1)
+    kv = np.asarray(kv, dtype=np.float64)
+
+    # Half-open spans [ki, ki+1), the end of the domain belongs to the last span (ki, ki+1]
+    at_end = t >= kv[n]
+    weights = np.where(at_end,
+                       (kv[:n + d] < t) & (t <= kv[1:n + d + 1]),
+                       (kv[:n + d] <= t) & (t < kv[1:n + d + 1])).astype(np.float64)
+
+    lower = weights.copy() if d == 1 else None
+
+    for degree in range(1, d + 1):
+
+        i = np.arange(n + d - degree)
+
+        a_denom = kv[i + degree] - kv[i]
+        b_denom = kv[i + degree + 1] - kv[i + 1]
+
+        a = (t - kv[i]) * weights[:, i] / np.where(a_denom != 0, a_denom, 1.0)
+        b = (kv[i + degree + 1] - t) * weights[:, i + 1] / np.where(b_denom != 0, b_denom, 1.0)
+
+        weights[:, i] = np.where(a_denom != 0, a, 0.0) + np.where(b_denom != 0, b, 0.0)
+
+        if degree == d - 1:
+            lower = weights[:, :n + 1].copy()
+
+    weights = weights[:, :n]
+
+    end = (t[:, 0] + tol) > 1
+    weights[end] = 0.0
+    weights[end, n - 1] = 1.0
+
+    if not derivative:
+        return weights
+
+    if d == 0:
+        return weights, np.zeros_like(weights)
+
+    i = np.arange(n)
+    a_denom = kv[i + d] - kv[i]
+    b_denom = kv[i + d + 1] - kv[i + 1]
+
+    a = d * lower[:, i] / np.where(a_denom != 0, a_denom, 1.0)
+    b = d * lower[:, i + 1] / np.where(b_denom != 0, b_denom, 1.0)
+
+    d_weights = np.where(a_denom != 0, a, 0.0) - np.where(b_denom != 0, b, 0.0)
+
+    return weights, d_weights
+
+
+def benchmark_de_boor(joint_counts=(5, 10, 25, 50, 100, 200), n=8, d=3, repeat=20):
+
+    """
+    import de_boor_core as core
+
+    core.benchmark_de_boor()
+
+    Micro-benchmark of de_boor (one parameter per call) against de_boor_batch (all parameters at once).
+
+    Returns:
+        list: (num_joints, scalar_seconds, batch_seconds) for each joint count.
+    """
+
+    kv, _ = knot_vector('open', list(range(n)), d)
+    results = []
+
+    for num_joints in joint_counts:
+
+        params = [i / (num_joints - 1) for i in range(num_joints)]
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            [de_boor(n, d, t, kv) for t in params]
+        scalar_time = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            de_boor_batch(n, d, params, kv)
+        batch_time = (time.perf_counter() - start) / repeat
+
+        results.append((num_joints, scalar_time, batch_time))
+        print(f"{num_joints:4d} joints | scalar {scalar_time * 1000:8.3f} ms | batch {batch_time * 1000:8.3f} ms | x{scalar_time / batch_time:6.1f}")
+
+    return results
+
+
+# ----------------------------------------------------------------
+# --- BASIS CACHE ---
+# ----------------------------------------------------------------
+def basis_cache_key(n, d, kv_type, params, tol=0.000001):
+
+    """
+    Hashable key of a basis matrix. n is the number of original CVs (before periodic wrapping).
+    """
+
+    return (int(n), int(d), kv_type, tuple(float(t) for t in params), float(tol))
+
+
+def _store_basis(key, weights, d_weights):
+
+    weights.setflags(write=False)
+    d_weights.setflags(write=False)
+    _BASIS_CACHE[key] = (weights, d_weights)
+    _BASIS_CACHE.move_to_end(key)
+    while len(_BASIS_CACHE) > BASIS_CACHE_SIZE:
+        _BASIS_CACHE.popitem(last=False)
+    return weights, d_weights
+
+
+def cached_basis(n, d, kv_type, params, tol=0.000001, derivative=False):
+
+    """
+    import de_boor_core as core
+
+    wts = core.cached_basis(6, 3, 'open', [0.0, 0.25, 0.5, 1.0])
+    wts, d_wts = core.cached_basis(6, 3, 'open', [0.0, 0.25, 0.5, 1.0], derivative=True)
+    core.basis_cache_stats()
+
+    Memoized de_boor_batch for a ribbon configuration. The knot vector is rebuilt from n, d and kv_type,
+    so L/R and upper/lower ribbons with the same layout share one entry. Position and derivative bases
+    are computed together and cached in the same entry.
+
+    Args:
+        n (int): number of CVs of the ribbon (before periodic wrapping)
+        d (int): degree of the basis functions
+        kv_type (str): 'open' or 'periodic'
+        params (list): parameter values
+        tol (float): tolerance used by de_boor
+        derivative (bool): also return the first-derivative basis
+
+    Returns:
+        np.ndarray: read-only len(params) x n_basis matrix (n_basis = n + 2 * d for periodic knot vectors),
+            or (basis, derivative basis) if derivative is True
+    """
+
+    key = basis_cache_key(n, d, kv_type, params, tol)
+
+    entry = _BASIS_CACHE.get(key)
+    if entry is not None:
+        _BASIS_STATS["hits"] += 1
+        _BASIS_CACHE.move_to_end(key)
+    else:
+        _BASIS_STATS["misses"] += 1
+        kv, padded_cvs = knot_vector(kv_type, list(range(n)), d)
+        entry = _store_basis(key, *de_boor_batch(len(padded_cvs), d, key[3], kv, tol=tol, derivative=True))
+        _BASIS_DISK["dirty"] = True
+
+    return entry if derivative else entry[0]
+
+
+def basis_cache_stats():
+
+    """
+    Returns:
+        dict: hits, misses, hit_rate, size and max_size of the basis cache
+    """
+
+    hits = _BASIS_STATS["hits"]
+    misses = _BASIS_STATS["misses"]
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "size": len(_BASIS_CACHE),
+        "max_size": BASIS_CACHE_SIZE
+    }
+
+
+def clear_basis_cache(reset_stats=True):
+
+    """
+    Empties the in-memory basis cache. The disk file, if any, is left untouched.
+    """
+
+    _BASIS_CACHE.clear()
+    if reset_stats:
+        _BASIS_STATS["hits"] = 0
+        _BASIS_STATS["misses"] = 0
+
+
+def default_basis_cache_path():
+
+    """
+    Returns <repo>/cache/de_boor_basis.cache.
+    """
+
+    complete_path = os.path.realpath(__file__)
+    sep_token = os.sep + "scripts"
+    if sep_token in complete_path:
+        relative_path = complete_path.split(sep_token)[0]
+    else:
+        relative_path = os.path.dirname(os.path.dirname(os.path.dirname(complete_path)))
+    return os.path.join(relative_path, "cache", "de_boor_basis.cache")
+
 
+def enable_basis_cache_persistence(path=None):
 
+    """
+    import de_boor_core as core
+
+    core.enable_basis_cache_persistence()
+
+    Loads the basis cache from disk and keeps it persistent: save_basis_cache() (called at the end of
+    AutoRig.build) writes new entries back, so later sessions skip the basis math entirely.
+
+    Returns:
+        int: number of entries loaded
+    """
+
+    path = path or default_basis_cache_path()
+    _BASIS_DISK["path"] = path
+
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, "r") as f:
+        try:
+            entries = json.load(f)
+        except json.JSONDecodeError:
+            return 0
+
+    loaded = 0
+    for entry in entries:
+        n, d, kv_type, params, tol = entry["key"]
+        key = basis_cache_key(n, d, kv_type, params, tol)
+        if key not in _BASIS_CACHE and "derivatives" in entry:
+            _store_basis(key, np.array(entry["weights"], dtype=np.float64), np.array(entry["derivatives"], dtype=np.float64))
+            loaded += 1
+    return loaded
+
+
+def disable_basis_cache_persistence():
+
+    _BASIS_DISK["path"] = None
+    _BASIS_DISK["dirty"] = False
+
+
+def save_basis_cache(force=False):
+
+    """
+    Writes the basis cache to disk if persistence is enabled and new entries were computed.
+
+    Returns:
+        str: the written path, or None if nothing was written
+    """
+
+    path = _BASIS_DISK["path"]
+    if path is None or not (_BASIS_DISK["dirty"] or force):
+        return None
+
+    entries = [{"key": [key[0], key[1], key[2], list(key[3]), key[4]],
+                "weights": weights.tolist(), "derivatives": d_weights.tolist()}
+               for key, (weights, d_weights) in _BASIS_CACHE.items()]
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(entries, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+    _BASIS_DISK["dirty"] = False
+    return path
+
+
+# ----------------------------------------------------------------
+# --- NURBS SURFACES ---
+# ----------------------------------------------------------------
+def maya_to_full_knots(knots):
+
+    """
+    Maya stores numCVs + degree - 1 knots, the full knot vector repeats the first and last ones.
+    """
+
+    return [knots[0]] + list(knots) + [knots[-1]]
+
+
+def basis_on_knots(n, d, params, kv, derivative=False):
+
+    """
+    import de_boor_core as core
+
+    core.basis_on_knots(7, 3, [0.0, 2.0, 4.0], [0, 0, 0, 0, 1, 2, 3, 4, 4, 4, 4])
+
+    de_boor_batch for any full knot vector: the domain [kv[d], kv[n]] is mapped to [0, 1] and the
+    derivative is scaled back to the original parameter. The end of the domain uses the last span,
+    so it is valid for open, closed and periodic knot vectors.
+
+    Returns:
+        np.ndarray: len(params) x n basis matrix, or (basis, derivative basis) if derivative is True.
+    """
+
+    kv = np.asarray(kv, dtype=np.float64)
+    start, end = kv[d], kv[n]
+    scale = end - start
+
+    t = np.clip((np.asarray(params, dtype=np.float64) - start) / scale, 0.0, 1.0)
+    result = de_boor_batch(n, d, t, (kv - start) / scale, tol=0.0, derivative=derivative)
+
+    if not derivative:
+        return result
+    return result[0], result[1] / scale
+
+
+class NurbsSurface(object):
+
+    """
+    import de_boor_core as core
+
+    surface = core.NurbsSurface.from_guide_data(guide_data["surface_data"])
+    points = surface.points([0.5, 0.2], [0.5, 0.9])
+    u, v, closest, distance = surface.closest_uv(query_points)
+
+    Vectorized tensor-product B-spline / NURBS surface built from the data the guides store for
+    Maya nurbsSurfaces (degreeInU/V, knotsInU/V in Maya format and cvs[u][v] as (x, y, z) or (x, y, z, w)).
+    Periodic surfaces work as long as the overlapping CVs are included, which is how Maya returns them.
+    """
+
+    def __init__(self, cvs, knots_u, knots_v, degree_u, degree_v, maya_knots=True):
+
+        cvs = np.asarray(cvs, dtype=np.float64)
+        if cvs.shape[2] == 3:
+            cvs = np.concatenate((cvs, np.ones(cvs.shape[:2] + (1,))), axis=2)
+
+        self.degree_u = int(degree_u)
+        self.degree_v = int(degree_v)
+        self.num_u, self.num_v = cvs.shape[:2]
+        self.rational = bool(np.any(np.abs(cvs[:, :, 3] - 1.0) > 1e-9))
+
+        # Homogeneous CVs (w * x, w * y, w * z, w)
+        self.cvs_w = np.concatenate((cvs[:, :, :3] * cvs[:, :, 3:], cvs[:, :, 3:]), axis=2)
+
+        self.knots_u = np.asarray(maya_to_full_knots(knots_u) if maya_knots else knots_u, dtype=np.float64)
+        self.knots_v = np.asarray(maya_to_full_knots(knots_v) if maya_knots else knots_v, dtype=np.float64)
+
+        self.range_u = (self.knots_u[self.degree_u], self.knots_u[self.num_u])
+        self.range_v = (self.knots_v[self.degree_v], self.knots_v[self.num_v])
+
+    @classmethod
+    def from_guide_data(cls, surface_data):
+
+        """
+        Builds the surface from the "surface_data" dictionary of a guides file.
+        """
+
+        return cls(surface_data["cvs"], surface_data["knotsInU"], surface_data["knotsInV"],
+                   surface_data["degreeInU"], surface_data["degreeInV"])
+
+    # ----- evaluation
+    def _homogeneous(self, u, v, derivative=False):
+
+        u = np.atleast_1d(np.asarray(u, dtype=np.float64)).ravel()
+        v = np.atleast_1d(np.asarray(v, dtype=np.float64)).ravel()
+
+        if not derivative:
+            bu = basis_on_knots(self.num_u, self.degree_u, u, self.knots_u)
+            bv = basis_on_knots(self.num_v, self.degree_v, v, self.knots_v)
+            return np.einsum('ni,nj,ijk->nk', bu, bv, self.cvs_w)
+
+        bu, dbu = basis_on_knots(self.num_u, self.degree_u, u, self.knots_u, derivative=True)
+        bv, dbv = basis_on_knots(self.num_v, self.degree_v, v, self.knots_v, derivative=True)
+        s = np.einsum('ni,nj,ijk->nk', bu, bv, self.cvs_w)
+        su = np.einsum('ni,nj,ijk->nk', dbu, bv, self.cvs_w)
+        sv = np.einsum('ni,nj,ijk->nk', bu, dbv, self.cvs_w)
+        return s, su, sv
+
+    def points(self, u, v):
+
+        """
+        Returns:
+            np.ndarray: N x 3 surface points at the (u, v) pairs.
+        """
+
+        s = self._homogeneous(u, v)
+        return s[:, :3] / s[:, 3:]
+
+    def partials(self, u, v):
+
+        """
+        Returns:
+            tuple: (points, dS/du, dS/dv), N x 3 arrays each.
+        """
+
+        s, su, sv = self._homogeneous(u, v, derivative=True)
+        w = s[:, 3:]
+        points = s[:, :3] / w
+        # Quotient rule, for non rational surfaces w is 1 and its derivatives are 0
+        du = (su[:, :3] - points * su[:, 3:]) / w
+        dv = (sv[:, :3] - points * sv[:, 3:]) / w
+        return points, du, dv
+
+    def normals(self, u, v):
+
+        """
+        Returns:
+            np.ndarray: N x 3 unit normals (dS/du x dS/dv, same orientation as Maya).
+        """
+
+        _, du, dv = self.partials(u, v)
+        normals = np.cross(du, dv)
+        length = np.linalg.norm(normals, axis=1, keepdims=True)
+        return normals / np.where(length > 1e-12, length, 1.0)
+
+    # ----- closest point
+    def closest_uv(self, positions, samples=16, iterations=12, tol=1e-10, chunk_size=2048):
+
+        """
+        Closest (u, v) on the surface for many query points: nearest sample of a samples x samples grid per
+        knot span as the start, then Gauss-Newton steps on (S - p) . dS/du = (S - p) . dS/dv = 0, clamped to the domain.
+
+        Args:
+            positions (list): N x 3 query points.
+            samples (int): grid samples per knot span used for the initial guess.
+            iterations (int): maximum Gauss-Newton iterations.
+            tol (float): parameter step below which a point is considered converged.
+            chunk_size (int): query points compared against the grid at once (memory bound).
+
+        Returns:
+            tuple: (u, v, closest points, distances) as NumPy arrays.
+        """
+
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+
+        spans_u = max(len(np.unique(self.knots_u[self.degree_u:self.num_u + 1])) - 1, 1)
+        spans_v = max(len(np.unique(self.knots_v[self.degree_v:self.num_v + 1])) - 1, 1)
+        grid_u = np.linspace(*self.range_u, spans_u * samples + 1)
+        grid_v = np.linspace(*self.range_v, spans_v * samples + 1)
+        gu, gv = np.meshgrid(grid_u, grid_v, indexing='ij')
+        gu = gu.ravel()
+        gv = gv.ravel()
+        grid_points = self.points(gu, gv)
+
+        u = np.empty(len(positions))
+        v = np.empty(len(positions))
+        for start in range(0, len(positions), chunk_size):
+            block = positions[start:start + chunk_size]
+            dist = ((block[:, None, :] - grid_points[None, :, :]) ** 2).sum(axis=2)
+            nearest = np.argmin(dist, axis=1)
+            u[start:start + chunk_size] = gu[nearest]
+            v[start:start + chunk_size] = gv[nearest]
+
+        active = np.ones(len(positions), dtype=bool)
+        for _ in range(iterations):
+            if not active.any():
+                break
+
+            points, du, dv = self.partials(u[active], v[active])
+            diff = positions[active] - points
+
+            a = (du * du).sum(axis=1)
+            b = (du * dv).sum(axis=1)
+            c = (dv * dv).sum(axis=1)
+            ru = (diff * du).sum(axis=1)
+            rv = (diff * dv).sum(axis=1)
+
+            det = a * c - b * b
+            safe = np.abs(det) > 1e-18
+            step_u = np.where(safe, (c * ru - b * rv) / np.where(safe, det, 1.0), 0.0)
+            step_v = np.where(safe, (a * rv - b * ru) / np.where(safe, det, 1.0), 0.0)
+
+            new_u = np.clip(u[active] + step_u, *self.range_u)
+            new_v = np.clip(v[active] + step_v, *self.range_v)
+            moved = np.maximum(np.abs(new_u - u[active]), np.abs(new_v - v[active]))
+
+            u[active] = new_u
+            v[active] = new_v
+
+            indices = np.flatnonzero(active)
+            active[indices[moved <= tol]] = False
+
+        closest = self.points(u, v)
+        return u, v, closest, np.linalg.norm(positions - closest, axis=1)
+
+
+# ----------------------------------------------------------------
+# --- NURBS CURVES ---
+# ----------------------------------------------------------------
+def closest_params_on_polyline(params, points, positions, chunk_size=2048):
+
+    """
+    import de_boor_core as core
+
+    core.closest_params_on_polyline([0.0, 0.5, 1.0], [(0, 0, 0), (1, 1, 0), (2, 0, 0)], [(0.5, 1.0, 0.0)])
+
+    Closest parameter for many query points on a sampled curve: every point is projected on all the
+    segments of the polyline and the parameter is interpolated linearly inside the closest segment.
+
+    Args:
+        params (list): increasing parameters of the samples.
+        points (list): len(params) x 3 sample positions.
+        positions (list): N x 3 query points.
+        chunk_size (int): query points projected at once (memory bound).
+
+    Returns:
+        tuple: (parameters, closest points, distances) as NumPy arrays.
+    """
+
+    params = np.asarray(params, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+
+    a = points[:-1]
+    seg = points[1:] - a
+    seg_len = (seg * seg).sum(axis=1)
+    safe_len = np.where(seg_len > 1e-24, seg_len, 1.0)
+
+    result = np.empty(len(positions))
+    closest = np.empty((len(positions), 3))
+    for start in range(0, len(positions), chunk_size):
+        block = positions[start:start + chunk_size]
+        s = np.clip(((block[:, None, :] - a[None, :, :]) * seg[None, :, :]).sum(axis=2) / safe_len, 0.0, 1.0)
+        projected = a[None, :, :] + s[:, :, None] * seg[None, :, :]
+        nearest = np.argmin(((block[:, None, :] - projected) ** 2).sum(axis=2), axis=1)
+        rows = np.arange(len(block))
+        local = s[rows, nearest]
+        result[start:start + chunk_size] = params[nearest] + local * (params[nearest + 1] - params[nearest])
+        closest[start:start + chunk_size] = projected[rows, nearest]
+
+    return result, closest, np.linalg.norm(positions - closest, axis=1)
+
+
+class NurbsCurve(object):
+
+    """
+    import de_boor_core as core
+
+    curve = core.NurbsCurve(cvs, knots, 3)
+    params, closest, distance = curve.closest_params(query_points)
+
+    Vectorized B-spline / NURBS curve built from the data Maya returns for a nurbsCurve (cvs as (x, y, z)
+    or (x, y, z, w), knots in Maya format). Periodic curves work as long as the overlapping CVs are included.
+    Headless replacement of MFnNurbsCurve.closestPoint when many points are queried on the same curve.
+    """
 
+    def __init__(self, cvs, knots, degree, maya_knots=True):
+
+        cvs = np.asarray(cvs, dtype=np.float64)
+        if cvs.shape[1] == 3:
+            cvs = np.concatenate((cvs, np.ones((len(cvs), 1))), axis=1)
+
+        self.degree = int(degree)
+        self.num_cvs = len(cvs)
+
+        # Homogeneous CVs (w * x, w * y, w * z, w)
+        self.cvs_w = np.concatenate((cvs[:, :3] * cvs[:, 3:], cvs[:, 3:]), axis=1)
+
+        self.knots = np.asarray(maya_to_full_knots(knots) if maya_knots else knots, dtype=np.float64)
+        self.range = (self.knots[self.degree], self.knots[self.num_cvs])
+
+    @classmethod
+    def from_curve_data(cls, curve_data):
+
+        """
+        Builds the curve from a {"cvs", "knots", "degree"} dictionary.
+        """
+
+        return cls(curve_data["cvs"], curve_data["knots"], curve_data["degree"])
+
+    # ----- evaluation
+    def points(self, params):
+
+        """
+        Returns:
+            np.ndarray: N x 3 curve points at the parameters.
+        """
+
+        params = np.atleast_1d(np.asarray(params, dtype=np.float64)).ravel()
+        c = basis_on_knots(self.num_cvs, self.degree, params, self.knots) @ self.cvs_w
+        return c[:, :3] / c[:, 3:]
+
+    def tangents(self, params):
+
+        """
+        Returns:
+            tuple: (points, dC/du), N x 3 arrays each.
+        """
+
+        params = np.atleast_1d(np.asarray(params, dtype=np.float64)).ravel()
+        basis, d_basis = basis_on_knots(self.num_cvs, self.degree, params, self.knots, derivative=True)
+        c = basis @ self.cvs_w
+        dc = d_basis @ self.cvs_w
+        w = c[:, 3:]
+        points = c[:, :3] / w
+        # Quotient rule, for non rational curves w is 1 and its derivative is 0
+        return points, (dc[:, :3] - points * dc[:, 3:]) / w
+
+    # ----- closest point
+    def closest_params(self, positions, samples=16, iterations=12, tol=1e-10):
+
+        """
+        Closest parameter on the curve for many query points: projection on a polyline of samples points
+        per knot span as the start, then Newton steps on (C - p) . dC/du = 0, clamped to the domain.
+
+        Args:
+            positions (list): N x 3 query points.
+            samples (int): polyline samples per knot span used for the initial guess.
+            iterations (int): maximum Newton iterations.
+            tol (float): parameter step below which a point is considered converged.
+
+        Returns:
+            tuple: (parameters, closest points, distances) as NumPy arrays.
+        """
+
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+
+        spans = max(len(np.unique(self.knots[self.degree:self.num_cvs + 1])) - 1, 1)
+        grid = np.linspace(*self.range, spans * samples + 1)
+        params, _, distance = closest_params_on_polyline(grid, self.points(grid), positions)
+        max_step = grid[1] - grid[0]
+
+        active = np.ones(len(positions), dtype=bool)
+        for _ in range(iterations):
+            if not active.any():
+                break
+
+            target = positions[active]
+            points, du = self.tangents(params[active])
+            current = np.linalg.norm(target - points, axis=1)
+            # Newton on f(u) = (p - C) . C' with C'' from central differences of the tangent, Gauss-Newton where
+            # f' is not positive. The step never leaves the neighbouring samples and is halved while it does not get closer
+            h = max_step * 1e-3
+            _, du_next = self.tangents(params[active] + h)
+            _, du_prev = self.tangents(params[active] - h)
+            ddu = (du_next - du_prev) / (2.0 * h)
+            diff = target - points
+            gauss_newton = (du * du).sum(axis=1)
+            newton = gauss_newton - (diff * ddu).sum(axis=1)
+            a = np.where(newton > 0.1 * gauss_newton, newton, gauss_newton)
+            r = (diff * du).sum(axis=1)
+            step = np.clip(np.divide(r, a, out=np.zeros_like(r), where=a > 1e-18), -max_step, max_step)
+            for _ in range(4):
+                new = np.clip(params[active] + step, *self.range)
+                worse = np.linalg.norm(target - self.points(new), axis=1) > current
+                if not worse.any():
+                    break
+                step = np.where(worse, step * 0.5, step)
+            new = np.where(worse, params[active], new)
+
+            moved = np.abs(new - params[active])
+            params[active] = new
+
+            indices = np.flatnonzero(active)
+            active[indices[moved <= tol]] = False
+
+        closest = self.points(params)
+        return params, closest, np.linalg.norm(positions - closest, axis=1)
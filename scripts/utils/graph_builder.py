@@ -0,0 +1,341 @@
+import time
+from contextlib import contextmanager
+
+import maya.cmds as cmds
+from maya.api import OpenMaya as om
+
+# -----------------------------------------------------------------------------
+# CONSTRUCTOR TRANSACCIONAL DE GRAFOS
+# -----------------------------------------------------------------------------
+# Las creaciones de nodos, conexiones y valores estáticos se encolan y se aplican con tres
+# modificadores de la API (DG, DAG y edición) en un único commit(), sin pasar por el motor de
+# comandos ni por la cola de undo por cada llamada. Los nodos se referencian por el nombre pedido
+# (NodeHandle) y se resuelven al nombre real tras el commit. Si algo falla se deshacen los
+# modificadores ya aplicados y la escena queda como estaba.
+#
+# builder = GraphBuilder()
+# mult = builder.create_node("multMatrix", "C_test_MMX")
+# builder.connect("C_masterwalk_CTL.worldMatrix[0]", f"{mult}.matrixIn[0]")
+# builder.set_attr(f"{mult}.matrixIn[1]", identity_matrix)
+# builder.commit()
+# mult.name  # nombre real en la escena
+
+DAG_TYPES = ("transform", "joint")
+
+
+class NodeHandle(str):
+    """
+    Name handle returned by GraphBuilder.create_node. It behaves as the requested name, so plugs can be
+    written as f"{handle}.attr", and .name returns the name Maya gave the node once the builder is committed.
+    """
+
+    def __new__(cls, name, builder):
+        handle = super(NodeHandle, cls).__new__(cls, name)
+        handle.builder = builder
+        return handle
+
+    @property
+    def name(self):
+        return self.builder.names.get(str(self), str(self))
+
+
+class GraphBuilder(object):
+    """
+    Queues node creations, connections and attribute values and applies them with a single commit().
+
+    with graph_builder.GraphBuilder() as builder:
+        node = builder.create_node("fourByFourMatrix", "C_test_FBF")
+        builder.connect(f"{node}.output", "C_test_JNT.offsetParentMatrix", force=True)
+    # Committed on exit, rolled back if the block raises.
+    """
+
+    def __init__(self, dag_types=DAG_TYPES):
+        self.dag_types = tuple(dag_types)
+        self.nodes = []
+        self.connections = []
+        self.values = []
+        self.names = {}
+        self.committed = False
+
+        self._queued = set()
+        self._objects = {}
+        self._done = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    # ----------------------------------------------------------------
+    # --- COLA ---
+    # ----------------------------------------------------------------
+    def create_node(self, node_type, name, parent=None):
+        """
+        Queues a node creation.
+        Args:
+            node_type (str): The node type.
+            name (str): The requested name, also the key used to reference the node in connections and values.
+            parent (str, optional): Parent of DAG nodes, a queued node or an existing one.
+        Returns:
+            NodeHandle: The name handle of the node.
+        """
+        if self.committed:
+            raise RuntimeError("GraphBuilder already committed, create a new one.")
+        if name in self._queued:
+            raise ValueError(f"Node already queued: {name}")
+
+        self._queued.add(name)
+        self.nodes.append((name, node_type, None if parent is None else str(parent)))
+        return NodeHandle(name, self)
+
+    def connect(self, src, dst, force=False):
+        """
+        Queues a connection between two plugs ("node.attr"), queued or existing nodes.
+        With force, any incoming connection of the destination is replaced.
+        """
+        self.connections.append((str(src), str(dst), force))
+
+    def set_attr(self, plug, value):
+        """
+        Queues a static value: bool, int, float, str, 16 floats (matrix) or 2-4 floats (compound children).
+        """
+        if isinstance(value, (list, tuple)):
+            value = tuple(value)
+        self.values.append((str(plug), value))
+
+    def __len__(self):
+        return len(self.nodes) + len(self.connections) + len(self.values)
+
+    # ----------------------------------------------------------------
+    # --- RESOLUCIÓN ---
+    # ----------------------------------------------------------------
+    def plug(self, plug_path):
+        """
+        Returns the MPlug of "node.attr", node being a queued name (after commit) or a scene name.
+        """
+        node, attr = plug_path.split(".", 1)
+        sel = om.MSelectionList()
+        sel.add(f"{self.names.get(node, node)}.{attr}")
+        return sel.getPlug(0)
+
+    @staticmethod
+    def _mobject(node):
+        sel = om.MSelectionList()
+        sel.add(node)
+        return sel.getDependNode(0)
+
+    def _set_value(self, modifier, plug, value):
+        if isinstance(value, bool):
+            modifier.newPlugValueBool(plug, value)
+        elif isinstance(value, int):
+            modifier.newPlugValueInt(plug, value)
+        elif isinstance(value, float):
+            modifier.newPlugValueDouble(plug, value)
+        elif isinstance(value, str):
+            modifier.newPlugValueString(plug, value)
+        elif len(value) == 16:
+            modifier.newPlugValue(plug, om.MFnMatrixData().create(om.MMatrix(value)))
+        else:
+            for k, component in enumerate(value):
+                modifier.newPlugValueDouble(plug.child(k), component)
+
+    # ----------------------------------------------------------------
+    # --- COMMIT / ROLLBACK ---
+    # ----------------------------------------------------------------
+    def _apply(self, modifier):
+        modifier.doIt()
+        self._done.append(modifier)
+
+    def commit(self):
+        """
+        Creates the queued nodes with one DG and one DAG modifier, then applies every connection and value
+        with a single edit modifier. On failure the applied modifiers are undone and the error is raised again.
+
+        Returns:
+            dict: requested name -> created node name (Maya renames on clashes)
+        """
+        if self.committed:
+            raise RuntimeError("GraphBuilder already committed.")
+
+        try:
+            dg_mod = om.MDGModifier()
+            dag_mod = om.MDagModifier()
+
+            for node, node_type, parent in self.nodes:
+                if node_type in self.dag_types:
+                    if parent is None:
+                        parent_obj = om.MObject.kNullObj
+                    else:
+                        parent_obj = self._objects[parent] if parent in self._objects else self._mobject(parent)
+                    obj = dag_mod.createNode(node_type, parent_obj)
+                    dag_mod.renameNode(obj, node)
+                else:
+                    obj = dg_mod.createNode(node_type)
+                    dg_mod.renameNode(obj, node)
+                self._objects[node] = obj
+
+            self._apply(dg_mod)
+            self._apply(dag_mod)
+
+            for node, obj in self._objects.items():
+                if obj.hasFn(om.MFn.kDagNode):
+                    self.names[node] = om.MFnDagNode(obj).partialPathName()
+                else:
+                    self.names[node] = om.MFnDependencyNode(obj).name()
+
+            edit_mod = om.MDGModifier()
+            for src, dst, force in self.connections:
+                dst_plug = self.plug(dst)
+                if force and dst_plug.isDestination:
+                    edit_mod.disconnect(dst_plug.source(), dst_plug)
+                edit_mod.connect(self.plug(src), dst_plug)
+            for plug_path, value in self.values:
+                self._set_value(edit_mod, self.plug(plug_path), value)
+            self._apply(edit_mod)
+
+        except Exception:
+            self.rollback()
+            raise
+
+        self.committed = True
+        return self.names
+
+    def rollback(self):
+        """
+        Undoes every applied modifier in reverse order, deleting the created nodes. Safe to call before commit.
+        """
+        while self._done:
+            self._done.pop().undoIt()
+        self.names.clear()
+        self._objects.clear()
+        self.committed = False
+
+
+# ----------------------------------------------------------------
+# --- MEDICIÓN ---
+# ----------------------------------------------------------------
+@contextmanager
+def count_cmds_calls():
+    """
+    Counts the maya.cmds calls made inside the block, by command name.
+
+    with graph_builder.count_cmds_calls() as calls:
+        build()
+    sum(calls.values())
+    """
+    calls = {}
+    originals = {}
+
+    def wrap(command_name, command):
+        def counted(*args, **kwargs):
+            calls[command_name] = calls.get(command_name, 0) + 1
+            return command(*args, **kwargs)
+        return counted
+
+    for command_name in dir(cmds):
+        command = getattr(cmds, command_name)
+        if command_name.startswith("_") or not callable(command):
+            continue
+        originals[command_name] = command
+        setattr(cmds, command_name, wrap(command_name, command))
+
+    try:
+        yield calls
+    finally:
+        for command_name, command in originals.items():
+            setattr(cmds, command_name, command)
+
+
+def benchmark_graph_builder(num_nodes=1000, repeat=3):
+    """
+    from utils import graph_builder
+
+    graph_builder.benchmark_graph_builder(2000)
+
+    Builds the same chain of multMatrix nodes (one connection and one matrix value each) with cmds calls and
+    with a GraphBuilder commit. Created nodes are deleted after every run.
+
+    Returns:
+        dict: {"cmds": (seconds, cmds calls), "builder": (seconds, cmds calls)}
+    """
+    matrix = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+    def with_cmds():
+        previous = None
+        for i in range(num_nodes):
+            node = cmds.createNode("multMatrix", name=f"benchmark{i:04d}_MMX", ss=True)
+            cmds.setAttr(f"{node}.matrixIn[1]", *matrix, type="matrix")
+            if previous:
+                cmds.connectAttr(f"{previous}.matrixSum", f"{node}.matrixIn[0]")
+            previous = node
+
+    def with_builder():
+        builder = GraphBuilder()
+        previous = None
+        for i in range(num_nodes):
+            node = builder.create_node("multMatrix", f"benchmark{i:04d}_MMX")
+            builder.set_attr(f"{node}.matrixIn[1]", matrix)
+            if previous:
+                builder.connect(f"{previous}.matrixSum", f"{node}.matrixIn[0]")
+            previous = node
+        builder.commit()
+
+    results = {}
+    for key, func in (("cmds", with_cmds), ("builder", with_builder)):
+        elapsed = 0.0
+        for _ in range(repeat):
+            before = set(cmds.ls())
+            with count_cmds_calls() as calls:
+                start = time.perf_counter()
+                func()
+                elapsed += time.perf_counter() - start
+            cmds.delete([node for node in cmds.ls() if node not in before])
+        results[key] = (elapsed / repeat, sum(calls.values()))
+
+    print(f"{num_nodes} nodes | cmds {results['cmds'][0] * 1000:.1f} ms ({results['cmds'][1]} calls) | "
+          f"builder {results['builder'][0] * 1000:.1f} ms ({results['builder'][1]} calls) | "
+          f"x{results['cmds'][0] / results['builder'][0]:.1f}")
+    return results
+
+
+def benchmark_build():
+    """
+    from utils import graph_builder
+
+    graph_builder.benchmark_build()
+
+    Runs the full build of the current character three times in new scenes: with the untouched original ribbon
+    (ribbon.USE_BASELINE), with the current ribbon math built through cmds calls (ribbon.USE_GRAPH_BUILDER = False)
+    and through GraphBuilder commits. Reports total wall time and cmds calls of each, "before" is the original.
+
+    Returns:
+        dict: {"before": (seconds, cmds calls), "cmds": (seconds, cmds calls), "after": (seconds, cmds calls)}
+    """
+    from utils import create_rig
+    from utils import ribbon
+
+    previous = ribbon.USE_BASELINE, ribbon.USE_GRAPH_BUILDER
+    results = {}
+
+    try:
+        for key, use_baseline, use_builder in (("before", True, False), ("cmds", False, False), ("after", False, True)):
+            ribbon.USE_BASELINE = use_baseline
+            ribbon.USE_GRAPH_BUILDER = use_builder
+            cmds.file(new=True, force=True)
+            with count_cmds_calls() as calls:
+                start = time.perf_counter()
+                create_rig.AutoRig().build()
+                elapsed = time.perf_counter() - start
+            results[key] = (elapsed, sum(calls.values()))
+    finally:
+        ribbon.USE_BASELINE, ribbon.USE_GRAPH_BUILDER = previous
+
+    print(f"Full build | before {results['before'][0]:.2f} s ({results['before'][1]} cmds calls) | "
+          f"cmds {results['cmds'][0]:.2f} s ({results['cmds'][1]} cmds calls) | "
+          f"after {results['after'][0]:.2f} s ({results['after'][1]} cmds calls)")
+    return results
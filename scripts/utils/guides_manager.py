@@ -1,4 +1,3 @@
-from importlib import reload
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
 import json
@@ -7,10 +6,127 @@ import pathlib
 
 from utils import data_manager
 from utils import rig_manager
+from utils import asset_store
 
-# Recarga de módulos
-reload(data_manager)
-reload(rig_manager)
+
+# Cache de índices de guías: character_name -> GuideIndex.
+# Se recupera de globals() para sobrevivir a los reload() de los módulos.
+_GUIDE_INDEX_CACHE = globals().get("_GUIDE_INDEX_CACHE", {})
+
+
+class GuideIndex(object):
+
+    """
+    Parsed-once view of a .guides file for a character.
+    Gives O(1) lookups by guide name and by guide type (joints, locators, curves, surfaces).
+    """
+
+    def __init__(self, character_name, path, stamp, data):
+
+        """
+        Args:
+            character_name (str): Name of the character.
+            path (str): Path of the .guides file the index was built from.
+            stamp (tuple): (mtime_ns, size) of the file when it was parsed.
+            data (dict): Guides dictionary of the character.
+        """
+
+        self.character_name = character_name
+        self.path = path
+        self.stamp = stamp
+        self.data = data
+
+        self.joints = set()
+        self.locators = set()
+        self.curves = set()
+        self.surfaces = set()
+
+        for guide, info in data.items():
+            if info.get("isJoint"):
+                self.joints.add(guide)
+            elif info.get("isLocator"):
+                self.locators.add(guide)
+            elif info.get("isCurve"):
+                self.curves.add(guide)
+            elif info.get("isSurface"):
+                self.surfaces.add(guide)
+
+    def __contains__(self, guide_name):
+        return guide_name in self.data
+
+    def get(self, guide_name):
+
+        """
+        Returns the stored data of a guide, or None if it does not exist.
+        """
+
+        return self.data.get(guide_name)
+
+
+def _file_stamp(path):
+
+    """
+    Returns the (mtime_ns, size) stamp used to detect changes in a file.
+    """
+
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_guide_index(character_name):
+
+    """
+    Returns the GuideIndex for the latest .guides file of a character.
+    The file is only parsed again when it changes on disk (different path, mtime or size).
+
+    Args:
+        character_name (str): Name of the character.
+
+    Returns:
+        GuideIndex: The index, or None if the guides file could not be found or read.
+    """
+
+    guides_folder = rig_manager.asset_path(character_name, "guides")
+    guides_file = rig_manager.get_latest_version(guides_folder)
+
+    if not guides_file or not os.path.exists(guides_file):
+        om.MGlobal.displayError(f"[LOG ERROR] No se encontró archivo de guías en: {guides_folder}")
+        return None
+
+    guides_file = str(guides_file)
+    stamp = _file_stamp(guides_file)
+
+    index = _GUIDE_INDEX_CACHE.get(character_name)
+    if index and index.path == guides_file and index.stamp == stamp:
+        return index
+
+    try:
+        with open(guides_file, "r") as input_file:
+            guides_info = json.load(input_file)
+    except Exception as e:
+        om.MGlobal.displayError(f"[LOG ERROR] Error leyendo JSON: {str(e)}")
+        return None
+
+    character_data = guides_info.get(character_name)
+    if character_data is None:
+        om.MGlobal.displayError(f"[LOG ERROR] El personaje '{character_name}' no está en el JSON.")
+        return None
+
+    index = GuideIndex(character_name, guides_file, stamp, character_data)
+    _GUIDE_INDEX_CACHE[character_name] = index
+    return index
+
+
+def invalidate_guide_index(character_name=None):
+
+    """
+    Drops the cached guide index of a character, or of every character if none is given.
+    """
+
+    if character_name is None:
+        _GUIDE_INDEX_CACHE.clear()
+    else:
+        _GUIDE_INDEX_CACHE.pop(character_name, None)
 
 def get_guides_info(path=None):
     """
@@ -182,6 +298,9 @@ def get_guides_info(path=None):
 
     with open(TEMPLATE_FILE, "w") as output_file:
         json.dump(guides_data, output_file, indent=4)
+
+    invalidate_guide_index(CHARACTER_NAME)
+    asset_store.commit_version(TEMPLATE_FILE)
     
     om.MGlobal.displayInfo(f"Guías guardadas con éxito en: {TEMPLATE_FILE}")
 
@@ -407,15 +526,9 @@ def get_guides(guide_export, parent=None):
     """
 
     CHARACTER_NAME = rig_manager.get_character_name_from_build()
-    TEMPLATE_PATH = rig_manager.asset_path(CHARACTER_NAME, "guides")
-    TEMPLATE_FILE = rig_manager.get_latest_version(TEMPLATE_PATH)
+    guide_index = get_guide_index(CHARACTER_NAME)
 
-    
-    path = pathlib.Path(TEMPLATE_FILE)
-    parts = path.parts # Get the parts of the path
-    name = parts[parts.index('assets') + 1] # Get the character name after 'assets'
-
-    if not os.path.exists(TEMPLATE_FILE):
+    if guide_index is None:
 
         om.MGlobal.displayError("Guides path does not exist. Please create the guides first.")
 
@@ -423,8 +536,8 @@ def get_guides(guide_export, parent=None):
     
     else:
 
-        with open(TEMPLATE_FILE, "r") as input_file:
-            guides_data = json.load(input_file)
+        name = CHARACTER_NAME
+        guides_data = {name: guide_index.data}
               
         try:
             if guides_data[name][guide_export]["isJoint"] == True:
@@ -593,7 +706,7 @@ def create_new_guides():
 
 def read_guides_info(character_name, guide_name=None):
     """
-    Lee la información de guías. 
+    Lee la información de guías desde el índice cacheado (ver get_guide_index).
     
     MODO 1: Si guide_name es None -> Devuelve TODO el diccionario de guías (para cache).
     MODO 2: Si hay guide_name -> Devuelve True/False si existe.
@@ -608,37 +721,15 @@ def read_guides_info(character_name, guide_name=None):
         None: Si hay error.
     """
     try:
-        complete_path = os.path.realpath(__file__)
-        relative_path = complete_path.split(os.sep + "scripts")[0]
-        base_path = os.path.join(relative_path, "assets")
-        character_path = os.path.join(base_path, character_name)
-        guides_folder = os.path.join(character_path, "guides")
-        
-        guides_file = rig_manager.get_latest_version(guides_folder)
-        
+        guide_index = get_guide_index(character_name)
     except Exception as e:
         om.MGlobal.displayError(f"[LOG ERROR] Error rutas: {str(e)}")
         return None
 
-    if not guides_file or not os.path.exists(guides_file):
-        om.MGlobal.displayError(f"[LOG ERROR] No se encontró archivo de guías en: {guides_folder}")
-        return None
-
-    try:
-        with open(guides_file, 'r') as file:
-            guides_info = json.load(file)
-    except Exception as e:
-        om.MGlobal.displayError(f"[LOG ERROR] Error leyendo JSON: {str(e)}")
-        return None
-
-    character_data = guides_info.get(character_name)
-    
-    if character_data is None:
-        om.MGlobal.displayError(f"[LOG ERROR] El personaje '{character_name}' no está en el JSON.")
+    if guide_index is None:
         return None
 
-    
     if guide_name is None:
-        return character_data
-
+        return guide_index.data
 
+    return guide_name in guide_index
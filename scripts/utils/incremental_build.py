@@ -0,0 +1,347 @@
+import hashlib
+import json
+from contextlib import contextmanager
+
+import maya.cmds as cmds
+from maya.api import OpenMaya as om
+
+from utils import curve_tool
+from utils import data_manager
+from utils import guides_manager
+from utils import module_registry
+from utils import rig_manager
+
+# -----------------------------------------------------------------------------
+# RECONSTRUCCIÓN INCREMENTAL
+# -----------------------------------------------------------------------------
+# Durante el build cada módulo se registra: qué guías pidió a guides_manager.get_guides, qué
+# controladores sacó del template de curvas y qué nodos creó (por UUID). Con eso se calcula una
+# huella del módulo (datos de sus guías, ajustes del .build que recibe y formas de sus
+# controladores) que se guarda en el modules_GRP de la escena. rebuild_changed() vuelve a
+# calcular las huellas sobre la escena ya construida, borra solo los módulos que cambiaron (y los
+# que dependen de ellos), los construye de nuevo y rehace los space switches.
+#
+# from utils import incremental_build
+#
+# incremental_build.rebuild_changed("freya", dry_run=True)    # qué se reconstruiría
+# incremental_build.rebuild_changed("freya")
+# incremental_build.rebuild_changed("freya", force=["eyelid_module"])
+#
+# Desde la UI: create_rig.AutoRig().update()
+
+FINGERPRINT_ATTR = "moduleFingerprints"
+GROUP_SUFFIXES = ("Module_GRP", "Controllers_GRP", "Skinning_GRP")
+SPACE_SWITCH_ATTRS = ("FollowValue", "SpaceSwitch", "SpaceSwitchSep")
+SPACE_SWITCH_NODES = ("PMT", "MMT", "BMT")
+
+
+# ----------------------------------------------------------------
+# --- HUELLAS ---
+# ----------------------------------------------------------------
+def fingerprint(spec, guide_index, settings, guides, controllers, template_index=None):
+    """
+    Hash of everything a module reads to build itself.
+
+    Args:
+        spec (module_registry.ModuleSpec): The module.
+        guide_index (guides_manager.GuideIndex): Guides of the character.
+        settings (dict): .build settings.
+        guides (list): Guide names the module read, their children are included.
+        controllers (list): Controller names the module built from the curves template.
+        template_index (dict, optional): curve_tool.get_template_index() result.
+
+    Returns:
+        str: The hex digest.
+    """
+    if template_index is None:
+        template_index = curve_tool.get_template_index()
+
+    guide_data = {}
+    for guide in guides:
+        info = guide_index.data.get(guide)
+        guide_data[guide] = info
+        for child in (info or {}).get("children", ()):
+            guide_data[child] = guide_index.data.get(child)
+
+    args, kwargs = spec.resolve(settings)
+    when = {name: settings.get(name, module_registry.SETTING_DEFAULTS.get(name)) for name in spec.when}
+    shapes = {ctl: [data for _, data in template_index.get(ctl, ())] for ctl in controllers}
+
+    payload = json.dumps({
+        "target": spec.target,
+        "sides": spec.sides,
+        "guides": guide_data,
+        "settings": [args, kwargs, when],
+        "controllers": shapes,
+    }, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _modules_grp():
+    modules_grp = data_manager.DataExportBiped().get_data("basic_structure", "modules_GRP")
+    if modules_grp and cmds.objExists(modules_grp):
+        return modules_grp
+    return None
+
+
+def load_records():
+    """
+    Returns:
+        dict: Module name -> {"fingerprint", "guides", "controllers", "nodes"} stored in the rig scene.
+    """
+    modules_grp = _modules_grp()
+    if not modules_grp or not cmds.attributeQuery(FINGERPRINT_ATTR, node=modules_grp, exists=True):
+        return {}
+    try:
+        return json.loads(cmds.getAttr(f"{modules_grp}.{FINGERPRINT_ATTR}") or "{}")
+    except ValueError:
+        return {}
+
+
+def save_records(records, removed=()):
+    """
+    Merges the module records into the ones stored in the rig scene.
+
+    Args:
+        records (dict): Module name -> record.
+        removed (list): Module names whose record is dropped.
+    """
+    modules_grp = _modules_grp()
+    if not modules_grp or not (records or removed):
+        return
+
+    stored = load_records()
+    stored.update(records)
+    for name in removed:
+        stored.pop(name, None)
+
+    if not cmds.attributeQuery(FINGERPRINT_ATTR, node=modules_grp, exists=True):
+        cmds.addAttr(modules_grp, longName=FINGERPRINT_ATTR, dataType="string")
+    cmds.setAttr(f"{modules_grp}.{FINGERPRINT_ATTR}", json.dumps(stored, sort_keys=True), type="string")
+
+
+class BuildRecorder(object):
+    """
+    Records the guides, controllers and nodes of every module built inside track(), used by build_rig as the
+    run_plan section next to the profiler.
+    """
+
+    def __init__(self, guide_index, settings):
+        self.guide_index = guide_index
+        self.settings = settings
+        self.records = {}
+
+    @contextmanager
+    def track(self, name):
+        spec = module_registry.get_spec(name)
+        guides = list(spec.guides)
+        controllers = []
+        nodes = []
+
+        get_guides = guides_manager.get_guides
+        build_curves = curve_tool.build_curves_from_template
+
+        def recorded_get_guides(guide_export, *args, **kwargs):
+            guides.append(guide_export)
+            return get_guides(guide_export, *args, **kwargs)
+
+        def recorded_build_curves(target_transform_name=None, *args, **kwargs):
+            if target_transform_name:
+                controllers.append(target_transform_name)
+            return build_curves(target_transform_name, *args, **kwargs)
+
+        def node_added(node, client_data):
+            nodes.append(om.MFnDependencyNode(node).uuid().asString())
+
+        callback = om.MDGMessage.addNodeAddedCallback(node_added, "dependNode")
+        guides_manager.get_guides = recorded_get_guides
+        curve_tool.build_curves_from_template = recorded_build_curves
+        try:
+            yield
+        finally:
+            om.MMessage.removeCallback(callback)
+            guides_manager.get_guides = get_guides
+            curve_tool.build_curves_from_template = build_curves
+
+        # Only modules that finished are recorded, a failed one is rebuilt next time
+        guides = sorted(set(guides))
+        controllers = sorted(set(controllers))
+        self.records[name] = {
+            "fingerprint": fingerprint(spec, self.guide_index, self.settings, guides, controllers),
+            "guides": guides,
+            "controllers": controllers,
+            "nodes": nodes,
+        }
+
+    def save(self):
+        save_records(self.records)
+
+
+# ----------------------------------------------------------------
+# --- CAMBIOS ---
+# ----------------------------------------------------------------
+def changed_modules(plan, guide_index, settings, records, force=()):
+    """
+    Args:
+        plan (module_registry.BuildPlan): Full plan of the character.
+        records (dict): Stored module records (load_records).
+        force (list): Module names rebuilt even if unchanged.
+
+    Returns:
+        dict: Module name -> reason ("new", "changed", "forced") for every RUN step that must be rebuilt.
+    """
+    template_index = curve_tool.get_template_index()
+    changed = {}
+    for step in plan.to_run:
+        spec = step.spec
+        record = records.get(spec.name)
+        if spec.name in force:
+            changed[spec.name] = "forced"
+        elif record is None:
+            changed[spec.name] = "new"
+        elif record["fingerprint"] != fingerprint(spec, guide_index, settings, record["guides"],
+                                                  record["controllers"], template_index):
+            changed[spec.name] = "changed"
+    return changed
+
+
+def with_dependents(plan, names):
+    """
+    Adds to names the RUN steps that read what they write or share their groups, the nodes they connect to
+    are deleted with the rebuilt modules.
+
+    Returns:
+        list: Module names in build order.
+    """
+    rebuild = set(names)
+    grown = True
+    while grown:
+        grown = False
+        produced = set()
+        groups = set()
+        for step in plan.to_run:
+            if step.spec.name in rebuild:
+                produced.update(step.spec.produces)
+                groups.update(step.spec.groups)
+        for step in plan.to_run:
+            spec = step.spec
+            if spec.name not in rebuild and (produced & set(spec.consumes) or groups & set(spec.groups)):
+                rebuild.add(spec.name)
+                grown = True
+    return [name for name in plan.names() if name in rebuild]
+
+
+# ----------------------------------------------------------------
+# --- BORRADO ---
+# ----------------------------------------------------------------
+def delete_module(spec, record=None):
+    """
+    Deletes the nodes a module created (by UUID, from its record) and its Module/Controllers/Skinning groups.
+
+    Returns:
+        int: Number of deleted nodes.
+    """
+    nodes = set(cmds.ls(record.get("nodes", []))) if record else set()
+    nodes.update(f"{prefix}{suffix}" for prefix in spec.groups for suffix in GROUP_SUFFIXES
+                 if cmds.objExists(f"{prefix}{suffix}"))
+    nodes = [node for node in nodes if cmds.objExists(node) and not cmds.lockNode(node, q=True)[0]]
+    if not nodes:
+        return 0
+
+    try:
+        cmds.delete(nodes)
+    except RuntimeError:
+        # Children already gone with their parent or undeletable nodes, fall back to one by one
+        for node in nodes:
+            if cmds.objExists(node):
+                try:
+                    cmds.delete(node)
+                except RuntimeError as e:
+                    om.MGlobal.displayWarning(f"Could not delete {node}: {e}")
+    return len(nodes)
+
+
+def remove_space_switches():
+    """
+    Removes every space switch made by matrix_manager.space_switches: the PMT/MMT/BMT and condition nodes,
+    the switch attributes and the offsetParentMatrix connection of the controllers.
+
+    Returns:
+        list: Controllers that had a space switch.
+    """
+    targets = sorted({plug.split(".")[0] for plug in cmds.ls("*.SpaceSwitch")})
+    for target in targets:
+        nodes = cmds.listConnections(f"{target}.SpaceSwitch", source=False, destination=True) or []
+        nodes += [target.replace("CTL", suffix) for suffix in SPACE_SWITCH_NODES]
+        nodes = [node for node in set(nodes) if cmds.objExists(node)]
+        if nodes:
+            cmds.delete(nodes)
+
+        for attr in SPACE_SWITCH_ATTRS:
+            if cmds.attributeQuery(attr, node=target, exists=True):
+                cmds.setAttr(f"{target}.{attr}", lock=False)
+                cmds.deleteAttr(f"{target}.{attr}")
+
+        cmds.setAttr(f"{target}.offsetParentMatrix", list(om.MMatrix()), type="matrix")
+    return targets
+
+
+# ----------------------------------------------------------------
+# --- RECONSTRUCCIÓN ---
+# ----------------------------------------------------------------
+def rebuild_changed(character_name=None, force=(), dry_run=False):
+    """
+    Rebuilds, in the current rig scene, only the modules whose guides, .build settings or controller shapes
+    changed since they were built, plus the modules that depend on them.
+
+    Args:
+        character_name (str, optional): Defaults to the current asset.
+        force (list): Module names rebuilt even if unchanged.
+        dry_run (bool): Only print and return what would be rebuilt.
+
+    Returns:
+        list: Rebuilt module names in build order, None if there is no rig to update.
+    """
+    character_name = character_name or rig_manager.get_character_name_from_build()
+
+    guide_index = guides_manager.get_guide_index(character_name)
+    rig_settings = rig_manager.build_rig_from_data(character_name)
+    if not guide_index or not rig_settings:
+        om.MGlobal.displayError(f"Missing guides or build settings for: {character_name}")
+        return None
+
+    if not _modules_grp():
+        om.MGlobal.displayError("No rig in the scene to update, build it first (CREAR RIG).")
+        return None
+
+    data = data_manager.DataExportBiped()
+    available = set(module_registry.BASIC_STRUCTURE_KEYS) | data.keys()
+    plan = module_registry.plan_build(guide_index, rig_settings, available=available)
+
+    records = load_records()
+    changed = changed_modules(plan, guide_index, rig_settings, records, force=force)
+    rebuild = with_dependents(plan, changed)
+
+    # Built before but not in the plan anymore (guides removed, settings changed)
+    removed = [name for name in records if name not in plan.names()]
+
+    lines = [f"{name} ({changed.get(name, 'dependent')})" for name in rebuild]
+    lines += [f"{name} (removed)" for name in removed]
+    print(f"--- Incremental build: {character_name} ---\n" + ("\n".join(lines) if lines else "Up to date"))
+    if dry_run or not (rebuild or removed):
+        return rebuild
+
+    try:
+        if "space_switches" in rebuild:
+            remove_space_switches()
+        for name in reversed(rebuild):
+            delete_module(module_registry.get_spec(name), records.get(name))
+        for name in removed:
+            delete_module(module_registry.get_spec(name), records[name])
+        save_records({}, removed=removed)
+
+        rig_manager.build_rig(character_name, modules=rebuild)
+    finally:
+        data.flush()
+
+    return rebuild
@@ -0,0 +1,470 @@
+import os
+import sys
+import importlib
+from contextlib import nullcontext
+
+# -----------------------------------------------------------------------------
+# REGISTRO DE MÓDULOS Y PLANIFICADOR
+# -----------------------------------------------------------------------------
+# Cada módulo del rig se declara una vez: qué guías necesita, con qué lados se construye, qué
+# claves de la cache de build (data_manager, "modulo.clave") lee y cuáles escribe, y qué ajustes
+# del .build recibe. plan_build() ordena los módulos topológicamente por esas claves (a igualdad,
+# en el orden de declaración), marca como saltados los que no tienen guías o entradas, y
+# devuelve un BuildPlan inspeccionable sin tocar Maya; run_plan() lo ejecuta.
+#
+# from utils import module_registry, guides_manager
+#
+# plan = module_registry.plan_build(guides_manager.get_guide_index("freya"), settings)
+# print(plan.describe())                      # dry run
+# module_registry.run_plan(plan, settings)
+# plan = module_registry.plan_build(index, settings, only=["eyelid_module"])   # build parcial
+#
+# Desde el build: rig_manager.build_rig("freya", modules=["eyelid_module"], dry_run=True)
+#
+# Los módulos se importan la primera vez que un build los usa y una sola vez por sesión. Para
+# desarrollo, module_registry.enable_hot_reload() (o AUTORIG_HOT_RELOAD=1 antes de abrir Maya)
+# hace que cada build recargue los utils compartidos (hot_reload) y cada módulo antes de usarlo.
+
+BIPED = 0
+QUADRUPED = 1
+
+# Defaults of the .build settings, same values build_rig always used
+SETTING_DEFAULTS = {
+    "Rig_Type": BIPED,
+    "spine_skinning_jnts": 8,
+    "spine_controllers": 5,
+    "neck_skinning_jnts": 5,
+    "neck_controllers": 2,
+    "arm_skinning_jnts": 5,
+    "leg_skinning_jnts": 5,
+    "tail_skinning_jnts": 5,
+    "tail_controllers": 5,
+    "mGear_integration": 0,
+}
+
+# Written by basic_structure.create_basic_structure before build_rig runs
+BASIC_STRUCTURE_KEYS = (
+    "basic_structure.character_name",
+    "basic_structure.skel_GRP",
+    "basic_structure.modules_GRP",
+    "basic_structure.masterwalk_ctl",
+    "basic_structure.character_ctl",
+    "basic_structure.preferences_ctl",
+)
+
+STRUCTURE = ("basic_structure.skel_GRP", "basic_structure.modules_GRP", "basic_structure.masterwalk_ctl")
+FACIAL = STRUCTURE + ("basic_structure.preferences_ctl", "neck_module.face_ctl", "neck_module.head_ctl")
+
+RUN = "run"
+SKIP = "skip"
+
+# Shared modules reloaded by hot_reload(), dependencies first. Rig modules are reloaded by ModuleSpec.load
+HOT_RELOAD_ORDER = (
+    "utils.data_manager",
+    "utils.version_catalog",
+    "utils.de_boor_core",
+    "utils.arc_length",
+    "utils.ribbon_plan",
+    "utils.graph_builder",
+    "utils.ribbon",
+    "utils.curve_tool",
+    "utils.matrix_manager",
+    "utils.custom_ik_solver",
+    "utils.rig_manager",
+    "utils.guides_manager",
+    "utils.basic_structure",
+    "utils.build_profiler",
+    "utils.incremental_build",
+    "tools.skin_binary",
+    "tools.skin_delta",
+    "tools.skin_stream",
+    "tools.skin_manager_api",
+)
+
+# Modo desarrollo. Se recupera de globals() para sobrevivir a los reload().
+_STATE = globals().get("_STATE", {"hot_reload": os.environ.get("AUTORIG_HOT_RELOAD") == "1"})
+
+
+def enable_hot_reload():
+    """
+    Developer mode: every build reloads the shared utils and each rig module before using it.
+    """
+    _STATE["hot_reload"] = True
+
+
+def disable_hot_reload():
+    _STATE["hot_reload"] = False
+
+
+def hot_reload_enabled():
+    return _STATE["hot_reload"]
+
+
+def hot_reload():
+    """
+    Reloads the already imported modules of HOT_RELOAD_ORDER, only in hot-reload mode. Called once at the
+    start of a build (AutoRig.build, AutoRig.update).
+
+    Returns:
+        list: Names of the reloaded modules.
+    """
+    if not _STATE["hot_reload"]:
+        return []
+
+    reloaded = []
+    for module_name in HOT_RELOAD_ORDER:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            importlib.reload(module)
+            reloaded.append(module_name)
+    return reloaded
+
+
+class ModuleSpec(object):
+    """
+    Declaration of a buildable module.
+
+    Args:
+        name (str): Unique name of the step.
+        target (str): "package.module:ClassName" built with Class().make(side, *args, **kwargs) for every side,
+            or "package.module:function" called once with *args.
+        guides (tuple): Guide names that must exist.
+        sides (tuple): Sides passed to make().
+        consumes (tuple): Build cache keys read, "module.key". "{side}" is expanded with key_sides.
+        produces (tuple): Build cache keys written.
+        args (tuple): Setting names passed positionally after the side.
+        kwargs (dict): make() keyword -> setting name.
+        when (dict): Setting name -> required value.
+        key_sides (tuple, optional): Sides used to expand "{side}" in the keys. Defaults to sides.
+        groups (tuple): Prefixes of the module groups ("{prefix}Module_GRP", "Controllers_GRP", "Skinning_GRP"),
+            "{side}" is expanded with sides. Used by incremental_build to replace the module.
+        reload (bool): Reload the module before building when hot-reload mode is on.
+    """
+
+    def __init__(self, name, target, guides=(), sides=("C",), consumes=(), produces=(), args=(), kwargs=None,
+                 when=None, key_sides=None, groups=(), reload=True):
+        self.name = name
+        self.target = target
+        self.guides = tuple(guides)
+        self.sides = tuple(sides)
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs or {})
+        self.when = dict(when or {})
+        self.reload = reload
+
+        key_sides = self.sides if key_sides is None else tuple(key_sides)
+        self.consumes = _expand(consumes, key_sides)
+        self.produces = _expand(produces, key_sides)
+        self.groups = _expand(groups, self.sides)
+
+    def __repr__(self):
+        return f"ModuleSpec({self.name!r})"
+
+    @property
+    def module_path(self):
+        return self.target.split(":")[0]
+
+    def load(self):
+        """
+        Imports the target module on first use, later calls get it from sys.modules.
+        Returns:
+            tuple: (python module, class or function of the target)
+        """
+        module_path, attr = self.target.split(":")
+        module = importlib.import_module(module_path)
+        if self.reload and _STATE["hot_reload"]:
+            module = importlib.reload(module)
+        return module, getattr(module, attr)
+
+    def resolve(self, settings):
+        """
+        Returns:
+            tuple: (args, kwargs) with the setting values.
+        """
+        args = tuple(settings.get(name, SETTING_DEFAULTS.get(name)) for name in self.args)
+        kwargs = {key: settings.get(name, SETTING_DEFAULTS.get(name)) for key, name in self.kwargs.items()}
+        return args, kwargs
+
+    def enabled(self, settings):
+        return all(settings.get(name, SETTING_DEFAULTS.get(name)) == value for name, value in self.when.items())
+
+
+def _expand(keys, sides):
+    expanded = []
+    for key in keys:
+        for side in (sides if "{side}" in key else (None,)):
+            value = key.format(side=side) if side else key
+            if value not in expanded:
+                expanded.append(value)
+    return tuple(expanded)
+
+
+# ----------------------------------------------------------------
+# --- REGISTRO ---
+# ----------------------------------------------------------------
+# Declaration order is the build order whenever the keys do not force another one
+REGISTRY = [
+    ModuleSpec("spine_module", "biped.autorig.spine_module:SpineModule",
+               guides=("C_spine00_JNT",), consumes=STRUCTURE,
+               produces=("spine_module.local_hip_ctl", "spine_module.body_ctl", "spine_module.local_chest_ctl",
+                         "spine_module.last_spine_jnt"),
+               args=("spine_skinning_jnts", "spine_controllers"), when={"Rig_Type": BIPED}, groups=("{side}_spine",)),
+    # The quadruped spine does not write its controllers to the build cache (append_data is commented out)
+    ModuleSpec("quad_spine_module", "quadruped.autorig.spine_module:SpineModule",
+               guides=("C_spine00_JNT",), consumes=STRUCTURE,
+               args=("spine_skinning_jnts", "spine_controllers"), when={"Rig_Type": QUADRUPED},
+               groups=("{side}_spine",)),
+    ModuleSpec("neck_module", "biped.autorig.neck_module_de_boor:NeckModule",
+               guides=("C_neck00_JNT",), consumes=STRUCTURE + ("basic_structure.preferences_ctl",),
+               produces=("neck_module.head_ctl", "neck_module.neck_ctl", "neck_module.face_ctl",
+                         "neck_module.head_guide"),
+               args=("neck_skinning_jnts", "neck_controllers"), kwargs={"mGear_integration": "mGear_integration"},
+               when={"Rig_Type": BIPED}, groups=("{side}_neck",)),
+    ModuleSpec("quad_neck_module", "quadruped.autorig.neck_module:NeckModule",
+               guides=("C_neck00_JNT",), consumes=STRUCTURE + ("basic_structure.preferences_ctl",),
+               produces=("neck_module.head_ctl", "neck_module.neck_ctl", "neck_module.face_ctl",
+                         "neck_module.head_guide"),
+               args=("neck_skinning_jnts", "neck_controllers"), when={"Rig_Type": QUADRUPED}, groups=("{side}_neck",)),
+    ModuleSpec("leg_module", "biped.autorig.leg_module_de_boor:LegModule",
+               guides=("L_hip_JNT", "R_hip_JNT"), sides=("L", "R"),
+               consumes=STRUCTURE + ("spine_module.local_hip_ctl",),
+               produces=("leg_module.{side}_hip_JNT", "leg_module.{side}_knee_JNT", "leg_module.{side}_ankle_JNT",
+                         "leg_module.{side}_legIk", "leg_module.{side}_hipFk", "leg_module.{side}_legPv",
+                         "leg_module.{side}_rootIk"),
+               args=("leg_skinning_jnts",), when={"Rig_Type": BIPED}, groups=("{side}_leg",)),
+    ModuleSpec("front_limb_module", "quadruped.autorig.limb_module:LimbModule",
+               guides=("L_frontLeg_JNT", "R_frontLeg_JNT"), sides=("L", "R"), consumes=STRUCTURE,
+               args=("leg_skinning_jnts",), when={"Rig_Type": QUADRUPED}, groups=("{side}_limb",)),
+    ModuleSpec("back_limb_module", "quadruped.autorig.limb_module:LimbModule",
+               guides=("L_backLeg_JNT", "R_backLeg_JNT"), sides=("L", "R"), consumes=STRUCTURE,
+               args=("leg_skinning_jnts",), when={"Rig_Type": QUADRUPED}, groups=("{side}_limb",)),
+    ModuleSpec("clavicle_module", "biped.autorig.clavicle_module:ClavicleModule",
+               guides=("L_clavicle_JNT", "R_clavicle_JNT"), sides=("L", "R"), consumes=STRUCTURE,
+               produces=("clavicle_module.{side}_clavicle",), groups=("{side}_clavicle",)),
+    ModuleSpec("arm_module", "biped.autorig.arm_module_de_boor:ArmModule",
+               guides=("L_shoulder_JNT", "R_shoulder_JNT"), sides=("L", "R"), consumes=STRUCTURE,
+               produces=("arm_module.{side}_shoulder_JNT", "arm_module.{side}_wrist_JNT",
+                         "arm_module.{side}_armSettings", "arm_module.{side}_armIk", "arm_module.{side}_armPv",
+                         "arm_module.{side}_shoulderFk", "arm_module.{side}_armIkRoot"),
+               args=("arm_skinning_jnts",), groups=("{side}_arm",)),
+    ModuleSpec("fingers_module", "biped.autorig.fingers_module:FingersModule",
+               guides=("L_thumb00_JNT", "R_thumb00_JNT"), sides=("L", "R"),
+               consumes=STRUCTURE + ("arm_module.{side}_wrist_JNT",), groups=("{side}_fingers",)),
+    ModuleSpec("tail_module", "quadruped.autorig.tail_module:TailModule",
+               guides=("C_tail00_JNT",), consumes=STRUCTURE, args=("tail_skinning_jnts", "tail_controllers"),
+               groups=("{side}_tail",)),
+
+    # ---- Facial ----
+    ModuleSpec("jaw_module", "biped.autorig.jaw_module:JawModule",
+               guides=("C_jaw_JNT",), consumes=FACIAL, produces=("jaw_module.jaw_ctl", "jaw_module.upper_jaw_ctl"),
+               groups=("C_jaw",)),
+    ModuleSpec("eyebrow_module", "biped.autorig.eyebrow_module:EyebrowModule",
+               guides=("L_eyebrowMain_JNT", "R_eyebrowMain_JNT"), sides=("L", "R"), consumes=FACIAL,
+               groups=("C_eyebrow",)),
+    ModuleSpec("eyelid_module", "biped.autorig.eyelid_module:EyelidModule",
+               guides=("L_eye_JNT", "R_eye_JNT"), sides=("L", "R"), consumes=FACIAL + ("neck_module.head_guide",),
+               groups=("C_eyelid",)),
+    ModuleSpec("tongue_module", "biped.autorig.tongue_module:TongueModule",
+               guides=("C_tongue00_JNT",), consumes=FACIAL + ("neck_module.head_guide",), groups=("{side}_tongue",)),
+    ModuleSpec("teeth_module", "biped.autorig.teeth_module:TeethModule",
+               guides=("C_upperTeeth_JNT",), consumes=FACIAL + ("jaw_module.jaw_ctl", "jaw_module.upper_jaw_ctl"),
+               groups=("{side}_teeth",)),
+    ModuleSpec("ear_module", "biped.autorig.ear_module:EarModule",
+               guides=("L_ear00_JNT", "R_ear00_JNT"), sides=("L", "R"), consumes=FACIAL, groups=("C_ear",)),
+    ModuleSpec("nose_module", "biped.autorig.nose_module:NoseModule",
+               guides=("C_nose_JNT",), sides=("L", "R"), consumes=FACIAL, groups=("C_nose",)),
+    ModuleSpec("cheekbone_module", "biped.autorig.cheekbone_module:CheekboneModule",
+               guides=("L_cheekbone_JNT", "R_cheekbone_JNT"), sides=("L", "R"),
+               consumes=FACIAL + ("neck_module.head_guide",), groups=("C_cheekbone",)),
+
+    # ---- Space switches ----
+    ModuleSpec("space_switches", "utils.rig_manager:biped_space_switches", sides=(), key_sides=("L", "R"),
+               consumes=("basic_structure.masterwalk_ctl", "spine_module.local_chest_ctl", "spine_module.body_ctl",
+                         "spine_module.local_hip_ctl", "neck_module.head_ctl", "neck_module.neck_ctl",
+                         "arm_module.{side}_armIk", "arm_module.{side}_armPv", "arm_module.{side}_shoulderFk",
+                         "arm_module.{side}_armIkRoot", "leg_module.{side}_legIk", "leg_module.{side}_legPv",
+                         "leg_module.{side}_hipFk", "leg_module.{side}_rootIk", "clavicle_module.{side}_clavicle"),
+               when={"Rig_Type": BIPED, "mGear_integration": 0}, reload=False),
+]
+
+
+def get_spec(name):
+    for spec in REGISTRY:
+        if spec.name == name:
+            return spec
+    raise KeyError(f"Unknown module: {name}")
+
+
+# ----------------------------------------------------------------
+# --- PLAN ---
+# ----------------------------------------------------------------
+class BuildStep(object):
+
+    def __init__(self, spec, status, reason=None, missing=()):
+        self.spec = spec
+        self.status = status
+        self.reason = reason
+        self.missing = tuple(missing)
+
+    def __repr__(self):
+        return f"BuildStep({self.spec.name!r}, {self.status!r})"
+
+
+class BuildPlan(object):
+    """
+    Ordered steps of a build. Skipped steps keep the reason (guides, settings, missing inputs, not selected).
+    """
+
+    def __init__(self, steps):
+        self.steps = steps
+
+    @property
+    def to_run(self):
+        return [step for step in self.steps if step.status == RUN]
+
+    @property
+    def skipped(self):
+        return [step for step in self.steps if step.status == SKIP]
+
+    def names(self):
+        return [step.spec.name for step in self.to_run]
+
+    def describe(self):
+        """
+        Returns:
+            str: One line per step, the dry-run view of the build.
+        """
+        lines = []
+        for i, step in enumerate(self.steps):
+            if step.status == RUN:
+                sides = f" [{', '.join(step.spec.sides)}]" if step.spec.sides else ""
+                lines.append(f"{i:02d} RUN  {step.spec.name}{sides}")
+            else:
+                missing = f": {', '.join(step.missing)}" if step.missing else ""
+                lines.append(f"{i:02d} SKIP {step.spec.name} ({step.reason}{missing})")
+        return "\n".join(lines)
+
+
+def _topological_order(specs):
+    """
+    Kahn's algorithm over the producer -> consumer edges, ties resolved by declaration order.
+    """
+    producers = {}
+    for spec in specs:
+        for key in spec.produces:
+            producers.setdefault(key, []).append(spec)
+
+    index = {spec.name: i for i, spec in enumerate(specs)}
+    depends = {spec.name: set() for spec in specs}
+    for spec in specs:
+        for key in spec.consumes:
+            for producer in producers.get(key, ()):
+                if producer is not spec:
+                    depends[spec.name].add(producer.name)
+
+    ordered = []
+    done = set()
+    while len(ordered) < len(specs):
+        ready = [spec for spec in specs if spec.name not in done and depends[spec.name] <= done]
+        if not ready:
+            cycle = sorted(name for name in depends if name not in done)
+            raise ValueError(f"Module dependency cycle between: {', '.join(cycle)}")
+        spec = min(ready, key=lambda s: index[s.name])
+        ordered.append(spec)
+        done.add(spec.name)
+    return ordered
+
+
+def plan_build(guide_index, settings, only=None, with_dependencies=False, available=None, registry=None):
+    """
+    Orders and filters the registered modules for a build without touching Maya.
+
+    Args:
+        guide_index (dict or set): Guide names of the character (guides_manager.get_guide_index).
+        settings (dict): .build settings, missing values use SETTING_DEFAULTS.
+        only (list, optional): Module names of a partial build, the rest are skipped.
+        with_dependencies (bool): With only, also build the modules that produce their inputs.
+        available (set, optional): Build cache keys already present. Defaults to BASIC_STRUCTURE_KEYS.
+        registry (list, optional): ModuleSpec list. Defaults to REGISTRY.
+
+    Returns:
+        BuildPlan: The plan.
+    """
+    registry = REGISTRY if registry is None else registry
+    available = set(BASIC_STRUCTURE_KEYS if available is None else available)
+    settings = settings or {}
+
+    selected = None
+    if only is not None:
+        selected = set(only)
+        unknown = selected - {spec.name for spec in registry}
+        if unknown:
+            raise KeyError(f"Unknown modules: {', '.join(sorted(unknown))}")
+
+    candidates = [spec for spec in registry if spec.enabled(settings)]
+
+    if selected is not None and with_dependencies:
+        producers = {}
+        for spec in candidates:
+            for key in spec.produces:
+                producers.setdefault(key, []).append(spec)
+        pending = [spec for spec in candidates if spec.name in selected]
+        while pending:
+            spec = pending.pop()
+            for key in spec.consumes:
+                for producer in producers.get(key, ()):
+                    if producer.name not in selected:
+                        selected.add(producer.name)
+                        pending.append(producer)
+
+    steps = []
+    produced = set(available)
+    for spec in _topological_order(candidates):
+        missing_guides = [guide for guide in spec.guides if guide not in guide_index]
+        if missing_guides:
+            steps.append(BuildStep(spec, SKIP, "missing guides", missing_guides))
+            continue
+        if selected is not None and spec.name not in selected:
+            steps.append(BuildStep(spec, SKIP, "not selected"))
+            continue
+        missing_inputs = [key for key in spec.consumes if key not in produced]
+        if missing_inputs:
+            steps.append(BuildStep(spec, SKIP, "missing inputs", missing_inputs))
+            continue
+        steps.append(BuildStep(spec, RUN))
+        produced.update(spec.produces)
+
+    for spec in registry:
+        if not spec.enabled(settings):
+            steps.append(BuildStep(spec, SKIP, "disabled by settings"))
+
+    return BuildPlan(steps)
+
+
+def run_plan(plan, settings, section=None):
+    """
+    Builds the RUN steps of a plan in order.
+
+    Args:
+        plan (BuildPlan): The plan.
+        settings (dict): .build settings.
+        section (callable, optional): section(name, module) context manager wrapped around every step
+            (build_profiler.section).
+
+    Returns:
+        list: Names of the built modules.
+    """
+    built = []
+    for step in plan.to_run:
+        spec = step.spec
+        module, target = spec.load()
+        args, kwargs = spec.resolve(settings)
+
+        with section(spec.name, module) if section else nullcontext():
+            if isinstance(target, type):
+                for side in spec.sides:
+                    target().make(side, *args, **kwargs)
+            else:
+                target(*args, **kwargs)
+        built.append(spec.name)
+    return built
@@ -1,8 +1,10 @@
+import time
 import maya.cmds as cmds
 from maya.api import OpenMaya as om
 from utils import de_boor_core as core
-import importlib
-importlib.reload(core)
+from utils import arc_length
+from utils import ribbon_plan
+from utils import graph_builder
 
 
 OPEN = 'open'
@@ -10,10 +12,16 @@ PERIODIC = 'periodic'
 AXIS_VECTOR = {'x': (1, 0, 0), 'y': (0, 1, 0), 'z': (0, 0, 1), "-x": (-1, 0, 0), "-y": (0, -1, 0), "-z": (0, 0, -1)}
 KNOT_TO_FORM_INDEX = {OPEN: om.MFnNurbsCurve.kOpen, PERIODIC: om.MFnNurbsCurve.kPeriodic}
 
+# False routes de_boor_ribbon to de_boor_ribbon_cmds (same math, cmds calls instead of a GraphBuilder commit)
+USE_GRAPH_BUILDER = globals().get("USE_GRAPH_BUILDER", True)
+# True routes de_boor_ribbon to the untouched original (ribbon_baseline), the "before" of graph_builder.benchmark_build
+USE_BASELINE = globals().get("USE_BASELINE", False)
+
 
 def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5, tangent_offset=0.001, d=None, kv_type=OPEN,
                    param_from_length=False, tol=0.000001, name='ribbon', use_position=True, use_tangent=True,
-                   use_up=True, use_scale=True, custom_parameter=[], skeleton_grp=None):
+                   use_up=True, use_scale=True, custom_parameter=[], skeleton_grp=None, max_influences_per_joint=None,
+                   verbose=False):
     """
     Use controls and de_boor function to get position, tangent and up values for joints.  The param_from_length can
     be used to get the parameter values using a fraction of the curve length, otherwise the parameter values will be
@@ -52,6 +60,10 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
 
         aimMatrix not created when use_tangent=False and use_up=False, otherwise it is
 
+        The network is planned headless by ribbon_plan.plan_ribbon (weights, offset matrices, nodes and connections)
+        and then created by execute_ribbon_plan in a single GraphBuilder commit. Scene data (cv plugs and
+        matrices) is read once before planning.
+
         Examples:
         from maya import cmds
         import ribbon
@@ -93,7 +105,7 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
             aim_axis (str): aim axis of the output joints
             up_axis (str): up axis of the output joints
             num_joints (int): number of output joints to be created
-            tangent_offset (float): tolerance used to optimization
+            tangent_offset (float): scale of the curve derivative added to the position to get the tangent target
             d (int): degree of the basis functions
             kv_type (str): 'open' or 'periodic', 'periodic' will create a closed curve
             param_from_length (bool): evenly distributes joints along the curve if cvs are not evenly spaced
@@ -103,11 +115,172 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
             use_tangent (bool): if True (and use_position is True) then create tangent setup else set tangent
             use_up (bool): if True then create up setup else set up
             use_scale (bool): if True then create scale setup
+            max_influences_per_joint (int, optional): keep only the k largest basis weights per wtAddMatrix and
+                renormalize them, fewer connections for long chains at the cost of a small position error
+            verbose (bool): if True report the max position error introduced by max_influences_per_joint
 
     Returns:
         list: joints
     """
 
+    if USE_BASELINE:
+        from utils import ribbon_baseline
+        return ribbon_baseline.de_boor_ribbon(cvs, ctls_grp=ctls_grp, aim_axis=aim_axis, up_axis=up_axis,
+                                              num_joints=num_joints, tangent_offset=tangent_offset, d=d,
+                                              kv_type=kv_type, param_from_length=param_from_length, tol=tol,
+                                              name=name, use_position=use_position, use_tangent=use_tangent,
+                                              use_up=use_up, use_scale=use_scale, custom_parameter=custom_parameter,
+                                              skeleton_grp=skeleton_grp)
+
+    if not USE_GRAPH_BUILDER:
+        return de_boor_ribbon_cmds(cvs, ctls_grp=ctls_grp, aim_axis=aim_axis, up_axis=up_axis, num_joints=num_joints,
+                                   tangent_offset=tangent_offset, d=d, kv_type=kv_type,
+                                   param_from_length=param_from_length, tol=tol, name=name,
+                                   use_position=use_position, use_tangent=use_tangent, use_up=use_up,
+                                   use_scale=use_scale, custom_parameter=custom_parameter, skeleton_grp=skeleton_grp)
+
+    ctls = []
+    grps = []
+
+    if ctls_grp is not None: # If the first cv is not a control
+
+        for i, cv in enumerate(cvs):
+                
+                grp = cmds.createNode("transform", n=f"{name}0{i}_GRP")
+                ctl = cmds.circle(n=f"{name}0{i}_CTL", nr=(1,0,0), ch=False)[0] # Create a controller circle
+                cmds.parent(grp, ctls_grp)
+                if cmds.listRelatives(ctl, parent=True) != grp:
+                    cmds.parent(ctl, grp)
+                    cmds.matchTransform(grp, cv, pos=True, rot=True, scl=False)
+                grps.append(grp)
+                ctls.append(ctl)
+
+    # ----- scene data, read once
+    cv_plugs = [get_matrix_plug(cv) for cv in cvs]
+    cv_matrices = [cmds.getAttr(plug) for plug in cv_plugs]
+
+    if skeleton_grp is None:
+        first_cv = 0 if kv_type == OPEN else len(cvs) - 1 # Periodic helper order starts at the last cv
+        skeleton_grp = cmds.createNode('transform', n=f'{name}Skinning_GRP')
+        cmds.xform(skeleton_grp, m=cv_matrices[first_cv], ws=True)
+
+    skeleton_matrix = cmds.getAttr(f'{skeleton_grp}.worldMatrix[0]')
+
+    plan = ribbon_plan.plan_ribbon(cvs, cv_plugs, cv_matrices, skeleton_grp, skeleton_matrix=skeleton_matrix,
+                                   aim_axis=aim_axis, up_axis=up_axis, num_joints=num_joints,
+                                   tangent_offset=tangent_offset, d=d, kv_type=kv_type,
+                                   param_from_length=param_from_length, tol=tol, name=name,
+                                   use_position=use_position, use_tangent=use_tangent, use_up=use_up,
+                                   use_scale=use_scale, custom_parameter=custom_parameter,
+                                   max_influences_per_joint=max_influences_per_joint)
+
+    names = execute_ribbon_plan(plan)
+
+    if verbose and max_influences_per_joint:
+        om.MGlobal.displayInfo(f"{name}: {max_influences_per_joint} influences per joint, "
+                               f"max position error {plan.max_error:.6f}")
+
+    return [names[jnt] for jnt in plan.joints], [names[temp] for temp in plan.temp_nodes]
+
+
+def get_matrix_plug(node):
+
+    """
+    Returns the matrix output plug of a node: worldMatrix[0], outputMatrix, output, matrix or matrixSum.
+    """
+
+    for attr in 'worldMatrix[0]', 'outputMatrix', 'output', 'matrix', 'matrixSum':
+        if cmds.objExists(f'{node}.{attr}'):
+            return f'{node}.{attr}'
+
+    raise ValueError(f'{node} has no matrix output plug')
+
+
+def execute_ribbon_plan(plan):
+
+    """
+    Creates the network of a ribbon_plan.RibbonPlan with a single graph_builder.GraphBuilder commit.
+    Nothing is left in the scene if the commit fails.
+
+    Returns:
+        dict: plan node name -> created node name (Maya renames on clashes)
+    """
+
+    builder = graph_builder.GraphBuilder(dag_types=ribbon_plan.DAG_TYPES)
+
+    for node, node_type, parent in plan.nodes:
+        builder.create_node(node_type, node, parent)
+
+    for src, dst in plan.connections:
+        builder.connect(src, dst)
+
+    for plug_path, value in plan.values:
+        builder.set_attr(plug_path, value)
+
+    return builder.commit()
+
+
+def benchmark_ribbon(cvs, repeat=3, **kwargs):
+
+    """
+    from utils import ribbon
+
+    ribbon.benchmark_ribbon(cmds.ls(sl=True), num_joints=20)
+
+    Compares, on the given cvs, the untouched original ribbon (ribbon_baseline), de_boor_ribbon_cmds (current
+    math, cmds calls) and de_boor_ribbon (plan + GraphBuilder commit). The speedup is measured against the
+    original. Created nodes are deleted after every run.
+
+    Returns:
+        dict: mean seconds of "baseline", "cmds", "plan" (planning only) and "plan_execute"
+    """
+
+    from utils import ribbon_baseline
+
+    def run(func):
+        before = set(cmds.ls())
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        cmds.delete([node for node in cmds.ls() if node not in before])
+        return elapsed
+
+    cv_plugs = [get_matrix_plug(cv) for cv in cvs]
+    cv_matrices = [cmds.getAttr(plug) for plug in cv_plugs]
+    plan_kwargs = {k: v for k, v in kwargs.items() if k not in ('ctls_grp', 'skeleton_grp')}
+
+    # Neither cmds path takes influence pruning
+    cmds_kwargs = {k: v for k, v in kwargs.items() if k != 'max_influences_per_joint'}
+
+    results = {"baseline": 0.0, "cmds": 0.0, "plan": 0.0, "plan_execute": 0.0}
+
+    for _ in range(repeat):
+        results["baseline"] += run(lambda: ribbon_baseline.de_boor_ribbon(cvs, **cmds_kwargs))
+        results["cmds"] += run(lambda: de_boor_ribbon_cmds(cvs, **cmds_kwargs))
+        results["plan_execute"] += run(lambda: de_boor_ribbon(cvs, **kwargs))
+
+        core.clear_basis_cache(reset_stats=False)
+        start = time.perf_counter()
+        ribbon_plan.plan_ribbon(cvs, cv_plugs, cv_matrices, 'benchmark_GRP', **plan_kwargs)
+        results["plan"] += time.perf_counter() - start
+
+    results = {key: value / repeat for key, value in results.items()}
+    print(f"baseline {results['baseline'] * 1000:.1f} ms | cmds {results['cmds'] * 1000:.1f} ms | "
+          f"plan {results['plan'] * 1000:.1f} ms | plan + execute {results['plan_execute'] * 1000:.1f} ms | "
+          f"x{results['baseline'] / results['plan_execute']:.1f}")
+
+    return results
+
+
+def de_boor_ribbon_cmds(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5, tangent_offset=0.001, d=None, kv_type=OPEN,
+                        param_from_length=False, tol=0.000001, name='ribbon', use_position=True, use_tangent=True,
+                        use_up=True, use_scale=True, custom_parameter=[], skeleton_grp=None):
+    """
+    Partially optimized cmds path of de_boor_ribbon: the same headless math as the planner (cached basis,
+    arc-length table, no temporary orientConstraint) but the network is built with interleaved cmds calls.
+    It isolates the cost of the executor; the untouched original is ribbon_baseline.de_boor_ribbon.
+    """
+
     ctls = []
     grps = []
 
@@ -137,7 +310,6 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
 
         kv, _ = core.knot_vector(OPEN, cvs, d)
 
-        m_kv = kv[1:-1]
         m_cvs = cvs[:]
 
     else:  # kv_type is PERIODIC
@@ -146,11 +318,6 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
         for i in range(d):
             m_cvs.append(m_cvs[i])
 
-        m_kv_len = len(m_cvs) + d - 1
-        m_kv_interval = 1 / (m_kv_len - 2 * (d - 1) - 1)
-        m_kv = [-m_kv_interval * (d - 1) * (1 - t / (m_kv_len - 1)) +
-                (1 + m_kv_interval * (d - 1)) * t / (m_kv_len - 1) for t in range(m_kv_len)]
-
         kv, cvs = core.knot_vector(PERIODIC, cvs, d)
 
     temp_nodes = []
@@ -176,31 +343,22 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
     else:
         skeleton_grp = skeleton_grp
 
-    m_cv_poss = om.MPointArray([cmds.xform(obj, q=True, ws=True, t=True) for obj in temp_nodes])
-    form = KNOT_TO_FORM_INDEX[kv_type]
-    is_2d = False
-    rational = True
-    data_creator = om.MFnNurbsCurveData()
-    parent = data_creator.create()
-
-    crv_fn = om.MFnNurbsCurve()
-    crv_fn.create(m_cv_poss, m_kv, d, form, is_2d, rational, parent)
-
     if param_from_length:
 
-        crv_len = crv_fn.length()
-        params = []
-
-        for i in range(num_joints):
+        # Arc-length table built from the CV positions alone, all joints solved in one call
+        cv_poss = {cv: cmds.xform(obj, q=True, ws=True, t=True) for cv, obj in zip(m_cvs, temp_nodes)}
+        cv_poss = [cv_poss[cv] for cv in original_cvs]
+        fractions = [i / (num_joints - 1) for i in range(num_joints)]
 
-            sample_len = crv_len * i / (num_joints - 1)
-
-            if kv_type == PERIODIC:
-                t = crv_fn.findParamFromLength((sample_len + crv_len * m_kv[2] * 0.5) % crv_len)
-                params.append(t - m_kv[2] * 0.5)
-            else:
-                t = crv_fn.findParamFromLength(sample_len)
-                params.append(t)
+        if kv_type == PERIODIC:
+            # One full loop starting where the parameter remap below puts t=0, then map back to t
+            start = kv[d + 1] * (d * 0.5 + 0.5)
+            loop = kv[d + 1] * num_cvs
+            table = arc_length.ArcLengthTable(cv_poss, d, PERIODIC, domain=(start, start + loop))
+            params = [(u - start) / loop for u in table.params_from_fractions(fractions).tolist()]
+        else:
+            table = arc_length.ArcLengthTable(cv_poss, d, OPEN)
+            params = table.params_from_fractions(fractions).tolist()
 
     else:
         params = [i / (num_joints - 1) for i in range(num_joints)]
@@ -293,6 +451,14 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
 
             sca_off_plugs.append(f'{sca_off}.outputMatrix')
 
+    # ----- basis and first-derivative basis for every joint, memoized per ribbon configuration
+    # The tangent target is position + tangent_offset * dC/dt, its weights are an affine combination of the CVs
+    # (the derivative weights add up to 0), so no second evaluation or aim flip is needed at the ends.
+    all_wts, all_d_wts = core.cached_basis(num_cvs, d, kv_type, params, tol=tol, derivative=True)
+    all_tangent_wts = (all_wts + tangent_offset * all_d_wts).tolist()
+    all_wts = all_wts.tolist()
+    aim_vector = om.MVector(AXIS_VECTOR[aim_axis])
+
     jnts = []
 
     for i, param in enumerate(params):
@@ -308,17 +474,11 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
 
         jnts.append(jnt)
 
-        wts = core.de_boor(len(cvs), d, param, kv, tol=tol)
+        wts = all_wts[i]
         if kv_type == PERIODIC:
             wts = get_consolidated_wts(wts, original_cvs, cvs)
 
-        tangent_param = param + tangent_offset
-        aim_vector = om.MVector(AXIS_VECTOR[aim_axis])
-        if tangent_param > 1:
-            tangent_param = param - 2 * tangent_offset
-            aim_vector *= -1
-
-        tangent_wts = core.de_boor(len(cvs), d, tangent_param, kv, tol=tol)
+        tangent_wts = all_tangent_wts[i]
         if kv_type == PERIODIC:
             tangent_wts = get_consolidated_wts(tangent_wts, original_cvs, cvs)
 
@@ -355,21 +515,9 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
         # ----- up setup
         if use_up:
 
-            temp = cmds.createNode('transform')
-            cmds.parent(temp, skeleton_grp)
-            ori_con = cmds.orientConstraint(temp_nodes, temp)[0]
-            cmds.setAttr(f'{ori_con}.interpType', 2)
-            for j, wt in enumerate(wts):
-                cmds.setAttr(f'{ori_con}.{temp_nodes[j]}W{j}', wt)
-
             up = create_wt_add_matrix(par_off_plugs, wts, f'{name}_up_{i}_WAM', tol=tol)
 
-            temp_mat = om.MMatrix(cmds.getAttr(f'{temp}.matrix'))
-            up_inverse = om.MMatrix(cmds.getAttr(f'{up}.matrixSum')).inverse()
-            up_off_val = temp_mat * up_inverse
-
             up_off = cmds.createNode('multMatrix', n=f'{name}_upOffset_{i}_MM')
-            # cmds.setAttr(f'{up_off}.matrixIn[0]', list(up_off_val), type='matrix')
             fourByfour = cmds.createNode('fourByFourMatrix', n=f'{name}_upOffset_{i}_F4X4')
             if up_axis == 'x':
                 cmds.setAttr(f'{fourByfour}.in30', 10)
@@ -393,10 +541,6 @@ def de_boor_ribbon(cvs, ctls_grp=None, aim_axis='x', up_axis='y', num_joints=5,
                     up_plug = f'{ctl}.matrix'
                 elif cmds.objExists(f"{ctl}.matrixSum"):
                     up_plug = f'{ctl}.matrixSum'
-                elif cmds.objExists(f"{temp}.matrix"):
-                    up_plug = f'{temp}.matrix'
-
-            cmds.delete(temp)
 
         aim = cmds.createNode('aimMatrix', n=f'{name}_pointOnCurve_{i}_AM')
 
@@ -466,13 +610,16 @@ def get_consolidated_wts(wts, original_cvs, cvs):
     return [consolidated_wts[cv] for cv in original_cvs]
 
 
-def create_wt_add_matrix(matrix_attrs, wts, name, tol=0.000001):
+def create_wt_add_matrix(matrix_attrs, wts, name, tol=0.000001, max_influences=None):
+
+    if max_influences:
+        wts = ribbon_plan.prune_weights([wts], max_influences)[0][0].tolist()
 
     wam = cmds.createNode('wtAddMatrix', n=name)
 
     for matrix_attr, wt, i in zip(matrix_attrs, wts, range(len(matrix_attrs))):
 
-        if wt < tol:
+        if abs(wt) < tol: # Tangent weights can be negative
             continue
 
         cmds.connectAttr(matrix_attr, f'{wam}.wtMatrix[{i}].matrixIn')
@@ -0,0 +1,518 @@
+import json
+import numpy as np
+
+from utils import de_boor_core as core
+from utils import arc_length
+
+# -----------------------------------------------------------------------------
+# PLANIFICADOR DE RIBBONS
+# -----------------------------------------------------------------------------
+# plan_ribbon() hace toda la matemática de de_boor_ribbon sin tocar Maya y devuelve un
+# RibbonPlan inmutable con los nodos, conexiones, valores (pesos y matrices offset) que hay
+# que crear. Los plugs son strings "nodo.atributo"; si el nodo no está en plan.nodes es un
+# nodo que ya existe en la escena (CVs, skeleton_grp). ribbon.execute_ribbon_plan() aplica
+# el plan con un graph_builder.GraphBuilder en un único commit.
+#
+# Los datos de escena que necesita el plan se leen una sola vez antes de planificar:
+#   cv_plugs     plug de matriz de cada CV (worldMatrix[0], outputMatrix, output, matrix o matrixSum)
+#   cv_matrices  valor de esos plugs, 16 floats cada uno
+#   skeleton_matrix  worldMatrix de skeleton_grp
+
+OPEN = 'open'
+PERIODIC = 'periodic'
+AXIS_VECTOR = {'x': (1, 0, 0), 'y': (0, 1, 0), 'z': (0, 0, 1), "-x": (-1, 0, 0), "-y": (0, -1, 0), "-z": (0, 0, -1)}
+DAG_TYPES = ("transform", "joint")
+IDENTITY = (1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+
+
+class RibbonPlan(object):
+    """
+    Immutable description of the DG network of a De Boor ribbon.
+
+    Attributes:
+        name (str): prefix of the ribbon nodes
+        settings (tuple): (key, value) pairs of the planner arguments
+        nodes (tuple): (node, node_type, parent) in creation order, parent is None for DG nodes
+        connections (tuple): (source_plug, destination_plug)
+        values (tuple): (plug, value), value is a bool, int, float, 3 floats or a 16 floats matrix
+        weights (tuple): (param, wts, tangent_wts) per joint
+        joints (tuple): output joints
+        temp_nodes (tuple): helper transforms following the CVs, returned to the caller
+        max_error (float): max joint position error introduced by influence pruning, 0.0 without pruning
+    """
+
+    __slots__ = ("name", "settings", "nodes", "connections", "values", "weights", "joints", "temp_nodes", "max_error")
+
+    def __init__(self, name, settings, nodes, connections, values, weights, joints, temp_nodes, max_error=0.0):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "settings", tuple((key, tuple(value) if isinstance(value, (list, tuple)) else value)
+                                                   for key, value in settings))
+        object.__setattr__(self, "nodes", tuple(tuple(n) for n in nodes))
+        object.__setattr__(self, "connections", tuple(tuple(c) for c in connections))
+        object.__setattr__(self, "values", tuple((plug, _freeze(value)) for plug, value in values))
+        object.__setattr__(self, "weights", tuple((param, tuple(w), tuple(tw)) for param, w, tw in weights))
+        object.__setattr__(self, "joints", tuple(joints))
+        object.__setattr__(self, "temp_nodes", tuple(temp_nodes))
+        object.__setattr__(self, "max_error", float(max_error))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("RibbonPlan is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, RibbonPlan) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash((self.name, self.nodes, self.connections, self.values))
+
+    def __repr__(self):
+        return (f"RibbonPlan({self.name!r}, nodes={len(self.nodes)}, connections={len(self.connections)}, "
+                f"values={len(self.values)}, joints={len(self.joints)})")
+
+    # ----------------------------------------------------------------
+    # --- SERIALIZACIÓN ---
+    # ----------------------------------------------------------------
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "settings": [[key, list(value) if isinstance(value, tuple) else value] for key, value in self.settings],
+            "nodes": [list(n) for n in self.nodes],
+            "connections": [list(c) for c in self.connections],
+            "values": [[plug, list(value) if isinstance(value, tuple) else value] for plug, value in self.values],
+            "weights": [[param, list(w), list(tw)] for param, w, tw in self.weights],
+            "joints": list(self.joints),
+            "temp_nodes": list(self.temp_nodes),
+            "max_error": self.max_error
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["settings"], data["nodes"], data["connections"],
+                   data["values"], data["weights"], data["joints"], data["temp_nodes"], data.get("max_error", 0.0))
+
+    def to_json(self, path=None):
+        """
+        Returns the plan as JSON, also written to path if given.
+        """
+        text = json.dumps(self.to_dict(), indent=4)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    # ----------------------------------------------------------------
+    # --- COMPARACIÓN ---
+    # ----------------------------------------------------------------
+    def diff(self, other, tol=1e-9):
+        """
+        Differences between two plans.
+
+        Returns:
+            dict: {"nodes": {"added", "removed"}, "connections": {"added", "removed"},
+                   "values": {"added", "removed", "changed": [(plug, old, new)]}}, empty lists if equal.
+        """
+        old_values = dict(self.values)
+        new_values = dict(other.values)
+        changed = [(plug, old_values[plug], new_values[plug]) for plug in old_values
+                   if plug in new_values and not _close(old_values[plug], new_values[plug], tol)]
+
+        return {
+            "nodes": _added_removed(self.nodes, other.nodes),
+            "connections": _added_removed(self.connections, other.connections),
+            "values": {
+                "added": sorted(plug for plug in new_values if plug not in old_values),
+                "removed": sorted(plug for plug in old_values if plug not in new_values),
+                "changed": changed
+            }
+        }
+
+    def summary(self):
+        """
+        Returns:
+            dict: number of nodes per type, connections and values.
+        """
+        node_types = {}
+        for _, node_type, _ in self.nodes:
+            node_types[node_type] = node_types.get(node_type, 0) + 1
+        return {"nodes": node_types, "connections": len(self.connections), "values": len(self.values)}
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(float(v) for v in value)
+    return value
+
+
+def _close(a, b, tol):
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(abs(x - y) <= tol for x, y in zip(a, b))
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) <= tol
+    return a == b
+
+
+def _added_removed(old, new):
+    old_set = set(old)
+    new_set = set(new)
+    return {"added": [x for x in new if x not in old_set], "removed": [x for x in old if x not in new_set]}
+
+
+# ----------------------------------------------------------------
+# --- MATRICES ---
+# ----------------------------------------------------------------
+def _matrix(values):
+    return np.asarray(values, dtype=np.float64).reshape(4, 4)
+
+
+def _translation_matrix(values):
+    """
+    Output of a pickMatrix with useRotate, useScale and useShear off.
+    """
+    m = np.identity(4)
+    m[3, :3] = _matrix(values)[3, :3]
+    return m
+
+
+def weighted_translation_matrix(matrices, wts):
+    """
+    Identity matrix with the weighted sum of the translations (same as ribbon.get_weighted_translation_matrix).
+    """
+    m = np.identity(4)
+    for matrix, wt in zip(matrices, wts):
+        m[3, :3] += _matrix(matrix)[3, :3] * wt
+    return m
+
+
+def wt_add_matrix_value(matrices, wts, tol=0.000001):
+    """
+    Output of a wtAddMatrix planned with the same tolerance as ribbon.create_wt_add_matrix.
+    """
+    m = np.zeros((4, 4))
+    for matrix, wt in zip(matrices, wts):
+        if abs(wt) >= tol:
+            m += _matrix(matrix) * wt
+    return m
+
+
+def _flat(m):
+    return tuple(float(v) for v in np.ravel(m))
+
+
+# ----------------------------------------------------------------
+# --- PLANIFICADOR ---
+# ----------------------------------------------------------------
+def get_params(cv_matrices, num_joints, d, kv_type=OPEN, param_from_length=False, custom_parameter=None):
+    """
+    Joint parameters of a ribbon, already remapped to the knot domain for periodic knot vectors.
+    """
+    num_cvs = len(cv_matrices)
+    kv, _ = core.knot_vector(kv_type, list(range(num_cvs)), d)
+
+    if param_from_length:
+        cv_poss = [_matrix(m)[3, :3] for m in cv_matrices]
+        fractions = [i / (num_joints - 1) for i in range(num_joints)]
+
+        if kv_type == PERIODIC:
+            start = kv[d + 1] * (d * 0.5 + 0.5)
+            loop = kv[d + 1] * num_cvs
+            table = arc_length.ArcLengthTable(cv_poss, d, PERIODIC, domain=(start, start + loop))
+            params = [(u - start) / loop for u in table.params_from_fractions(fractions).tolist()]
+        else:
+            table = arc_length.ArcLengthTable(cv_poss, d, OPEN)
+            params = table.params_from_fractions(fractions).tolist()
+    else:
+        params = [i / (num_joints - 1) for i in range(num_joints)]
+        params = custom_parameter if custom_parameter else params
+
+    if kv_type == PERIODIC:
+        params = [(kv[d + 1] * (d * 0.5 + 0.5)) * (1 - t) + t * (1 - kv[d + 1] * (d * 0.5 - 0.5)) for t in params]
+
+    return params
+
+
+def get_weights(num_cvs, d, kv_type, params, tangent_offset=0.001, tol=0.000001):
+    """
+    Position and tangent weights per joint, consolidated onto the original CVs for periodic knot vectors.
+
+    Returns:
+        tuple: (wts, tangent_wts), lists of num_joints lists of num_cvs weights.
+    """
+    all_wts, all_d_wts = core.cached_basis(num_cvs, d, kv_type, params, tol=tol, derivative=True)
+    all_tangent_wts = all_wts + tangent_offset * all_d_wts
+
+    if kv_type == PERIODIC:
+        # Padded CV k is original CV (k - d) % num_cvs
+        consolidate = np.zeros((all_wts.shape[1], num_cvs))
+        consolidate[np.arange(all_wts.shape[1]), (np.arange(all_wts.shape[1]) - d) % num_cvs] = 1.0
+        all_wts = all_wts @ consolidate
+        all_tangent_wts = all_tangent_wts @ consolidate
+
+    return all_wts.tolist(), all_tangent_wts.tolist()
+
+
+def prune_weights(wts, max_influences, tie_break=None):
+    """
+    Keeps the max_influences largest weights (by magnitude) of every row and renormalizes the row
+    so it adds up to the same total as before.
+
+    Args:
+        wts (list): num_joints lists of weights
+        max_influences (int): influences kept per joint
+        tie_break (list, optional): same shape as wts, its magnitude ranks weights of equal magnitude
+            (the derivative weights, so a joint on a single CV also keeps its neighbour)
+
+    Returns:
+        tuple: (pruned weights with the same shape as wts, indices of the dropped weights per row or None)
+    """
+    wts = np.asarray(wts, dtype=np.float64)
+    if max_influences is None or max_influences >= wts.shape[1]:
+        return wts.copy(), None
+
+    secondary = np.zeros_like(wts) if tie_break is None else np.abs(np.asarray(tie_break, dtype=np.float64))
+    drop = np.lexsort((-secondary, -np.abs(wts)), axis=1)[:, max_influences:]
+    pruned = wts.copy()
+    np.put_along_axis(pruned, drop, 0.0, axis=1)
+
+    totals = wts.sum(axis=1)
+    kept = pruned.sum(axis=1)
+    scale = np.divide(totals, kept, out=np.ones_like(kept), where=np.abs(kept) > 1e-12)
+    return pruned * scale[:, None], drop
+
+
+def pruning_error(cv_matrices, wts, pruned_wts):
+    """
+    Max distance between the joint positions given by wts and by pruned_wts.
+    """
+    cv_poss = np.array([_matrix(m)[3, :3] for m in cv_matrices])
+    offsets = (np.asarray(wts) - np.asarray(pruned_wts)) @ cv_poss
+    return float(np.linalg.norm(offsets, axis=1).max()) if len(offsets) else 0.0
+
+
+def plan_ribbon(cvs, cv_plugs, cv_matrices, skeleton_grp, skeleton_matrix=IDENTITY, aim_axis='x', up_axis='y',
+                num_joints=5, tangent_offset=0.001, d=None, kv_type=OPEN, param_from_length=False, tol=0.000001,
+                name='ribbon', use_position=True, use_tangent=True, use_up=True, use_scale=True, custom_parameter=None,
+                max_influences_per_joint=None):
+    """
+    import ribbon_plan
+
+    cvs = ['cv0', 'cv1', 'cv2', 'cv3']
+    plugs = [f'{cv}.worldMatrix[0]' for cv in cvs]
+    matrices = [(1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, i, 0, 0, 1) for i in range(4)]
+    plan = ribbon_plan.plan_ribbon(cvs, plugs, matrices, 'ribbonSkinning_GRP')
+    plan.summary()
+
+    Plans the network built by ribbon.de_boor_ribbon. Same arguments, plus the scene data read up front.
+
+    Args:
+        cvs (list): transforms that act as the curve cvs
+        cv_plugs (list): matrix plug of every cv
+        cv_matrices (list): value of every cv plug, 16 floats each
+        skeleton_grp (str): existing group the joints are parented to
+        skeleton_matrix (list): world matrix of skeleton_grp, used as up target when use_up is False
+        max_influences_per_joint (int, optional): keep only the k largest weights of every wtAddMatrix and
+            renormalize them, the resulting max joint position error is stored in plan.max_error
+
+    Returns:
+        RibbonPlan: the plan
+    """
+    num_cvs = len(cvs)
+    d = num_cvs - 1 if d is None else d
+    aim_vector = AXIS_VECTOR[aim_axis]
+
+    settings = (("aim_axis", aim_axis), ("up_axis", up_axis), ("num_joints", num_joints),
+                ("tangent_offset", tangent_offset), ("d", d), ("kv_type", kv_type),
+                ("param_from_length", param_from_length), ("tol", tol), ("use_position", use_position),
+                ("use_tangent", use_tangent), ("use_up", use_up), ("use_scale", use_scale),
+                ("custom_parameter", tuple(custom_parameter or ())),
+                ("max_influences_per_joint", max_influences_per_joint))
+
+    nodes = []
+    connections = []
+    values = []
+
+    def node(node_name, node_type, parent=None):
+        nodes.append((node_name, node_type, parent))
+        return node_name
+
+    def wt_add_matrix(matrix_plugs, wts, wam_name):
+        wam = node(wam_name, 'wtAddMatrix')
+        for j, (matrix_plug, wt) in enumerate(zip(matrix_plugs, wts)):
+            if abs(wt) < tol:
+                continue
+            connections.append((matrix_plug, f'{wam}.wtMatrix[{j}].matrixIn'))
+            values.append((f'{wam}.wtMatrix[{j}].weightIn', float(wt)))
+        return wam
+
+    # ----- helper transforms following the cvs (periodic order starts at the last cv)
+    if kv_type == OPEN:
+        m_cvs = list(range(num_cvs))
+    else:
+        m_cvs = [(i - 1) % num_cvs for i in range(num_cvs)]
+        m_cvs += m_cvs[:d]
+
+    temp_nodes = []
+    for i, cv_index in enumerate(m_cvs):
+        temp_node = node(f'temp_{i}', 'transform')
+        connections.append((cv_plugs[cv_index], f'{temp_node}.offsetParentMatrix'))
+        temp_nodes.append(temp_node)
+
+    params = get_params(cv_matrices, num_joints, d, kv_type, param_from_length, custom_parameter)
+    all_wts, all_tangent_wts = get_weights(num_cvs, d, kv_type, params, tangent_offset, tol)
+
+    max_error = 0.0
+    if max_influences_per_joint:
+        all_wts = np.asarray(all_wts)
+        all_d_wts = np.asarray(all_tangent_wts) - all_wts
+
+        pruned_wts, dropped = prune_weights(all_wts, max_influences_per_joint, tie_break=all_d_wts)
+        max_error = pruning_error(cv_matrices, all_wts, pruned_wts)
+
+        # The tangent target only sits tangent_offset * dC/dt away from the position, so it keeps the same
+        # influences as the position and its derivative part stays zero-sum
+        if dropped is not None:
+            kept = np.ones_like(all_wts)
+            np.put_along_axis(kept, dropped, 0.0, axis=1)
+            all_d_wts = all_d_wts * kept
+            all_d_wts -= kept * (all_d_wts.sum(axis=1) / kept.sum(axis=1))[:, None]
+
+        all_wts = pruned_wts.tolist()
+        all_tangent_wts = (pruned_wts + all_d_wts).tolist()
+
+    # ----- translation and scale offsets per cv
+    par_off_plugs = list(cv_plugs)
+    trans_off_plugs = []
+    sca_off_plugs = []
+
+    for i, cv_plug in enumerate(cv_plugs):
+
+        trans_off = node(f'{name}_translation_{i}_PM', 'pickMatrix')
+        connections.append((cv_plug, f'{trans_off}.inputMatrix'))
+        for attr in 'useRotate', 'useScale', 'useShear':
+            values.append((f'{trans_off}.{attr}', False))
+        trans_off_plugs.append(f'{trans_off}.outputMatrix')
+
+        if use_scale and use_tangent or use_up:
+
+            sca_off = node(f'{name}_scaleOffset_{i}_PM', 'pickMatrix')
+            connections.append((cv_plug, f'{sca_off}.inputMatrix'))
+            for attr in 'useRotate', 'useShear', 'useTranslate':
+                values.append((f'{sca_off}.{attr}', False))
+            sca_off_plugs.append(f'{sca_off}.outputMatrix')
+
+    trans_matrices = [_translation_matrix(m) for m in cv_matrices]
+
+    # ----- joints
+    jnts = []
+    weights = []
+    scale_enabled = False
+
+    for i, param in enumerate(params):
+
+        jnt = node(f'{name}0{i}_JNT', 'joint', skeleton_grp)
+        jnts.append(jnt)
+
+        wts = all_wts[i]
+        tangent_wts = all_tangent_wts[i]
+        weights.append((param, wts, tangent_wts))
+
+        position_plug = None
+        tangent_plug = None
+
+        # ----- position setup
+        if use_position:
+
+            position = wt_add_matrix(trans_off_plugs, wts, f'{name}_position_{i}_WAM')
+            position_plug = f'{position}.matrixSum'
+
+            if not use_tangent and not use_up:  # no aimMatrix necessary, connect wtAddMatrix to joint
+
+                connections.append((position_plug, f'{jnt}.offsetParentMatrix'))
+
+                if use_scale and not scale_enabled:
+                    for trans_off_plug in trans_off_plugs:
+                        values.append((f"{trans_off_plug.split('.')[0]}.useScale", True))
+                    scale_enabled = True
+
+                continue
+
+            # ----- tangent setup
+            if use_tangent:
+
+                tangent = wt_add_matrix(trans_off_plugs, tangent_wts, f'{name}_tangent_{i}_WAM')
+                tangent_plug = f'{tangent}.matrixSum'
+
+        up_plug = None
+
+        # ----- up setup
+        if use_up:
+
+            up = wt_add_matrix(par_off_plugs, wts, f'{name}_up_{i}_WAM')
+
+            up_off = node(f'{name}_upOffset_{i}_MM', 'multMatrix')
+            four_by_four = node(f'{name}_upOffset_{i}_F4X4', 'fourByFourMatrix')
+            if up_axis in ('x', 'y', 'z'):
+                values.append((f'{four_by_four}.in3{"xyz".index(up_axis)}', 10.0))
+            connections.append((f'{four_by_four}.output', f'{up_off}.matrixIn[0]'))
+            connections.append((f'{up}.matrixSum', f'{up_off}.matrixIn[2]'))
+
+            up_plug = f'{up_off}.matrixSum'
+
+        aim = node(f'{name}_pointOnCurve_{i}_AM', 'aimMatrix')
+
+        if position_plug:
+            connections.append((position_plug, f'{aim}.inputMatrix'))
+        else:
+            values.append((f'{aim}.inputMatrix', _flat(weighted_translation_matrix(trans_matrices, wts))))
+
+        if tangent_plug:
+            connections.append((tangent_plug, f'{aim}.primaryTargetMatrix'))
+        else:
+            trans_wt_mat = weighted_translation_matrix(trans_matrices, tangent_wts)
+
+            if position_plug:
+
+                position_m = wt_add_matrix_value(trans_matrices, wts, tol)
+                tangent_offset_val = trans_wt_mat @ np.linalg.inv(position_m)
+
+                tangent_off = node(f'{name}_tangentOffset_{i}_MM', 'multMatrix')
+                values.append((f'{tangent_off}.matrixIn[0]', _flat(tangent_offset_val)))
+                connections.append((position_plug, f'{tangent_off}.matrixIn[1]'))
+                connections.append((f'{tangent_off}.matrixSum', f'{aim}.primaryTargetMatrix'))
+
+            else:
+
+                values.append((f'{aim}.primaryTargetMatrix', _flat(trans_wt_mat)))
+
+        if up_plug is None:
+            values.append((f'{aim}.secondaryTargetMatrix', _flat(_matrix(skeleton_matrix))))
+        else:
+            connections.append((up_plug, f'{aim}.secondaryTargetMatrix'))
+
+        output_plug = f'{aim}.outputMatrix'
+
+        values.append((f'{aim}.primaryInputAxis', aim_vector))
+        values.append((f'{aim}.secondaryInputAxis', AXIS_VECTOR[up_axis]))
+        values.append((f'{aim}.secondaryMode', 1)) # Aim
+
+        if use_scale:
+            scale_wam = wt_add_matrix(sca_off_plugs, wts, f'{name}_scale_{i}_WAM')
+
+            scale_mm = node(f'{name}_scale_{i}_MM', 'multMatrix')
+            connections.append((f'{scale_wam}.matrixSum', f'{scale_mm}.matrixIn[0]'))
+            connections.append((output_plug, f'{scale_mm}.matrixIn[1]'))
+
+            output_plug = f'{scale_mm}.matrixSum'
+
+        connections.append((output_plug, f'{jnt}.offsetParentMatrix'))
+
+    return RibbonPlan(name, settings, nodes, connections, values, weights, jnts, temp_nodes, max_error)
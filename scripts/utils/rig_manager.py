@@ -2,108 +2,45 @@
 import glob
 import os
 import json
-from importlib import reload
 import re
 import pathlib
-
-from numpy import character
-from utils import matrix_manager
-import maya.api.OpenMaya as om
+from contextlib import contextmanager
 
 # Maya commands import
-from maya.api import OpenMaya as om
-import json
-
 import maya.cmds as cmds
-try:
-    from PySide6 import QtWidgets, QtCore, QtGui
-except:
-    from PySide2 import QtWidgets, QtCore, QtGui
+from maya.api import OpenMaya as om
 
+from utils import matrix_manager
 from utils import guides_manager
-from ui import auto_rig_UI
-
 from utils import data_manager
-from utils import rig_manager
-
-reload(data_manager)
-reload(rig_manager)
-reload(guides_manager)
-reload(auto_rig_UI)
-reload(om)
-reload(glob)
-reload(pathlib)
-
-
-# Body mechanics
-from biped.autorig import arm_module_de_boor as arm_module
-from biped.autorig import spine_module as biped_spine_module
-from biped.autorig import clavicle_module
-from biped.autorig import leg_module_de_boor as leg_module
-from biped.autorig import neck_module_de_boor as neck_module
-from biped.autorig import fingers_module
-
-from quadruped.autorig import tail_module
-from quadruped.autorig import limb_module
-from quadruped.autorig import spine_module as quad_spine_module
-from quadruped.autorig import neck_module as neck_module_quad
-
-# Facial
-from biped.autorig import eyebrow_module
-from biped.autorig import eyelid_module
-from biped.autorig import ear_module
-from biped.autorig import nose_module
-from biped.autorig import jaw_module
-from biped.autorig import cheekbone_module
-from biped.autorig import tongue_module
-from biped.autorig import teeth_module
-
-
-reload(arm_module)
-reload(biped_spine_module)
-reload(clavicle_module)
-reload(leg_module)
-reload(neck_module)
-reload(fingers_module)
-reload(tail_module)
-reload(limb_module)
-reload(quad_spine_module)
-reload(neck_module_quad)
-reload(eyebrow_module)
-reload(eyelid_module)
-reload(ear_module)
-reload(nose_module)
-reload(jaw_module)
-reload(cheekbone_module)
-reload(tongue_module)
-reload(teeth_module)
+from utils import version_catalog
+from utils import asset_store
+from utils import build_profiler
+from utils import module_registry
+from utils import incremental_build
+
+# The rig modules are imported by module_registry the first time a build uses them.
 
 
 def get_latest_version(folder):
 
     """
-    Get the latest version number of a file in a given folder.
+    Get the latest version of a file in a given folder.
+    Resolved through version_catalog: highest _vNNN number, newest file on a tie.
     Args:
         folder (str): Full path to the folder to search in.
-        base_name (str): The base name of the file (without version and extension).
     Returns:
-        int: The latest version number, or None if no versions are found or folder is invalid.
+        pathlib.Path: The latest file, or None if no versions are found or folder is invalid.
     """
 
-    folder = pathlib.Path(folder)
+    latest_file = version_catalog.latest_version(folder)
 
-    if not folder.is_dir():
-        return None
-    
-    # Get all files (any extension)
-    files = [f for f in folder.glob("*") if f.is_file()]
-
-    if not files:
-        om.MGlobal.displayInfo("No files found in the specified folder.")
+    if latest_file is None:
+        if pathlib.Path(folder).is_dir():
+            om.MGlobal.displayInfo("No files found in the specified folder.")
         return None
     else:
-        latest_file = max(files, key=lambda f: f.stat().st_mtime)
-        return latest_file
+        return pathlib.Path(latest_file)
 
 def create_new_folder(path):
 
@@ -205,11 +142,12 @@ def get_next_version_name(folder):
         str: The next version name.
     """
     latest_version  = get_latest_version(folder=folder)
-    base_name = latest_version.stem.split("_v")[0].split("/")[-1]
-    next_version = 1 if base_name is None else base_name + 1
-    ext = latest_version.split(".")[-1]
+    if latest_version is None:
+        return None
+    base_name = latest_version.stem.split("_v")[0]
+    ext = latest_version.suffix
     
-    return f"{base_name}_v{next_version:03d}.{ext}"
+    return os.path.basename(version_catalog.next_version_path(folder, base_name, ext))
 
 def create_assets_folders(asset_name):
 
@@ -357,26 +295,32 @@ def get_character_data(character_name):
     Carga la data completa del personaje una sola vez.
     Retorna un diccionario con todas las guías existentes.
     """
-    full_data = guides_manager.read_guides_info(character_name, return_all=True) 
+    full_data = guides_manager.read_guides_info(character_name)
     return full_data if full_data else {}
 
 
-def build_rig(character_name):
+def build_rig(character_name, modules=None, with_dependencies=False, dry_run=False):
 
     """
     Función principal de construcción del Rig.
+    The modules are declared in module_registry and built in dependency order, modules without their
+    guides or inputs are skipped.
+
+    Args:
+        character_name (str): The character name.
+        modules (list, optional): Module names for a partial build (module_registry.REGISTRY names).
+        with_dependencies (bool): With modules, also build the modules that produce their inputs.
+        dry_run (bool): Only print and return the plan.
 
+    Returns:
+        module_registry.BuildPlan: The plan, or None if the guides or the build settings are missing.
     """
-    reload(guides_manager)
-    all_guides_data = guides_manager.read_guides_info(character_name)
+    guide_index = guides_manager.get_guide_index(character_name) # Parsed once, shared with get_guides
     
-    if not all_guides_data:
+    if not guide_index:
         print(f"[ERROR] No se pudieron cargar las guías para: {character_name}")
         return 
 
-    def check(guide_name):
-        return guide_name in all_guides_data
-    
     # =========================================================================
     # LOAD RIG SETTINGS
     # =========================================================================
@@ -386,131 +330,41 @@ def build_rig(character_name):
         om.MGlobal.displayError(f"No se encontró configuración de atributos para: {character_name}")
         return
 
-    # --- Acceso a los datos del diccionario ---
-    rig_type            = rig_settings.get("Rig_Type", 0)
-    spine_skinning_jnts = rig_settings.get("spine_skinning_jnts", 8)
-    spine_controllers   = rig_settings.get("spine_controllers", 5)
-    neck_skinning_jnts  = rig_settings.get("neck_skinning_jnts", 5)
-    neck_controllers   = rig_settings.get("neck_controllers", 2)
-    arm_skinning_jnts   = rig_settings.get("arm_skinning_jnts", 5)
-    leg_skinning_jnts   = rig_settings.get("leg_skinning_jnts", 5)
-    tail_skinning_jnts  = rig_settings.get("tail_skinning_jnts", 5)
-    tail_controllers    = rig_settings.get("tail_controllers", 5)
-    mGear_integration   = rig_settings.get("mGear_integration", 0)
-    print(f"--- Iniciando Build: {character_name} (Tipo: {'Biped' if rig_type == 0 else 'Quadruped'}) ---")
+    rig_type = rig_settings.get("Rig_Type", 0)
 
-    # CREATE MODULES BASED ON GUIDES
     # =========================================================================
-    # BUILD: BODY
+    # PLAN: registered modules ordered by the build cache keys they read and write
     # =========================================================================
+    available = set(module_registry.BASIC_STRUCTURE_KEYS) | data_manager.DataExportBiped().keys()
+    plan = module_registry.plan_build(guide_index, rig_settings, only=modules, with_dependencies=with_dependencies,
+                                      available=available)
 
-    # --- Spine ---
-    if check("C_spine00_JNT"):
-        if rig_type == 0:
-            reload(biped_spine_module)
-            biped_spine_module.SpineModule().make("C", spine_skinning_jnts, spine_controllers)
-        else:
-            reload(quad_spine_module)
-            quad_spine_module.SpineModule().make("C", spine_skinning_jnts, spine_controllers)
-
-    # --- Neck ---
-    if check("C_neck00_JNT"):
-        if rig_type == 0:
-            if mGear_integration:
-                reload(neck_module)
-                neck_module.NeckModule().make("C", neck_skinning_jnts, neck_controllers, mGear_integration=True)
-            else:
-                reload(neck_module)
-                neck_module.NeckModule().make("C", neck_skinning_jnts, neck_controllers)
-        else:
-            reload(neck_module_quad)
-            neck_module_quad.NeckModule().make("C", neck_skinning_jnts, neck_controllers)
-
-    # --- Legs (Solo Biped) ---
-    if rig_type == 0:
-        if check("L_hip_JNT") and check("R_hip_JNT"):
-            reload(leg_module)
-            leg_module.LegModule().make("L", leg_skinning_jnts)
-            leg_module.LegModule().make("R", leg_skinning_jnts)
-
-    # --- Limbs (Solo Quadruped) ---
-    if rig_type == 1:
-        # Patas Delanteras
-        if check("L_frontLeg_JNT") and check("R_frontLeg_JNT"):
-            reload(limb_module)
-            limb_module.LimbModule().make("L", leg_skinning_jnts)
-            limb_module.LimbModule().make("R", leg_skinning_jnts)
-        
-        # Patas Traseras
-        if check("L_backLeg_JNT") and check("R_backLeg_JNT"):
-            reload(limb_module)
-            limb_module.LimbModule().make("L", leg_skinning_jnts)
-            limb_module.LimbModule().make("R", leg_skinning_jnts)
-
-    # --- Arms / Clavicles ---
-    if check("L_clavicle_JNT") and check("R_clavicle_JNT"):
-        reload(clavicle_module)
-        clavicle_module.ClavicleModule().make("L")
-        clavicle_module.ClavicleModule().make("R") 
-
-    if check("L_shoulder_JNT") and check("R_shoulder_JNT"):
-        reload(arm_module)
-        arm_module.ArmModule().make("L", arm_skinning_jnts)
-        arm_module.ArmModule().make("R", arm_skinning_jnts)
-    
-    if check("L_thumb00_JNT") and check("R_thumb00_JNT"):
-        reload(fingers_module)
-        fingers_module.FingersModule().make("L")
-        fingers_module.FingersModule().make("R")
+    if dry_run:
+        print(f"--- Build plan: {character_name} ---\n{plan.describe()}")
+        return plan
 
-    # --- Tail ---
-    if check("C_tail00_JNT"):
-        reload(tail_module)
-        tail_module.TailModule().make("C", tail_skinning_jnts, tail_controllers)
+    print(f"--- Iniciando Build: {character_name} (Tipo: {'Biped' if rig_type == 0 else 'Quadruped'}) ---")
+    for step in plan.skipped:
+        if step.reason == "missing inputs":
+            om.MGlobal.displayWarning(f"{step.spec.name} skipped, missing inputs: {', '.join(step.missing)}")
 
-    # =========================================================================
-    # BUILD: FACIAL
-    # =========================================================================
-    
-    if check("C_jaw_JNT"):
-        reload(jaw_module)
-        jaw_module.JawModule().make("C")
-    
-    if check("L_eyebrowMain_JNT") and check("R_eyebrowMain_JNT"):
-        reload(eyebrow_module)
-        eyebrow_module.EyebrowModule().make("L")
-        eyebrow_module.EyebrowModule().make("R")
-    
-    if check("L_eye_JNT") and check("R_eye_JNT"):
-        reload(eyelid_module)
-        eyelid_module.EyelidModule().make("L")
-        eyelid_module.EyelidModule().make("R")
-
-    if check("C_tongue00_JNT"):
-        reload(tongue_module)
-        tongue_module.TongueModule().make("C")
-
-    if check("C_upperTeeth_JNT"):
-        reload(teeth_module)
-        teeth_module.TeethModule().make("C")
-
-    if check("L_ear00_JNT") and check("R_ear00_JNT"):
-        reload(ear_module)
-        ear_module.EarModule().make("L")
-        ear_module.EarModule().make("R")
-
-    if check("C_nose_JNT"):
-        reload(nose_module)
-        nose_module.NoseModule().make("L")
-        nose_module.NoseModule().make("R")
-
-    if check("L_cheekbone_JNT") and check("R_cheekbone_JNT"):
-        reload(cheekbone_module)
-        cheekbone_module.CheekboneModule().make("L")
-        cheekbone_module.CheekboneModule().make("R")
-
-    if rig_type == 0 and mGear_integration == 0:
-            biped_space_switches()
+    # Every module is recorded for incremental_build, profiling is opt-in (build_profiler.enable())
+    recorder = incremental_build.BuildRecorder(guide_index, rig_settings)
+
+    @contextmanager
+    def step(name, module):
+        with build_profiler.section(name, module), recorder.track(name):
+            yield
+
+    build_profiler.start(character_name)
+    try:
+        module_registry.run_plan(plan, rig_settings, section=step)
+    finally:
+        recorder.save()
+        if build_profiler.active() is not None:
+            build_profiler.finish(asset_path(character_name, build_profiler.PROFILE_FOLDER))
+
+    return plan
     
 def biped_space_switches():
 
@@ -671,6 +525,7 @@ def get_rig_data(character_name, guides_transform):
     try:
         with open(json_path, 'w') as json_file:
             json.dump(rig_data, json_file, indent=4)
+        asset_store.commit_version(json_path)
         om.MGlobal.displayInfo(f"Rig data exported: {json_path}")
     except Exception as e:
         om.MGlobal.displayError(f"Error al guardar el archivo: {str(e)}")
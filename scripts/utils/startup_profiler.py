@@ -0,0 +1,117 @@
+import os
+import re
+import sys
+import subprocess
+
+# -----------------------------------------------------------------------------
+# COSTE DE IMPORTACIÓN AL ARRANCAR
+# -----------------------------------------------------------------------------
+# Lanza un intérprete limpio (mayapy si se encuentra) con "python -X importtime" por cada módulo
+# objetivo y lee el coste de importar cada módulo: tiempo propio y acumulado (con lo que importa).
+# Cada objetivo se mide en un proceso nuevo, así no comparte módulos ya cargados con los demás.
+#
+# from utils import startup_profiler
+#
+# startup_profiler.report()                                  # menú (userSetup) y primer build
+# startup_profiler.report(["utils.rig_manager"], project_only=False)
+
+# Lo que importa userSetup para dibujar el menú y lo que importa el primer CREAR RIG
+DEFAULT_TARGETS = ("ui.auto_rig_UI", "utils.create_rig")
+PROJECT_PACKAGES = ("ui", "utils", "tools", "biped", "quadruped")
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def get_scripts_path():
+    return os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def get_python():
+    """
+    Returns:
+        str: mayapy of the running Maya, or the current interpreter outside Maya.
+    """
+    maya_location = os.environ.get("MAYA_LOCATION")
+    if maya_location:
+        for name in ("mayapy.exe", "mayapy"):
+            mayapy = os.path.join(maya_location, "bin", name)
+            if os.path.exists(mayapy):
+                return mayapy
+    return sys.executable
+
+
+def measure_import(module_name, python=None, standalone=False):
+    """
+    Imports module_name in a fresh interpreter with -X importtime.
+
+    Args:
+        module_name (str): Module to import, "ui.auto_rig_UI".
+        python (str, optional): Interpreter. Defaults to get_python().
+        standalone (bool): Initialize maya.standalone first, for modules that run commands on import.
+            Its own imports are left out of the result.
+
+    Returns:
+        list: {"module", "self", "cumulative" (seconds), "depth"} in import order, [] if the import failed.
+    """
+    marker = "__startup_profiler__"
+    code = [f"import sys; sys.path.insert(0, {get_scripts_path()!r})"]
+    if standalone:
+        code.append("import maya.standalone; maya.standalone.initialize(name='python')")
+    code.append(f"sys.stderr.write('{marker}\\n'); sys.stderr.flush()")
+    code.append(f"import {module_name}")
+
+    process = subprocess.run([python or get_python(), "-X", "importtime", "-c", "\n".join(code)],
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        print(f"[startup_profiler] import {module_name} failed: {lines[-1] if lines else process.returncode}")
+        return []
+
+    stderr = process.stderr.split(f"{marker}\n", 1)[-1]
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        rows.append({
+            "module": name,
+            "self": int(self_us) / 1e6,
+            "cumulative": int(cumulative_us) / 1e6,
+            "depth": (len(indent) - 1) // 2,
+        })
+    return rows
+
+
+def is_project_module(module_name):
+    return module_name.split(".")[0] in PROJECT_PACKAGES
+
+
+def report(targets=DEFAULT_TARGETS, project_only=True, top=20, python=None, standalone=False):
+    """
+    Prints, per target, the total import time and the most expensive modules by own time.
+
+    Args:
+        targets (list): Modules to measure, each one in a fresh interpreter.
+        project_only (bool): List only the modules of this repository (the total is always complete).
+        top (int): Rows per target.
+
+    Returns:
+        dict: target -> measure_import rows
+    """
+    results = {}
+    for target in targets:
+        rows = measure_import(target, python=python, standalone=standalone)
+        results[target] = rows
+        if not rows:
+            continue
+
+        total = next((row["cumulative"] for row in rows if row["module"] == target), 0.0)
+        listed = [row for row in rows if is_project_module(row["module"])] if project_only else rows
+        listed = sorted(listed, key=lambda row: row["self"], reverse=True)[:top]
+
+        print(f"--- import {target}: {total * 1000:.1f} ms, {len(rows)} modules ---")
+        print(f"{'self ms':>9} {'cumul ms':>9}  module")
+        for row in listed:
+            print(f"{row['self'] * 1000:9.1f} {row['cumulative'] * 1000:9.1f}  {row['module']}")
+    return results
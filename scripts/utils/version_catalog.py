@@ -0,0 +1,164 @@
+import os
+import re
+
+# -----------------------------------------------------------------------------
+# CATÁLOGO DE VERSIONES
+# -----------------------------------------------------------------------------
+# Único punto para resolver versiones de assets (<asset>_vNNN.<ext>). Cada carpeta se escanea
+# una vez y su manifest se guarda en memoria con el mtime de la carpeta como clave: mientras
+# no se añadan, borren o renombren ficheros, las consultas latest/next/list no tocan el disco
+# salvo un os.stat de la carpeta.
+
+_VERSION_RE = re.compile(r"_v(\d+)$")
+
+# Cache de manifests: folder -> FolderManifest. Se recupera de globals() para sobrevivir a los reload().
+_CATALOG = globals().get("_CATALOG", {})
+
+
+def parse_version(file_name):
+    """
+    Returns the version number of a file named <name>_vNNN.<ext>, or None.
+    """
+    m = _VERSION_RE.search(os.path.splitext(file_name)[0])
+    return int(m.group(1)) if m else None
+
+
+class FolderManifest(object):
+    """
+    Snapshot of the files of a folder, sorted by version number and then by modification time.
+    """
+
+    def __init__(self, folder, stamp):
+        self.folder = folder
+        self.stamp = stamp
+        self.entries = []
+        self._queries = {}
+
+        for entry in os.scandir(folder):
+            if entry.name.startswith(".") or entry.name.endswith(".tmp") or not entry.is_file():
+                continue
+            version = parse_version(entry.name)
+            self.entries.append({
+                "name": entry.name,
+                "path": entry.path,
+                "ext": os.path.splitext(entry.name)[1],
+                "version": version if version is not None else -1,
+                "mtime": entry.stat().st_mtime_ns
+            })
+
+        self.entries.sort(key=lambda e: (e["version"], e["mtime"]))
+
+    def query(self, exts=None, prefix=None):
+        """
+        Entries filtered by extension and name prefix, memoized per filter.
+        When exts is given, a later extension in the tuple wins a version tie.
+        """
+        key = (tuple(exts) if exts else None, prefix)
+        if key not in self._queries:
+            entries = [e for e in self.entries
+                       if (not exts or e["ext"] in exts) and (not prefix or e["name"].startswith(prefix))]
+            if exts:
+                rank = {ext: i for i, ext in enumerate(exts)}
+                entries.sort(key=lambda e: (e["version"], rank[e["ext"]], e["mtime"]))
+            self._queries[key] = entries
+        return self._queries[key]
+
+
+def get_manifest(folder):
+    """
+    Returns the cached manifest of a folder, scanning it again only if the folder mtime changed.
+
+    Returns:
+        FolderManifest: The manifest, or None if the folder does not exist.
+    """
+    folder = os.path.normpath(str(folder))
+    try:
+        stamp = os.stat(folder).st_mtime_ns
+    except OSError:
+        _CATALOG.pop(folder, None)
+        return None
+
+    manifest = _CATALOG.get(folder)
+    if manifest is None or manifest.stamp != stamp:
+        manifest = FolderManifest(folder, stamp)
+        _CATALOG[folder] = manifest
+    return manifest
+
+
+def scan_assets(assets_path):
+    """
+    Scans every assets/<asset>/<type> folder once so later queries are served from memory.
+
+    Returns:
+        int: Number of folders scanned.
+    """
+    count = 0
+    if not os.path.isdir(assets_path):
+        return count
+    for asset in os.scandir(assets_path):
+        if not asset.is_dir():
+            continue
+        for sub_folder in os.scandir(asset.path):
+            if sub_folder.is_dir() and not sub_folder.name.startswith("."):
+                get_manifest(sub_folder.path)
+                count += 1
+    return count
+
+
+def invalidate(folder=None):
+    """
+    Drops the cached manifest of a folder, or every manifest if no folder is given.
+    Needed only when a file is overwritten in place (the folder mtime does not change).
+    """
+    if folder is None:
+        _CATALOG.clear()
+    else:
+        _CATALOG.pop(os.path.normpath(str(folder)), None)
+
+
+def list_versions(folder, exts=None, prefix=None):
+    """
+    Returns the paths of the versions in a folder, oldest first.
+    """
+    manifest = get_manifest(folder)
+    if manifest is None:
+        return []
+    return [e["path"] for e in manifest.query(exts, prefix)]
+
+
+def latest_version(folder, exts=None, prefix=None):
+    """
+    Returns the path of the latest version in a folder (highest version number, newest file on a tie).
+
+    Args:
+        folder (str): The folder.
+        exts (tuple, optional): Allowed extensions, a later extension wins a version tie.
+        prefix (str, optional): Required file name prefix.
+
+    Returns:
+        str: The path, or None if there are no matching files.
+    """
+    manifest = get_manifest(folder)
+    if manifest is None:
+        return None
+    entries = manifest.query(exts, prefix)
+    return entries[-1]["path"] if entries else None
+
+
+def latest_version_number(folder, exts=None, prefix=None):
+    """
+    Returns the highest version number in a folder, 0 if there are no versioned files.
+    """
+    manifest = get_manifest(folder)
+    if manifest is None:
+        return 0
+    entries = manifest.query(exts, prefix)
+    return max(entries[-1]["version"], 0) if entries else 0
+
+
+def next_version_path(folder, base_name, ext):
+    """
+    Returns the path of the next version of <base_name>_vNNN<ext> in a folder.
+    """
+    version = latest_version_number(folder, exts=(ext,), prefix=f"{base_name}_v") + 1
+    return os.path.join(str(folder), f"{base_name}_v{version:03d}{ext}")